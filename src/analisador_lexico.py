@@ -1,8 +1,14 @@
 import ply.lex as lex
 import ply.yacc as yacc
+import mmap
+import os
 import re
+import time
 from collections import Counter
 
+import metricas
+import relatorios
+
 # Palavras reservadas estruturais 
 reserved = {
     # Palavras reservadas principais 
@@ -139,87 +145,367 @@ def t_NUMBER(t):
     t.value = int(t.value)
     return t
 
-def t_ID(t):
-    r'[A-Za-z][A-Za-z0-9_]*'
-    lexeme = t.value
+_RE_NEW_DATATYPE = re.compile(r'[A-Za-z]+DataType')
+_RE_CLASS_NAME = re.compile(r'[A-Z][A-Za-z0-9_]*')
+_RE_INSTANCE = re.compile(r'[a-z][A-Za-z_0-9]*\d+')
+_RE_RELATION_NAME = re.compile(r'[a-z][A-Za-z0-9_]*')
+
+def classificar_identificador(lexeme):
+    # Devolve (tipo, valor) de um identificador; usado pelos dois backends
     low = lexeme.lower()
     
     if low in reserved:
-        t.type = reserved[low]
-        return t
+        return reserved[low], lexeme
     
     if lexeme in stereotypes_class:
-        t.type = 'EST_CLASS'
-        return t
+        return 'EST_CLASS', lexeme
     
     if lexeme in stereotypes_rel:
-        t.type = 'EST_REL'
-        return t
+        return 'EST_REL', lexeme
     
     if lexeme in ('true', 'false'):
-        t.type = 'BOOLEAN_LITERAL'
-        t.value = (lexeme == 'true')
-        return t
+        return 'BOOLEAN_LITERAL', (lexeme == 'true')
     
-    if lexeme.endswith('DataType') and re.fullmatch(r'[A-Za-z]+DataType', lexeme):
-        t.type = 'NEW_DATATYPE'
-        return t
+    if lexeme.endswith('DataType') and _RE_NEW_DATATYPE.fullmatch(lexeme):
+        return 'NEW_DATATYPE', lexeme
     
-    if re.fullmatch(r'[A-Z][A-Za-z0-9_]*', lexeme):
-        t.type = 'CLASS_NAME'
-        return t
+    if _RE_CLASS_NAME.fullmatch(lexeme):
+        return 'CLASS_NAME', lexeme
     
-    if re.fullmatch(r'[a-z][A-Za-z_0-9]*\d+', lexeme):
-        t.type = 'INSTANCE'
-        return t
+    if _RE_INSTANCE.fullmatch(lexeme):
+        return 'INSTANCE', lexeme
     
-    if re.fullmatch(r'[a-z][A-Za-z0-9_]*', lexeme):
-        t.type = 'RELATION_NAME'
-        return t
+    if _RE_RELATION_NAME.fullmatch(lexeme):
+        return 'RELATION_NAME', lexeme
     
-    t.type = 'ID'
+    return 'ID', lexeme
+
+def t_ID(t):
+    r'[A-Za-z][A-Za-z0-9_]*'
+    t.type, t.value = classificar_identificador(t.value)
+    # Com a tabela de símbolos do build, nomes iguais viram o mesmo objeto
+    tabela = t.lexer.tabela
+    if tabela is not None and t.type != 'BOOLEAN_LITERAL':
+        t.value = tabela.internar(t.value)
     return t
 
 def t_newline(t):
     r'\n+'
     t.lexer.lineno += t.value.count("\n")
 
+class LimiteDeErros(Exception):
+    # Interrompe a análise de um arquivo que atingiu o máximo de erros
+    def __init__(self, linha, limite):
+        super().__init__(f"Limite de {limite} erro(s) atingido: o restante do arquivo não foi analisado")
+        self.linha = linha
+        self.limite = limite
+
+def verificar_limite_erros(limite, linha, *listas):
+    # limite None ou 0: sem limite
+    if limite and sum(len(erros) for erros in listas) >= limite:
+        raise LimiteDeErros(linha, limite)
+
+def mensagem_erro_lexico(trecho):
+    # Uma sequência de símbolos não reconhecidos vira um único erro
+    if len(trecho) == 1:
+        return f"símbolo inesperado {repr(trecho)}"
+    amostra = trecho if len(trecho) <= 20 else trecho[:20] + '...'
+    return f"símbolos inesperados {repr(amostra)} ({len(trecho)} caracteres)"
+
+def registrar_erro_lexico(lexer, linha, trecho):
+    # Os erros só são guardados se quem usa o lexer criou lexer.erros_lexicos
+    # (o MotorSintatico liga essa lista à AST de cada parse). Com
+    # lexer.limite_erros, a análise é interrompida ao atingir o limite.
+    mensagem = mensagem_erro_lexico(trecho)
+    erros = getattr(lexer, 'erros_lexicos', None)
+    if erros is not None:
+        erros.append({'line': linha, 'message': mensagem})
+        verificar_limite_erros(getattr(lexer, 'limite_erros', None), linha,
+                               erros, getattr(lexer, 'erros_sintaticos', ()))
+    relatorios.atual().texto(f"[LEX ERROR] Linha {linha}: {mensagem}")
+
+def fim_dos_erros(data, inicio):
+    # Posição do próximo token reconhecível a partir de inicio (o mesmo
+    # ponto em que o PLY voltaria a casar uma regra)
+    proximo = (_RE_MESTRE if isinstance(data, str) else _RE_MESTRE_BYTES).search(data, inicio + 1)
+    return proximo.start() if proximo else len(data)
+
 def t_error(t):
-    print(f"[LEX ERROR] Linha {t.lexer.lineno}: símbolo inesperado {repr(t.value[0])}")
-    t.lexer.skip(1)
+    lexer = t.lexer
+    fim = fim_dos_erros(lexer.lexdata, lexer.lexpos)
+    trecho = lexer.lexdata[lexer.lexpos:fim]
+    lexer.skip(fim - lexer.lexpos)
+    registrar_erro_lexico(lexer, lexer.lineno, trecho)
 
-def build(**kwargs):
-    return lex.lex(**kwargs)
+# Backend alternativo: um único regex mestre percorrido com finditer e
+# classificação de identificadores memorizada por lexema. Produz exatamente
+# a mesma sequência de tokens (tipo, valor, linha) que o lexer do PLY.
+_SIMBOLOS = {
+    '(': 'LPAREN', ')': 'RPAREN', '{': 'LBRACE', '}': 'RBRACE',
+    '[': 'LBRACKET', ']': 'RBRACKET', ',': 'COMMA', '.': 'DOT',
+    '>=': 'MAIORIGUAL', '<=': 'MENORIGUAL', '>': 'MAIOR', '<': 'MENOR',
+    '<>--': 'CONTEM', '--<>': 'CONTIDO', '*': 'ASTERISCO', '@': 'ARROBA',
+    ':': 'COLON', '-': 'HYPHEN',
+}
 
-def lex_table(input_text, lexer=None):
+_VALOR_SIMBOLO = {tipo: simbolo for simbolo, tipo in _SIMBOLOS.items()}
+
+# Mesma prioridade do regex mestre do PLY: regras-função na ordem em que
+# foram definidas e, depois, os símbolos com a expressão mais longa primeiro
+_PADRAO_MESTRE = r"""
+    (?P<IGNORE>[ \t]+)
+  | (?P<COMMENT>//[^\n]*|/\*(?:[^*]|\*+[^*/])*\*+/)
+  | (?P<STRING>"(?:[^\\"]|\\.)*"|'(?:[^\\']|\\.)*')
+  | (?P<NUMBER>\d+)
+  | (?P<ID>[A-Za-z][A-Za-z0-9_]*)
+  | (?P<NEWLINE>\n+)
+  | (?P<SIMBOLO><>--|--<>|>=|<=|[(){}\[\],.*@:<>-])
+"""
+_RE_MESTRE = re.compile(_PADRAO_MESTRE, re.VERBOSE)
+# Versão para bytes: permite varrer um arquivo mapeado em memória (mmap)
+_RE_MESTRE_BYTES = re.compile(_PADRAO_MESTRE.encode('ascii'), re.VERBOSE)
+_SIMBOLOS_BYTES = {simbolo.encode('ascii'): tipo for simbolo, tipo in _SIMBOLOS.items()}
+
+class LexerRapido:
+    def __init__(self):
+        self.lineno = 1
+        self.lexpos = 0
+        self.lexdata = ''
+        self._classificacao = {}
+        self._tokens = iter(())
+        # simbolos.TabelaSimbolos do build; com ela a classificação memorizada
+        # é a da tabela, com os valores já internados
+        self.tabela = None
+
+    def clone(self):
+        clone = LexerRapido()
+        clone.lineno = self.lineno
+        # A classificação só depende do lexema: pode ser compartilhada
+        clone._classificacao = self._classificacao
+        clone.tabela = self.tabela
+        return clone
+
+    def input(self, data):
+        # data pode ser str ou um buffer de bytes UTF-8 (bytes, mmap); no
+        # segundo caso lexpos passa a ser a posição em bytes
+        self.lexdata = data
+        self.lexpos = 0
+        self._tokens = self.tuplas()
+
+    def _erros(self, data, inicio, fim, binario):
+        # Cada sequência de caracteres não reconhecidos gera um erro, como o
+        # t_error do PLY
+        if inicio >= fim:
+            return
+        self.lexpos = fim
+        trecho = bytes(data[inicio:fim]).decode('utf-8', 'replace') if binario else data[inicio:fim]
+        registrar_erro_lexico(self, self.lineno, trecho)
+
+    def tuplas(self):
+        # Gera (lineno, tipo, valor, lexpos) sem criar objetos de token
+        data = self.lexdata
+        binario = not isinstance(data, str)
+        if binario:
+            regex, simbolos, nova_linha = _RE_MESTRE_BYTES, _SIMBOLOS_BYTES, b'\n'
+        else:
+            regex, simbolos, nova_linha = _RE_MESTRE, _SIMBOLOS, '\n'
+        tabela = self.tabela
+        classificacao = self._classificacao if tabela is None else tabela.classificacao
+        pos = self.lexpos
+        for m in regex.finditer(data, pos):
+            inicio = m.start()
+            if inicio != pos:
+                self._erros(data, pos, inicio, binario)
+            pos = self.lexpos = m.end()
+            grupo = m.lastgroup
+
+            if grupo == 'ID':
+                lexeme = m.group()
+                par = classificacao.get(lexeme)
+                if par is None:
+                    texto = lexeme.decode('ascii') if binario else lexeme
+                    par = classificar_identificador(texto)
+                    if tabela is not None and par[0] != 'BOOLEAN_LITERAL':
+                        par = (par[0], tabela.internar(par[1]))
+                    classificacao[lexeme] = par
+                yield self.lineno, par[0], par[1], inicio
+            elif grupo == 'SIMBOLO':
+                tipo = simbolos[m.group()]
+                yield self.lineno, tipo, _VALOR_SIMBOLO[tipo], inicio
+            elif grupo == 'IGNORE':
+                continue
+            elif grupo == 'NEWLINE':
+                self.lineno += m.end() - inicio
+            elif grupo == 'NUMBER':
+                yield self.lineno, 'NUMBER', int(m.group()), inicio
+            elif grupo == 'STRING':
+                valor = m.group()[1:-1]
+                yield self.lineno, 'STRING', valor.decode('utf-8', 'replace') if binario else valor, inicio
+            else:
+                self.lineno += m.group().count(nova_linha)
+
+        self._erros(data, pos, len(data), binario)
+        self.lexpos = len(data)
+
+    def token(self):
+        for lineno, tipo, valor, lexpos in self._tokens:
+            tok = lex.LexToken()
+            tok.type = tipo
+            tok.value = valor
+            tok.lineno = lineno
+            tok.lexpos = lexpos
+            tok.lexer = self
+            return tok
+        return None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+BACKENDS = ('ply', 'rapido')
+# Backend padrão; a variável de ambiente também vale para os processos do pool
+BACKEND_PADRAO = os.environ.get('TONTO_LEXER', 'ply')
+
+def build(backend=None, **kwargs):
+    backend = backend or BACKEND_PADRAO
+    if backend == 'rapido':
+        return LexerRapido()
+    if backend != 'ply':
+        raise ValueError(f"Backend léxico desconhecido: {backend} (use {', '.join(BACKENDS)})")
+    lexer = lex.lex(**kwargs)
+    lexer.tabela = None
+    return lexer
+
+def _eh_caminho(origem):
+    if isinstance(origem, os.PathLike):
+        return True
+    return isinstance(origem, str) and '\n' not in origem and os.path.isfile(origem)
+
+def iter_tokens(origem, lexer=None):
+    # Gera (linha, tipo, valor) um token por vez. origem pode ser o texto ou o
+    # caminho de um arquivo; com o backend rapido o arquivo é mapeado em
+    # memória (mmap) e varrido sem ser carregado inteiro como str.
+    gerador = _gerar_tokens(origem, lexer)
+    coletor = metricas.atual()
+    if coletor.ativo:
+        return _medir_tokens(gerador, coletor)
+    return gerador
+
+def _medir_tokens(gerador, coletor):
+    # Só o tempo gasto dentro do lexer entra na fase: quem consome os
+    # tokens (a impressão da tabela, por exemplo) fica de fora
+    parede = cpu = 0.0
+    quantidade = 0
+    try:
+        while True:
+            inicio, inicio_cpu = time.perf_counter(), time.process_time()
+            try:
+                item = next(gerador)
+            except StopIteration:
+                return
+            finally:
+                parede += time.perf_counter() - inicio
+                cpu += time.process_time() - inicio_cpu
+            quantidade += 1
+            yield item
+    finally:
+        coletor.somar_fase('lexico', parede, cpu)
+        coletor.contar('tokens_lexico', quantidade)
+
+def _gerar_tokens(origem, lexer=None):
     if lexer is None:
         lexer = build()
-    lexer.input(input_text)
 
-    table = []
-    counts = Counter()
+    if not _eh_caminho(origem):
+        yield from _iter_lexer(lexer, origem)
+        return
+
+    if not isinstance(lexer, LexerRapido):
+        with open(origem, 'r', encoding='utf-8', errors='replace') as f:
+            yield from _iter_lexer(lexer, f.read())
+        return
+
+    with open(origem, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            lexer.input(mapa)
+            for linha, tipo, valor, _ in lexer.tuplas():
+                yield linha, tipo, valor
+
+def _iter_lexer(lexer, texto):
+    lexer.input(texto)
+    if isinstance(lexer, LexerRapido):
+        for linha, tipo, valor, _ in lexer.tuplas():
+            yield linha, tipo, valor
+        return
     while True:
         tok = lexer.token()
         if not tok:
             break
-        table.append((tok.lineno, tok.type, tok.value))
-        counts[tok.type] += 1
+        yield tok.lineno, tok.type, tok.value
+
+def lex_table(input_text, lexer=None):
+    table = []
+    counts = Counter()
+    for linha, tipo, valor in iter_tokens(input_text, lexer):
+        table.append((linha, tipo, valor))
+        counts[tipo] += 1
     return table, counts
 
-def exibir_analise_lexica(tabela, contagem):
-    print("\n" + "="*80)
-    print("ANÁLISE LÉXICA")
-    print("="*80)
-    
-    print(f"\n{'Linha':<8} {'Token':<25} {'Valor'}")
-    print("-" * 60)
+def exibir_analise_lexica(tabela, contagem=None):
+    # tabela pode ser uma lista ou o próprio iter_tokens(): as linhas são
+    # escritas à medida que chegam e a contagem é acumulada no caminho
+    relatorio = relatorios.atual()
+    with relatorio.bloco():
+        relatorio.texto("\n" + "="*80)
+        relatorio.texto("ANÁLISE LÉXICA")
+        relatorio.texto("="*80)
+
+        acumulada = emitir_tabela_tokens(relatorio, tabela, f"\n{'Linha':<8} {'Token':<25} {'Valor'}",
+                                         "-" * 60)
+        if contagem is None:
+            contagem = acumulada
+
+        relatorio.texto(f"\nTotal de tokens: {sum(acumulada.values())}")
+        relatorio.texto("\nContagem por tipo:")
+        relatorio.texto("-" * 40)
+        for tipo, qtd in sorted(contagem.items()):
+            relatorio.texto(f"  {tipo:<25}: {qtd}")
+        relatorio.registrar('contagem_tokens', total=sum(acumulada.values()), por_tipo=dict(sorted(contagem.items())))
+
+def emitir_tabela_tokens(relatorio, tabela, titulo, separador, recuo=""):
+    # Escreve a tabela de tokens (texto e/ou um registro por token) e devolve
+    # a contagem por tipo. Com relatorio.tabela_tokens False só conta.
+    acumulada = Counter()
+    if not relatorio.tabela_tokens:
+        for _, tipo, _ in tabela:
+            acumulada[tipo] += 1
+        return acumulada
+
+    relatorio.texto(titulo)
+    relatorio.texto(separador)
+    textual = relatorio.textual
+    registrar = relatorio.registrar if relatorio.estruturado else None
+    # As linhas vão ao escritor em lotes já unidos: uma chamada por lote
+    # em vez de uma por token
+    lote = []
     for linha, tipo, valor in tabela:
-        print(f"{linha:<8} {tipo:<25} {valor}")
-    
-    print(f"\nTotal de tokens: {len(tabela)}")
-    print("\nContagem por tipo:")
-    print("-" * 40)
-    for tipo, qtd in sorted(contagem.items()):
-        print(f"  {tipo:<25}: {qtd}")
+        if textual:
+            lote.append(f"{recuo}{linha:<8} {tipo:<25} {valor}")
+            if len(lote) >= relatorios.LIMITE_BUFFER:
+                relatorio.texto("\n".join(lote))
+                lote = []
+        if registrar:
+            registrar('token', linha=linha, token=tipo, valor=valor)
+        acumulada[tipo] += 1
+    if lote:
+        relatorio.texto("\n".join(lote))
+    return acumulada
 
 saida = [] # tabela de simbolos
\ No newline at end of file
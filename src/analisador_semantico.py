@@ -1,398 +1,557 @@
+import bisect
+import time
+
+from ast_nodes import Class, DataType, Enum, GenSet, Relation
+import metricas
+import relatorios
+import regras_semanticas
+from regras_semanticas import CLASSE, DATATYPE, ENUM, GENSET, RELACAO, RELATOR
+
+# Tipo do resultado -> nível do diagnóstico nos relatórios estruturados
+NIVEIS = {'OK': 'ok', 'ALERTA': 'alerta', 'INFO': 'info'}
+
 class AnalisadorSemantico:
-    def __init__(self, ast):
+    # Motor de regras: uma única passada sobre o modelo monta os índices e
+    # entrega cada nó às regras interessadas no seu tipo/estereótipo. As
+    # regras são avaliadas depois, com os índices completos.
+    #
+    # Cada unidade avaliada guarda as chaves do modelo que consultou
+    # (classe, filhos, gensets, relações, participação em relator); ao
+    # adicionar ou remover nós só as unidades que leram chaves afetadas
+    # são reavaliadas.
+    #
+    # Estereótipos circulam como códigos inteiros (simbolos.py): os índices
+    # por estereótipo, o despacho e as consultas usam o código do nó.
+    #
+    # Um modelo com `carregar(nome)` (modelo_mesclado.ModeloSobDemanda)
+    # recebe os nomes que obter_classe não encontra e devolve os nós dos
+    # imports que precisou ler; as consultas sobre gensets e relações, antes
+    # de responder que não há nenhum, pedem todos os imports que faltam
+    # (`carregar(None)`). Esses nós entram só nos índices: servem de
+    # contexto para as regras, mas não são avaliados nem reportados.
+    #
+    # Um modelo com `posicao(no)` (modelo_mesclado.ModeloMesclado) permite
+    # que os nós trocados depois da análise, ou recebidos antes dela
+    # (receber), entrem nos índices e nas unidades das regras no lugar em
+    # que uma análise completa os poria; sem ela, entram no fim.
+    def __init__(self, ast, regras=None):
         self.ast = ast
+        self._carregar = getattr(ast, 'carregar', None)
+        self._posicao = getattr(ast, 'posicao', None)
+        self._somente_indices = False
         self.resultados = []
+        self.regras = [classe_regra() for classe_regra in (regras or regras_semanticas.REGRAS)]
         
         self.classes_por_nome = {}
         self.classes_por_estereotipo = {}
         self.gensets_por_general = {}
         self.relacoes_por_classe = {}
         
-        self._construir_indices()
-    
-    def _construir_indices(self):
-        for cls in self.ast.classes:
-            self.classes_por_nome[cls['name']] = cls
-            
-            stereotype = cls['stereotype']
-            if stereotype not in self.classes_por_estereotipo:
-                self.classes_por_estereotipo[stereotype] = []
-            self.classes_por_estereotipo[stereotype].append(cls)
+        # Índices derivados, para que nenhum validador precise varrer o modelo
+        self.filhos_por_pai = {}
+        self.filhos_por_estereotipo_e_pai = {}
+        self.estereotipos_rel_por_classe = {}
+        self.estereotipos_internos_por_classe = {}
+        self.relatores_por_alvo = {}
+        self.specifics_disjoint_por_general = {}
+        # Todas as classes de cada nome; classes_por_nome aponta para a última
+        self._homonimos = {}
         
-        for genset in self.ast.gensets:
-            general = genset['general']
-            if general not in self.gensets_por_general:
-                self.gensets_por_general[general] = []
-            self.gensets_por_general[general].append(genset)
+        # Estado incremental
+        self._avaliado = False
+        self._recebendo = False
+        self._deps = None
+        # unidade -> resultados (dicts já montados)
+        self._resultados_unidade = {}
+        self._deps_unidade = {}
+        self._leitores = {}
+        self._sujas = set()
+        # Por regra: posição de cada unidade dentro do trecho da regra em
+        # self.resultados, e o tamanho desse trecho
+        self._posicoes = []
+        self._tamanhos = []
+        # Unidades novas entram no fim do trecho da regra; unidades removidas
+        # ou troca do INFO obrigam a remontar a lista
+        self._novas = []
+        self._estrutura_alterada = True
         
-        for rel in self.ast.relations:
-            domain = rel.get('domain')
-            range_cls = rel.get('range')
-            
-            if domain:
-                if domain not in self.relacoes_por_classe:
-                    self.relacoes_por_classe[domain] = []
-                self.relacoes_por_classe[domain].append(rel)
-            
-            if range_cls:
-                if range_cls not in self.relacoes_por_classe:
-                    self.relacoes_por_classe[range_cls] = []
-                self.relacoes_por_classe[range_cls].append(rel)
+        # Tempo da passada de indexação e de cada regra na última análise completa
+        self.tempo_indices = 0.0
+        self.tempos_regras = {}
+        
+        with metricas.atual().fase('semantico_indices'):
+            inicio = time.perf_counter()
+            self._montar_despacho()
+            self._construir_indices()
+            self.tempo_indices = time.perf_counter() - inicio
     
-    def _adicionar_resultado(self, tipo, padrao, mensagem):
-        self.resultados.append({
-            'tipo': tipo,
-            'padrao': padrao,
-            'mensagem': mensagem
-        })
+    def _montar_despacho(self):
+        # (tipo de nó, código do estereótipo) -> índices das regras; None vale para todos
+        self.despacho = {}
+        for indice, regra in enumerate(self.regras):
+            for interesse in regra.interesses:
+                self.despacho.setdefault(interesse, []).append(indice)
+        self._percorrer_datatypes = any(tipo == DATATYPE for tipo, _ in self.despacho)
+        self._percorrer_enums = any(tipo == ENUM for tipo, _ in self.despacho)
+        # Regras cujas unidades juntam nós de mais de um tipo (classes e
+        # relações, por exemplo)
+        self._regras_mistas = any(len({tipo for tipo, _ in regra.interesses}) > 1 for regra in self.regras)
     
-    def _obter_classes_especializando(self, classe_pai, estereotipo=None):
-        especializacoes = []
-        for cls in self.ast.classes:
-            if cls['specializes'] == classe_pai:
-                if estereotipo is None or cls['stereotype'] == estereotipo:
-                    especializacoes.append(cls)
-        return especializacoes
+    def _regras_interessadas(self, tipo, codigo):
+        indices = self.despacho.get((tipo, codigo), [])
+        if codigo is not None:
+            indices = indices + self.despacho.get((tipo, None), [])
+        return indices
     
-    def _obter_genset_para_classe(self, classe_nome):
-        return self.gensets_por_general.get(classe_nome, [])
+    def _despachar(self, tipo, codigo, no, entrando=True):
+        if self._somente_indices:
+            return
+        posicao = self._posicao if self._ordenar() else None
+        for indice in self._regras_interessadas(tipo, codigo):
+            regra = self.regras[indice]
+            antes = regra.encontrados
+            if entrando:
+                chave, mudou = regra.visitar(no, posicao)
+            else:
+                chave, mudou = regra.desvisitar(no, posicao)
+            # Passar de 0 para 1 nó (ou o contrário) troca o resultado INFO
+            if (antes == 0) != (regra.encontrados == 0):
+                self._estrutura_alterada = True
+            if regra.reordenada:
+                regra.reordenada = False
+                self._estrutura_alterada = True
+            if chave is None:
+                continue
+            if not mudou:
+                self._sujas.add((indice, chave))
+            elif entrando:
+                self._sujas.add((indice, chave))
+                self._novas.append((indice, chave))
+            else:
+                self._estrutura_alterada = True
+                self._descartar_unidade((indice, chave))
     
-    def _genset_tem_modificador(self, genset, modificador):
-        if genset['modifiers']:
-            return modificador in genset['modifiers']
-        return False
+    def _construir_indices(self):
+        for cls in self.ast.classes:
+            self._indexar_classe(cls)
+        for genset in self.ast.gensets:
+            self._indexar_genset(genset)
+        for rel in self.ast.relations:
+            self._indexar_relacao(rel)
+        
+        # Datatypes e enums só são percorridos se alguma regra os pedir
+        if self._percorrer_datatypes:
+            for datatype in self.ast.datatypes:
+                self._despachar(DATATYPE, None, datatype)
+        if self._percorrer_enums:
+            for enum in self.ast.enums:
+                self._despachar(ENUM, None, enum)
     
-    def _classe_tem_relacao_interna(self, classe, estereotipo_rel):
-        for rel in classe['internal_relations']:
-            if len(rel) > 1 and rel[1] == estereotipo_rel:
-                return True
-        return False
+    # Manutenção dos índices: cada _indexar_* tem o seu _desindexar_*
     
-    def _classe_participa_relacao_externa(self, classe_nome, estereotipo_rel=None):
-        relacoes = self.relacoes_por_classe.get(classe_nome, [])
-        if estereotipo_rel:
-            return any(rel.get('stereotype') == estereotipo_rel for rel in relacoes)
-        return len(relacoes) > 0
+    def _ordenar(self):
+        # Na montagem os nós chegam na ordem do modelo; depois dela (ou com
+        # o modelo chegando aos poucos), só a posição diz onde um nó entra
+        return (self._avaliado or self._recebendo) and self._posicao is not None
+    
+    def _inserir(self, lista, no):
+        if self._ordenar():
+            bisect.insort(lista, no, key=self._posicao)
+        else:
+            lista.append(no)
     
-    def validar_subkind_pattern(self):
-        subkinds = self.classes_por_estereotipo.get('subkind', [])
+    def _indexar_classe(self, cls):
+        homonimos = self._homonimos.setdefault(cls.name, [])
+        self._inserir(homonimos, cls)
+        self.classes_por_nome[cls.name] = homonimos[-1]
         
-        if not subkinds:
-            self._adicionar_resultado('INFO', 'Subkind', 'Nenhum Subkind Pattern encontrado.')
-            return
+        codigo = cls.codigo
+        if codigo not in self.classes_por_estereotipo:
+            self.classes_por_estereotipo[codigo] = []
+        self._inserir(self.classes_por_estereotipo[codigo], cls)
         
-        subkinds_por_pai = {}
-        for subkind in subkinds:
-            pai = subkind['specializes']
-            if pai:
-                if pai not in subkinds_por_pai:
-                    subkinds_por_pai[pai] = []
-                subkinds_por_pai[pai].append(subkind)
-        
-        for pai, lista_subkinds in subkinds_por_pai.items():
-            classe_pai = self.classes_por_nome.get(pai)
-            if not classe_pai or classe_pai['stereotype'] != 'kind':
-                self._adicionar_resultado(
-                    'ALERTA', 'Subkind',
-                    f"Subkind incompleto: '{lista_subkinds[0]['name']}' especializa '{pai}' que não é um kind."
-                )
-                continue
-            
-            gensets = self._obter_genset_para_classe(pai)
-            tem_genset_disjoint = False
-            
-            for genset in gensets:
-                specifics = genset['specifics']
-                subkind_names = [s['name'] for s in lista_subkinds]
-                if any(name in specifics for name in subkind_names):
-                    if self._genset_tem_modificador(genset, 'disjoint'):
-                        tem_genset_disjoint = True
-                        break
-            
-            if tem_genset_disjoint:
-                subkind_names = ', '.join([s['name'] for s in lista_subkinds])
-                self._adicionar_resultado(
-                    'OK', 'Subkind',
-                    f"Subkind completo: {subkind_names} -> {pai}"
-                )
-            else:
-                self._adicionar_resultado(
-                    'ALERTA', 'Subkind',
-                    f"Subkind incompleto: Subkinds de '{pai}' não possuem genset disjoint."
-                )
-    
-    def validar_role_pattern(self):
-        roles = self.classes_por_estereotipo.get('role', [])
+        pai = cls.specializes
+        if pai:
+            self._inserir(self.filhos_por_pai.setdefault(pai, []), cls)
+            por_pai = self.filhos_por_estereotipo_e_pai.setdefault(codigo, {})
+            self._inserir(por_pai.setdefault(pai, []), cls)
         
-        if not roles:
-            self._adicionar_resultado('INFO', 'Role', 'Nenhum Role Pattern encontrado.')
-            return
+        internos = self.estereotipos_internos_por_classe.setdefault(cls.name, set())
+        for rel in cls.internal_relations:
+            internos.add(rel.codigo)
+            # Qualquer relação interna de um relator conta como participação
+            # do alvo no relator (critério usado pelo Role Pattern)
+            if codigo == RELATOR:
+                self.relatores_por_alvo.setdefault(rel.target, []).append(cls.name)
         
-        for role in roles:
-            pai = role['specializes']
-            nome = role['name']
-            
-            if not pai:
-                self._adicionar_resultado(
-                    'ALERTA', 'Role',
-                    f"Role incompleto: '{nome}' não especializa nenhuma classe."
-                )
-                continue
-            
-            classe_pai = self.classes_por_nome.get(pai)
-            if not classe_pai or classe_pai['stereotype'] != 'kind':
-                if not classe_pai or classe_pai['stereotype'] != 'roleMixin':
-                    self._adicionar_resultado(
-                        'ALERTA', 'Role',
-                        f"Role incompleto: '{nome}' especializa '{pai}' que não é um kind ou roleMixin."
-                    )
-                    continue
-            
-            participa_material = self._classe_participa_relacao_externa(nome, 'material')
-            participa_mediation = self._classe_participa_relacao_externa(nome, 'mediation')
-            
-            participa_em_relator = False
-            for cls in self.ast.classes:
-                if cls['stereotype'] == 'relator':
-                    for rel in cls['internal_relations']:
-                        if len(rel) > 5 and rel[5] == nome:
-                            participa_em_relator = True
-                            break
-                        if len(rel) > 4 and rel[4] == nome:
-                            participa_em_relator = True
-                            break
-            
-            if participa_material or participa_mediation or participa_em_relator:
-                self._adicionar_resultado(
-                    'OK', 'Role',
-                    f"Role completo: {nome} -> {pai}"
-                )
-            else:
-                self._adicionar_resultado(
-                    'ALERTA', 'Role',
-                    f"Role incompleto: '{nome}' não participa de nenhuma relação material/mediada."
-                )
+        self._invalidar_classe(cls)
+        self._despachar(CLASSE, codigo, cls)
     
-    def validar_phase_pattern(self):
-        phases = self.classes_por_estereotipo.get('phase', [])
+    def _desindexar_classe(self, cls):
+        nome = cls.name
+        homonimos = self._homonimos[nome]
+        homonimos.remove(cls)
+        if homonimos:
+            self.classes_por_nome[nome] = homonimos[-1]
+            self.estereotipos_internos_por_classe[nome] = {
+                rel.codigo for outra in homonimos for rel in outra.internal_relations}
+        else:
+            del self._homonimos[nome]
+            del self.classes_por_nome[nome]
+            del self.estereotipos_internos_por_classe[nome]
         
-        if not phases:
-            self._adicionar_resultado('INFO', 'Phase', 'Nenhum Phase Pattern encontrado.')
-            return
+        codigo = cls.codigo
+        _retirar(self.classes_por_estereotipo, codigo, cls)
         
-        phases_por_pai = {}
-        for phase in phases:
-            pai = phase['specializes']
-            if pai:
-                if pai not in phases_por_pai:
-                    phases_por_pai[pai] = []
-                phases_por_pai[pai].append(phase)
-        
-        for pai, lista_phases in phases_por_pai.items():
-            classe_pai = self.classes_por_nome.get(pai)
-            if not classe_pai or classe_pai['stereotype'] != 'kind':
-                self._adicionar_resultado(
-                    'ALERTA', 'Phase',
-                    f"Phase incompleto: Phases de '{pai}' - '{pai}' não é um kind."
-                )
-                continue
-            
-            if len(lista_phases) < 2:
-                self._adicionar_resultado(
-                    'ALERTA', 'Phase',
-                    f"Phase incompleto: O kind '{pai}' tem apenas uma fase: {lista_phases[0]['name']}."
-                )
-                continue
-            
-            gensets = self._obter_genset_para_classe(pai)
-            tem_genset_disjoint = False
-            
-            for genset in gensets:
-                specifics = genset['specifics']
-                phase_names = [p['name'] for p in lista_phases]
-                if any(name in specifics for name in phase_names):
-                    if self._genset_tem_modificador(genset, 'disjoint'):
-                        tem_genset_disjoint = True
-                        break
-            
-            if tem_genset_disjoint:
-                phase_names = ', '.join([p['name'] for p in lista_phases])
-                self._adicionar_resultado(
-                    'OK', 'Phase',
-                    f"Phase completo: {phase_names} -> {pai}"
-                )
-            else:
-                self._adicionar_resultado(
-                    'ALERTA', 'Phase',
-                    f"Phase incompleto: Phases de '{pai}' não possuem genset disjoint (obrigatório)."
-                )
-    
-    def validar_relator_pattern(self):
-        relators = self.classes_por_estereotipo.get('relator', [])
+        pai = cls.specializes
+        if pai:
+            _retirar(self.filhos_por_pai, pai, cls)
+            _retirar(self.filhos_por_estereotipo_e_pai[codigo], pai, cls)
         
-        if not relators:
-            self._adicionar_resultado('INFO', 'Relator', 'Nenhum Relator Pattern encontrado.')
-            return
+        if codigo == RELATOR:
+            for rel in cls.internal_relations:
+                _retirar(self.relatores_por_alvo, rel.target, nome)
         
-        for relator in relators:
-            nome = relator['name']
-            
-            mediacoes_validas = 0
-            mediacoes_invalidas = []
-
-            for rel in relator['internal_relations']:
-                if len(rel) > 1 and rel[1] == 'mediation':
-                    nome_alvo = rel[5] if len(rel) > 5 else (rel[4] if len(rel) > 4 else None)
-
-                    if nome_alvo:
-                        classe_alvo = self.classes_por_nome.get(nome_alvo)
-                        if classe_alvo:
-                            est_alvo = classe_alvo.get('stereotype')
-                            if est_alvo == 'role':
-                                mediacoes_validas += 1
-                            else:
-                                mediacoes_invalidas.append(f"'{nome_alvo}' é {est_alvo}, não role")
-                        else:
-                            mediacoes_invalidas.append(f"'{nome_alvo}' não encontrada")
-            
-            if mediacoes_validas >= 2:
-                self._adicionar_resultado(
-                    'OK', 'Relator',
-                    f"Relator completo: {nome} possui {mediacoes_validas} mediações válidas (para roles)."
-                )
-            elif mediacoes_validas == 1:
-                self._adicionar_resultado(
-                    'ALERTA', 'Relator',
-                    f"Relator incompleto: '{nome}' possui apenas {mediacoes_validas} mediação válida (mínimo 2)."
-                )
-            elif mediacoes_invalidas:
-                erros = "; ".join(mediacoes_invalidas)
-                self._adicionar_resultado(
-                    'ALERTA', 'Relator',
-                    f"Relator incompleto: '{nome}' não possui mediações para roles. Problemas: {erros}."
-                )
-            else:
-                self._adicionar_resultado(
-                    'ALERTA', 'Relator',
-                    f"Relator incompleto: '{nome}' não possui mediações."
-                )
+        self._invalidar_classe(cls)
+        self._despachar(CLASSE, codigo, cls, entrando=False)
     
-    def validar_mode_pattern(self):
-        modes = self.classes_por_estereotipo.get('mode', [])
+    def _indexar_genset(self, genset):
+        general = genset.general
+        if general not in self.gensets_por_general:
+            self.gensets_por_general[general] = []
+        self._inserir(self.gensets_por_general[general], genset)
+        if self._genset_tem_modificador(genset, 'disjoint'):
+            self.specifics_disjoint_por_general.setdefault(general, []).append(set(genset.specifics))
         
-        if not modes:
-            self._adicionar_resultado('INFO', 'Mode', 'Nenhum Mode Pattern encontrado.')
-            return
+        self._invalidar(('gensets', general))
+        self._despachar(GENSET, None, genset)
+    
+    def _desindexar_genset(self, genset):
+        general = genset.general
+        _retirar(self.gensets_por_general, general, genset)
+        disjoint = [set(outro.specifics) for outro in self.gensets_por_general.get(general, [])
+                    if self._genset_tem_modificador(outro, 'disjoint')]
+        if disjoint:
+            self.specifics_disjoint_por_general[general] = disjoint
+        else:
+            self.specifics_disjoint_por_general.pop(general, None)
         
-        for mode in modes:
-            nome = mode['name']
-            
-            tem_characterization = False
-            tem_external_dependence = False
-            
-            for rel in mode['internal_relations']:
-                if len(rel) > 1:
-                    if rel[1] == 'characterization':
-                        tem_characterization = True
-                    if rel[1] == 'externalDependence':
-                        tem_external_dependence = True
-            
-            if tem_characterization and tem_external_dependence:
-                self._adicionar_resultado(
-                    'OK', 'Mode',
-                    f"Mode completo: {nome} possui characterization e externalDependence."
-                )
-            elif tem_characterization:
-                self._adicionar_resultado(
-                    'ALERTA', 'Mode',
-                    f"Mode incompleto: '{nome}' não possui relação de dependência externa."
-                )
-            elif tem_external_dependence:
-                self._adicionar_resultado(
-                    'ALERTA', 'Mode',
-                    f"Mode incompleto: '{nome}' não possui relação de characterization."
-                )
-            else:
-                self._adicionar_resultado(
-                    'ALERTA', 'Mode',
-                    f"Mode incompleto: '{nome}' não possui characterization nem externalDependence."
-                )
+        self._invalidar(('gensets', general))
+        self._despachar(GENSET, None, genset, entrando=False)
     
-    def validar_rolemixin_pattern(self):
-        rolemixins = self.classes_por_estereotipo.get('roleMixin', [])
+    def _indexar_relacao(self, rel):
+        domain = rel.domain
+        range_cls = rel.range
         
-        if not rolemixins:
-            self._adicionar_resultado('INFO', 'RoleMixin', 'Nenhum RoleMixin Pattern encontrado.')
-            return
+        if domain:
+            if domain not in self.relacoes_por_classe:
+                self.relacoes_por_classe[domain] = []
+            self._inserir(self.relacoes_por_classe[domain], rel)
+            self.estereotipos_rel_por_classe.setdefault(domain, set()).add(rel.codigo)
+            self._invalidar(('relacoes', domain))
         
-        for rolemixin in rolemixins:
-            nome = rolemixin['name']
-            
-            roles_especializando = self._obter_classes_especializando(nome, 'role')
-            
-            gensets = self._obter_genset_para_classe(nome)
-            roles_via_genset = []
-            for genset in gensets:
-                for specific in genset['specifics']:
-                    classe = self.classes_por_nome.get(specific)
-                    if classe and classe['stereotype'] == 'role':
-                        if classe not in roles_especializando and classe not in roles_via_genset:
-                            roles_via_genset.append(classe)
-            
-            todos_roles = roles_especializando + roles_via_genset
-            
-            if len(todos_roles) < 2:
-                self._adicionar_resultado(
-                    'ALERTA', 'RoleMixin',
-                    f"RoleMixin incompleto: '{nome}' não tem pelo menos 2 roles associados."
-                )
+        if range_cls:
+            if range_cls not in self.relacoes_por_classe:
+                self.relacoes_por_classe[range_cls] = []
+            self._inserir(self.relacoes_por_classe[range_cls], rel)
+            self.estereotipos_rel_por_classe.setdefault(range_cls, set()).add(rel.codigo)
+            self._invalidar(('relacoes', range_cls))
+        
+        self._despachar(RELACAO, rel.codigo, rel)
+    
+    def _desindexar_relacao(self, rel):
+        # Uma relação reflexiva aparece duas vezes na lista da mesma classe
+        for nome in (rel.domain, rel.range):
+            if not nome:
                 continue
-            
-            if gensets:
-                role_names = ', '.join([r['name'] for r in todos_roles])
-                self._adicionar_resultado(
-                    'OK', 'RoleMixin',
-                    f"RoleMixin completo: {nome} com roles: {role_names}"
-                )
+            _retirar(self.relacoes_por_classe, nome, rel)
+            restantes = self.relacoes_por_classe.get(nome)
+            if restantes:
+                self.estereotipos_rel_por_classe[nome] = {outra.codigo for outra in restantes}
             else:
-                self._adicionar_resultado(
-                    'ALERTA', 'RoleMixin',
-                    f"RoleMixin incompleto: '{nome}' não possui genset definido."
-                )
+                self.estereotipos_rel_por_classe.pop(nome, None)
+            self._invalidar(('relacoes', nome))
+        
+        self._despachar(RELACAO, rel.codigo, rel, entrando=False)
+    
+    # Dependências
+    
+    def _usar(self, chave):
+        if self._deps is not None:
+            self._deps.add(chave)
+    
+    def _invalidar(self, chave):
+        leitores = self._leitores.get(chave)
+        if leitores:
+            self._sujas.update(leitores)
+    
+    def _invalidar_classe(self, cls):
+        self._invalidar(('classe', cls.name))
+        if cls.specializes:
+            self._invalidar(('filhos', cls.specializes))
+        if cls.codigo == RELATOR:
+            for rel in cls.internal_relations:
+                self._invalidar(('relator_alvo', rel.target))
+    
+    def _descartar_unidade(self, unidade):
+        self._sujas.discard(unidade)
+        self._resultados_unidade.pop(unidade, None)
+        for chave in self._deps_unidade.pop(unidade, ()):
+            leitores = self._leitores[chave]
+            leitores.discard(unidade)
+            if not leitores:
+                del self._leitores[chave]
+    
+    def _avaliar_unidade(self, unidade):
+        # Devolve os resultados anteriores da unidade (ou None)
+        anteriores = self._resultados_unidade.get(unidade)
+        self._descartar_unidade(unidade)
+        indice, chave = unidade
+        regra = self.regras[indice]
+        self._deps = set()
+        try:
+            self._resultados_unidade[unidade] = [
+                {'tipo': tipo, 'padrao': regra.padrao, 'mensagem': mensagem}
+                for tipo, mensagem in regra.avaliar(chave, self)]
+        finally:
+            deps, self._deps = self._deps, None
+        self._deps_unidade[unidade] = deps
+        for dep in deps:
+            self._leitores.setdefault(dep, set()).add(unidade)
+        return anteriores
+    
+    def _adicionar_resultado(self, tipo, padrao, mensagem):
+        self.resultados.append({
+            'tipo': tipo,
+            'padrao': padrao,
+            'mensagem': mensagem
+        })
+    
+    # Consultas usadas pelas regras; cada uma registra a chave lida.
+    # Estereótipos são passados pelo código (regras_semanticas.KIND, ...)
+    
+    def _carregar_imports(self, nome=None):
+        # Devolve True se algum nó novo entrou nos índices
+        if self._carregar is None:
+            return False
+        novos = self._carregar(nome)
+        self._somente_indices = True
+        try:
+            for no in novos:
+                self._aplicar(no, entrando=True)
+        finally:
+            self._somente_indices = False
+        return bool(novos)
+    
+    def obter_classe(self, nome):
+        self._usar(('classe', nome))
+        classe = self.classes_por_nome.get(nome)
+        if classe is None and self._carregar_imports(nome):
+            classe = self.classes_por_nome.get(nome)
+        return classe
+    
+    def obter_classes_especializando(self, classe_pai, codigo=None):
+        self._usar(('filhos', classe_pai))
+        if codigo is None:
+            return list(self.filhos_por_pai.get(classe_pai, []))
+        return list(self.filhos_por_estereotipo_e_pai.get(codigo, {}).get(classe_pai, []))
+    
+    def obter_genset_para_classe(self, classe_nome):
+        self._usar(('gensets', classe_nome))
+        gensets = self.gensets_por_general.get(classe_nome, [])
+        if not gensets and self._carregar_imports():
+            gensets = self.gensets_por_general.get(classe_nome, [])
+        return gensets
+    
+    def _genset_tem_modificador(self, genset, modificador):
+        if genset.modifiers:
+            return modificador in genset.modifiers
+        return False
+    
+    def classe_tem_relacao_interna(self, classe, codigo_rel):
+        self._usar(('classe', classe.name))
+        return codigo_rel in self.estereotipos_internos_por_classe.get(classe.name, ())
+    
+    def _confirmar(self, consulta):
+        # Um "não" só vale depois de lidos todos os imports: algum deles pode
+        # declarar o genset ou a relação que falta
+        return consulta() or (self._carregar_imports() and consulta())
+    
+    def classe_participa_relacao_externa(self, classe_nome, codigo_rel=None):
+        self._usar(('relacoes', classe_nome))
+        if codigo_rel is not None:
+            return self._confirmar(lambda: codigo_rel in self.estereotipos_rel_por_classe.get(classe_nome, ()))
+        return self._confirmar(lambda: classe_nome in self.relacoes_por_classe)
+    
+    def participa_em_relator(self, classe_nome):
+        self._usar(('relator_alvo', classe_nome))
+        return self._confirmar(lambda: classe_nome in self.relatores_por_alvo)
+    
+    def tem_genset_disjoint(self, classe_pai, nomes):
+        # Algum genset disjoint de classe_pai cobre ao menos uma das classes?
+        self._usar(('gensets', classe_pai))
+        return self._confirmar(lambda: any(not specifics.isdisjoint(nomes)
+                                           for specifics in self.specifics_disjoint_por_general.get(classe_pai, [])))
+    
+    # Análise completa e incremental
     
     def analisar(self):
-        self.resultados = []
+        coletor = metricas.atual()
+        with coletor.fase('semantico'):
+            resultados = self._analisar()
+        coletor.registrar_regras(self.tempos_regras)
+        return resultados
+    
+    def _analisar(self):
+        self._sujas.clear()
+        self._novas.clear()
+        self.tempos_regras = {}
+        for indice, regra in enumerate(self.regras):
+            inicio = time.perf_counter()
+            for chave in list(regra.unidades):
+                self._avaliar_unidade((indice, chave))
+            self.tempos_regras[regra.padrao] = (self.tempos_regras.get(regra.padrao, 0.0)
+                                                + time.perf_counter() - inicio)
+        # Nós carregados sob demanda durante a passada afetam unidades já
+        # avaliadas
+        while self._sujas:
+            self._avaliar_unidade(self._sujas.pop())
+        self._avaliado = True
+        return self._montar_resultados()
+    
+    def receber(self, adicionados):
+        # Indexa nós que entraram no modelo antes da análise (um arquivo que
+        # acabou de chegar, em projeto.compilar_projeto) sem avaliar regras:
+        # a avaliação fica para analisar(), com os índices completos. Com os
+        # arquivos chegando em ordem, cada índice (de uma categoria só) já
+        # recebe os nós na ordem do modelo; só as regras mistas precisam da
+        # posição para ordenar as unidades como a montagem completa
+        if self._avaliado:
+            raise RuntimeError("receber só vale antes da análise; depois dela use atualizar")
+        with metricas.atual().fase('semantico_indices'):
+            inicio = time.perf_counter()
+            self._recebendo = self._regras_mistas
+            for no in adicionados:
+                self._aplicar(no, entrando=True)
+            self.tempo_indices += time.perf_counter() - inicio
+    
+    def atualizar(self, removidos=(), adicionados=()):
+        with metricas.atual().fase('semantico_incremental'):
+            return self._atualizar(removidos, adicionados)
+    
+    def _atualizar(self, removidos, adicionados):
+        # Aplica a troca de nós (Class, GenSet, Relation, DataType, Enum) e
+        # reavalia apenas as unidades afetadas. A AST original não é alterada.
+        # Um nó alterado é informado como removido (versão antiga) e
+        # adicionado (versão nova); os novos entram antes de os antigos
+        # saírem, para que a unidade de uma classe editada não desapareça.
+        for no in adicionados:
+            self._aplicar(no, entrando=True)
+        for no in removidos:
+            self._aplicar(no, entrando=False)
         
-        self.validar_subkind_pattern()
-        self.validar_role_pattern()
-        self.validar_phase_pattern()
-        self.validar_relator_pattern()
-        self.validar_mode_pattern()
-        self.validar_rolemixin_pattern()
+        if not self._avaliado:
+            return self.analisar()
         
+        reavaliadas = []
+        while self._sujas:
+            unidade = self._sujas.pop()
+            anteriores = self._avaliar_unidade(unidade)
+            if anteriores is not None:
+                if len(anteriores) != len(self._resultados_unidade[unidade]):
+                    self._estrutura_alterada = True
+                reavaliadas.append(unidade)
+        
+        if self._estrutura_alterada:
+            return self._montar_resultados()
+        
+        # Mesmo número de resultados por unidade: troca no lugar
+        for indice, chave in reavaliadas:
+            novos = self._resultados_unidade[(indice, chave)]
+            posicao = self._inicio_regra(indice) + self._posicoes[indice][chave]
+            self.resultados[posicao:posicao + len(novos)] = novos
+        
+        for indice, chave in self._novas:
+            novos = self._resultados_unidade[(indice, chave)]
+            posicao = self._inicio_regra(indice) + self._tamanhos[indice]
+            self.resultados[posicao:posicao] = novos
+            self._posicoes[indice][chave] = self._tamanhos[indice]
+            self._tamanhos[indice] += len(novos)
+        self._novas.clear()
+        return self.resultados
+    
+    def _inicio_regra(self, indice):
+        return sum(self._tamanhos[:indice])
+    
+    def _aplicar(self, no, entrando):
+        if isinstance(no, Class):
+            (self._indexar_classe if entrando else self._desindexar_classe)(no)
+        elif isinstance(no, GenSet):
+            (self._indexar_genset if entrando else self._desindexar_genset)(no)
+        elif isinstance(no, Relation):
+            (self._indexar_relacao if entrando else self._desindexar_relacao)(no)
+        elif isinstance(no, DataType):
+            if self._percorrer_datatypes:
+                self._despachar(DATATYPE, None, no, entrando)
+        elif isinstance(no, Enum):
+            if self._percorrer_enums:
+                self._despachar(ENUM, None, no, entrando)
+        else:
+            raise TypeError(f"Nó não suportado na análise incremental: {type(no).__name__}")
+    
+    def resultados_por_unidade(self):
+        # (nós da unidade, resultados dela) na ordem do relatório; o INFO de
+        # padrão ausente não pertence a nenhuma unidade e fica de fora
+        for indice, regra in enumerate(self.regras):
+            for chave, nos in regra.unidades.items():
+                yield nos, self._resultados_unidade[(indice, chave)]
+    
+    def _montar_resultados(self):
+        self.resultados = []
+        self._posicoes = []
+        self._tamanhos = []
+        for indice, regra in enumerate(self.regras):
+            inicio = len(self.resultados)
+            posicoes = {}
+            if not regra.encontrados:
+                if regra.mensagem_ausente:
+                    self._adicionar_resultado('INFO', regra.padrao, regra.mensagem_ausente)
+            else:
+                resultados_unidade = self._resultados_unidade
+                for chave in regra.unidades:
+                    posicoes[chave] = len(self.resultados) - inicio
+                    self.resultados.extend(resultados_unidade[(indice, chave)])
+            self._posicoes.append(posicoes)
+            self._tamanhos.append(len(self.resultados) - inicio)
+        self._novas.clear()
+        self._estrutura_alterada = False
         return self.resultados
     
     def gerar_relatorio(self):
+        if not self.resultados:
+            self.analisar()
+        relatorio = relatorios.atual()
+        with relatorio.bloco():
+            self._escrever_relatorio(relatorio)
+
+    def _escrever_relatorio(self, relatorio):
         LARGURA = 80
         
         def linha(char="="):
             return char * LARGURA
         
         def cabecalho(titulo):
-            print("\n" + linha())
-            print(titulo.center(LARGURA))
-            print(linha())
+            relatorio.texto("\n" + linha())
+            relatorio.texto(titulo.center(LARGURA))
+            relatorio.texto(linha())
         
         def subcabecalho(titulo):
-            print("\n" + linha("-"))
-            print(titulo)
-            print(linha("-"))
+            relatorio.texto("\n" + linha("-"))
+            relatorio.texto(titulo)
+            relatorio.texto(linha("-"))
         
         cabecalho("ANÁLISE SEMÂNTICA")
-        print("Validação de Padrões de Projeto de Ontologia".center(LARGURA))
-        
-        if not self.resultados:
-            self.analisar()
+        relatorio.texto("Validação de Padrões de Projeto de Ontologia".center(LARGURA))
         
         contadores = {'OK': 0, 'ALERTA': 0, 'INFO': 0}
         
@@ -404,32 +563,50 @@ class AnalisadorSemantico:
             contadores[tipo] += 1
             
             if tipo == 'OK':
-                print(f"\n  [OK]     {mensagem}")
+                relatorio.texto(f"\n  [OK]     {mensagem}")
             elif tipo == 'ALERTA':
-                print(f"\n  [ALERTA] {mensagem}")
+                relatorio.texto(f"\n  [ALERTA] {mensagem}")
             else:
-                print(f"\n  [INFO]   {mensagem}")
+                relatorio.texto(f"\n  [INFO]   {mensagem}")
+            relatorio.diagnostico('semantico', NIVEIS[tipo], mensagem, regra=resultado['padrao'])
         
         subcabecalho("RESUMO")
         
         total = contadores['OK'] + contadores['ALERTA']
-        print(f"\n  {'CATEGORIA':<25} {'QTD':>5}")
-        print("  " + "-" * 32)
-        print(f"  {'Padrões completos':<25} {contadores['OK']:>5}")
-        print(f"  {'Padrões incompletos':<25} {contadores['ALERTA']:>5}")
-        print(f"  {'Padrões ausentes':<25} {contadores['INFO']:>5}")
-        print("  " + "-" * 32)
-        print(f"  {'Total analisado':<25} {total:>5}")
-        
-        print("\n" + linha())
+        relatorio.texto(f"\n  {'CATEGORIA':<25} {'QTD':>5}")
+        relatorio.texto("  " + "-" * 32)
+        relatorio.texto(f"  {'Padrões completos':<25} {contadores['OK']:>5}")
+        relatorio.texto(f"  {'Padrões incompletos':<25} {contadores['ALERTA']:>5}")
+        relatorio.texto(f"  {'Padrões ausentes':<25} {contadores['INFO']:>5}")
+        relatorio.texto("  " + "-" * 32)
+        relatorio.texto(f"  {'Total analisado':<25} {total:>5}")
+        relatorio.registrar('resumo_semantico', completos=contadores['OK'], incompletos=contadores['ALERTA'],
+                            ausentes=contadores['INFO'], total=total)
+        
+        relatorio.texto("\n" + linha())
         if contadores['ALERTA'] == 0 and contadores['OK'] > 0:
-            print("Análise semântica concluída com sucesso.".center(LARGURA))
+            relatorio.texto("Análise semântica concluída com sucesso.".center(LARGURA))
         elif contadores['ALERTA'] > 0:
-            print("Análise semântica concluída com alertas.".center(LARGURA))
+            relatorio.texto("Análise semântica concluída com alertas.".center(LARGURA))
         else:
-            print("Análise semântica concluída.".center(LARGURA))
-        print(linha())
+            relatorio.texto("Análise semântica concluída.".center(LARGURA))
+        relatorio.texto(linha())
+
+
+def _retirar(indice, chave, valor):
+    # Remove valor da lista indice[chave], apagando a chave quando esvazia
+    lista = indice[chave]
+    lista.remove(valor)
+    if not lista:
+        del indice[chave]
 
+def nos_do_modelo(ast):
+    # Nós aceitos por AnalisadorSemantico.atualizar
+    yield from ast.classes
+    yield from ast.gensets
+    yield from ast.relations
+    yield from ast.datatypes
+    yield from ast.enums
 
 def analisar(ast):
     analisador = AnalisadorSemantico(ast)
@@ -1,5 +1,13 @@
+import copy
+import functools
+import os
+
 import ply.yacc as yacc
 import analisador_lexico
+import metricas
+import relatorios
+import simbolos
+from ast_nodes import Attribute, Cardinality, Class, DataType, Enum, GenSet, InternalRelation, Relation
 
 tokens = analisador_lexico.tokens
 
@@ -13,7 +21,9 @@ class OntologyAST:
         self.enums = []
         self.gensets = []
         self.relations = []
+        self.imports = []
         self.errors = []
+        self.lex_errors = []
     
     def add_error(self, line, message, suggestion=""):
         self.errors.append({
@@ -22,6 +32,21 @@ class OntologyAST:
             'suggestion': suggestion
         })
 
+    CAMPOS = ('package_name', 'imports', 'classes', 'datatypes', 'enums', 'gensets', 'relations',
+              'errors', 'lex_errors')
+
+    def to_dict(self):
+        # Forma compacta (sem a árvore de derivação) usada para enviar a AST
+        # entre processos e gravá-la em disco.
+        return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+    @classmethod
+    def from_dict(cls, dados):
+        ast = cls()
+        for campo in cls.CAMPOS:
+            setattr(ast, campo, dados[campo])
+        return ast
+
 ast = OntologyAST()
 
 def p_program(p):
@@ -29,6 +54,7 @@ def p_program(p):
                | import_list package_declaration
                | package_declaration content_list
                | package_declaration'''
+    ast = p.parser.ast
 
     # Caso: import_list package_declaration content_list
     if len(p) == 4 and isinstance(p[1], list):
@@ -71,14 +97,15 @@ def p_import_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
-
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_content_list(p):
     '''content_list : content_list content
                     | content'''
     if len(p) == 3:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         p[0] = [p[1]]
 
@@ -97,11 +124,10 @@ def p_internal_relation_named(p):
 
     if len(p) == 10:
         # @mediation -- name -- [card] Class
-        p[0] = ('internal_relation', p[2], p[5], p[8], p[9])
+        p[0] = InternalRelation(p[2], p[5], None, '--', p[8], p[9])
     else:
         # -- name -- [card] Class
-        p[0] = ('internal_relation', None, p[3], p[5], p[6])
-
+        p[0] = InternalRelation(None, p[3], None, '--', p[6], p[7])
 
 def p_content(p):
     '''content : class_declaration
@@ -120,7 +146,7 @@ def p_content(p):
         # Pula o erro e continua com a próxima declaração (p[2])
         # A função p_error já registrou o erro.
         if p[2] is not None:
-            print(f"[AVISO SINTÁTICO] Recuperação de erro. Continuando a análise a partir da próxima declaração.")
+            relatorios.atual().texto(f"[AVISO SINTÁTICO] Recuperação de erro. Continuando a análise a partir da próxima declaração.")
             p[0] = p[2]
         else:
             # Caso a próxima declaração também seja None (fim do arquivo ou erro grave)
@@ -134,44 +160,16 @@ def p_class_declaration(p):
                          | EST_CLASS CLASS_NAME LBRACE RBRACE
                          | EST_CLASS CLASS_NAME SPECIALIZES CLASS_NAME
                          | EST_CLASS CLASS_NAME'''
+    ast = p.parser.ast
     if len(p) == 6:
-        p[0] = ('class', p[1], p[2], p[4])
-        attributes = [item for item in p[4] if item[0] == 'attribute']
-        internal_rels = [item for item in p[4] if item[0] == 'internal_relation']
-        ast.classes.append({
-            'stereotype': p[1],
-            'name': p[2],
-            'attributes': attributes,
-            'internal_relations': internal_rels,
-            'specializes': None
-        })
+        attributes = [item for item in p[4] if isinstance(item, Attribute)]
+        internal_rels = [item for item in p[4] if isinstance(item, InternalRelation)]
+        p[0] = Class(p[1], p[2], attributes, internal_rels)
     elif len(p) == 5 and p[3] == 'specializes':
-        p[0] = ('class_specializes', p[1], p[2], p[4])
-        ast.classes.append({
-            'stereotype': p[1],
-            'name': p[2],
-            'attributes': [],
-            'internal_relations': [],
-            'specializes': p[4]
-        })
-    elif len(p) == 5:
-        p[0] = ('class', p[1], p[2], [])
-        ast.classes.append({
-            'stereotype': p[1],
-            'name': p[2],
-            'attributes': [],
-            'internal_relations': [],
-            'specializes': None
-        })
+        p[0] = Class(p[1], p[2], specializes=p[4])
     else:
-        p[0] = ('class', p[1], p[2], [])
-        ast.classes.append({
-            'stereotype': p[1],
-            'name': p[2],
-            'attributes': [],
-            'internal_relations': [],
-            'specializes': None
-        })
+        p[0] = Class(p[1], p[2])
+    ast.classes.append(p[0])
 
 def p_class_body(p):
     '''class_body : class_body_item
@@ -179,7 +177,8 @@ def p_class_body(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_class_body_item(p):
     '''class_body_item : attribute
@@ -195,10 +194,9 @@ def p_attribute(p):
                  | NATIVE_NUMBER COLON type cardinality_opt metadata_block
     '''
     if len(p) == 5:
-        p[0] = ('attribute', p[1], p[3], p[4], None)
+        p[0] = Attribute(p[1], p[3], p[4])
     else:
-        p[0] = ('attribute', p[1], p[3], p[4], p[5])
-
+        p[0] = Attribute(p[1], p[3], p[4], p[5])
 
 def p_type(p):
     '''type : NATIVE_STRING
@@ -210,11 +208,11 @@ def p_type(p):
             | CLASS_NAME
             | RELATION_NAME
             | ID'''
-    p[0] = ('type', p[1])
+    p[0] = p[1]
 
 def p_metadata_block(p):
     '''metadata_block : LBRACE metadata_list RBRACE'''
-    p[0] = ('metadata', p[2])
+    p[0] = p[2]
 
 def p_metadata_list(p):
     '''metadata_list : metadata_item
@@ -222,7 +220,8 @@ def p_metadata_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_metadata_item(p):
     '''metadata_item : META_CONST
@@ -236,25 +235,19 @@ def p_internal_relation(p):
     '''internal_relation : ARROBA EST_REL cardinality relation_symbol cardinality CLASS_NAME
                          | EST_REL cardinality relation_symbol cardinality CLASS_NAME'''
     if len(p) == 7:
-        p[0] = ('internal_relation', p[2], p[3], p[4], p[5], p[6])
+        p[0] = InternalRelation(p[2], None, p[3], p[4], p[5], p[6])
     else:
-        p[0] = ('internal_relation', p[1], p[2], p[3], p[4], p[5])
+        p[0] = InternalRelation(p[1], None, p[2], p[3], p[4], p[5])
 
 def p_datatype_declaration(p):
     '''datatype_declaration : DATATYPE CLASS_NAME LBRACE attribute_list RBRACE
                             | DATATYPE CLASS_NAME LBRACE RBRACE'''
+    ast = p.parser.ast
     if len(p) == 6:
-        p[0] = ('datatype', p[2], p[4])
-        ast.datatypes.append({
-            'name': p[2],
-            'attributes': p[4]
-        })
+        p[0] = DataType(p[2], p[4])
     else:
-        p[0] = ('datatype', p[2], [])
-        ast.datatypes.append({
-            'name': p[2],
-            'attributes': []
-        })
+        p[0] = DataType(p[2])
+    ast.datatypes.append(p[0])
 
 def p_attribute_list(p):
     '''attribute_list : attribute
@@ -262,23 +255,18 @@ def p_attribute_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_enum_declaration(p):
     '''enum_declaration : ENUM CLASS_NAME LBRACE instance_list RBRACE
                         | ENUM CLASS_NAME LBRACE RBRACE'''
+    ast = p.parser.ast
     if len(p) == 6:
-        p[0] = ('enum', p[2], p[4])
-        ast.enums.append({
-            'name': p[2],
-            'instances': p[4]
-        })
+        p[0] = Enum(p[2], p[4])
     else:
-        p[0] = ('enum', p[2], [])
-        ast.enums.append({
-            'name': p[2],
-            'instances': []
-        })
+        p[0] = Enum(p[2])
+    ast.enums.append(p[0])
 
 def p_instance_list(p):
     '''instance_list : instance_name
@@ -286,10 +274,9 @@ def p_instance_list(p):
                      | instance_list instance_name'''
     if len(p) == 2:
         p[0] = [p[1]]
-    elif len(p) == 4:
-        p[0] = p[1] + [p[3]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[len(p) - 1])
+        p[0] = p[1]
 
 def p_instance_name(p):
     '''instance_name : INSTANCE
@@ -301,39 +288,17 @@ def p_genset_declaration(p):
                           | GENSET CLASS_NAME WHERE class_list SPECIALIZES CLASS_NAME
                           | GENSET CLASS_NAME LBRACE GENERAL CLASS_NAME SPECIFICS class_list RBRACE
                           | modifiers GENSET CLASS_NAME LBRACE GENERAL CLASS_NAME SPECIFICS class_list RBRACE'''
+    ast = p.parser.ast
     
     if len(p) == 10:
-        p[0] = ('genset_block', p[3], p[1], p[6], p[8])
-        ast.gensets.append({
-            'name': p[3],
-            'modifiers': p[1],
-            'general': p[6],
-            'specifics': p[8]
-        })
+        p[0] = GenSet(p[3], p[1], p[6], p[8])
     elif len(p) == 9:
-        p[0] = ('genset_block', p[2], None, p[5], p[7])
-        ast.gensets.append({
-            'name': p[2],
-            'modifiers': None,
-            'general': p[5],
-            'specifics': p[7]
-        })
+        p[0] = GenSet(p[2], None, p[5], p[7])
     elif len(p) == 8:
-        p[0] = ('genset', p[3], p[1], p[7], p[5])
-        ast.gensets.append({
-            'name': p[3],
-            'modifiers': p[1],
-            'general': p[7],
-            'specifics': p[5]
-        })
+        p[0] = GenSet(p[3], p[1], p[7], p[5])
     else:
-        p[0] = ('genset', p[2], None, p[6], p[4])
-        ast.gensets.append({
-            'name': p[2],
-            'modifiers': None,
-            'general': p[6],
-            'specifics': p[4]
-        })
+        p[0] = GenSet(p[2], None, p[6], p[4])
+    ast.gensets.append(p[0])
 
 def p_modifiers(p):
     '''modifiers : DISJOINT COMPLETE
@@ -351,59 +316,24 @@ def p_class_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_relation_declaration(p):
     '''relation_declaration : ARROBA EST_REL RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME
                             | RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME
                             | RELATION CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAME
                             | CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAME'''
+    ast = p.parser.ast
     if len(p) == 9 and p[1] == '@':
-        p[0] = ('relation', p[2], p[4], p[5], p[6], p[7], p[8])
-        ast.relations.append({
-            'stereotype': p[2],
-            'domain': p[4],
-            'domain_card': p[5],
-            'symbol': p[6],
-            'range_card': p[7],
-            'range': p[8],
-            'name': None
-        })
-    elif len(p) == 8 and p[3] == '[':
-        p[0] = ('relation', None, p[2], p[3], p[4], p[5], p[6])
-        ast.relations.append({
-            'stereotype': None,
-            'domain': p[2],
-            'domain_card': p[3],
-            'symbol': p[4],
-            'range_card': p[5],
-            'range': p[6],
-            'name': None
-        })
+        p[0] = Relation(p[2], None, p[4], p[5], p[6], p[7], p[8])
+    elif len(p) == 7:
+        p[0] = Relation(None, None, p[2], p[3], p[4], p[5], p[6])
     elif len(p) == 9:
-        p[0] = ('relation_named', None, p[2], p[3], p[4], p[5], p[6], p[7], p[8])
-        ast.relations.append({
-            'stereotype': None,
-            'domain': p[2],
-            'domain_card': p[3],
-            'symbol': p[4],
-            'name': p[5],
-            'symbol2': p[6],
-            'range_card': p[7],
-            'range': p[8]
-        })
+        p[0] = Relation(None, p[5], p[2], p[3], p[4], p[7], p[8], symbol2=p[6])
     else:
-        p[0] = ('relation_named', None, p[1], p[2], p[3], p[4], p[5], p[6], p[7])
-        ast.relations.append({
-            'stereotype': None,
-            'domain': p[1],
-            'domain_card': p[2],
-            'symbol': p[3],
-            'name': p[4],
-            'symbol2': p[5],
-            'range_card': p[6],
-            'range': p[7]
-        })
+        p[0] = Relation(None, p[4], p[1], p[2], p[3], p[6], p[7], symbol2=p[5])
+    ast.relations.append(p[0])
 
 def p_cardinality(p):
     '''cardinality : LBRACKET NUMBER DOT DOT ASTERISCO RBRACKET
@@ -411,13 +341,11 @@ def p_cardinality(p):
                    | LBRACKET NUMBER DOT DOT NUMBER RBRACKET
                    | LBRACKET ASTERISCO RBRACKET'''
     if len(p) == 7:
-        p[0] = ('cardinality', p[2], '*')
-    elif len(p) == 4:
-        p[0] = ('cardinality', p[2], p[2])
-    elif len(p) == 7 and isinstance(p[5], int):
-        p[0] = ('cardinality', p[2], p[5])
+        # [n..*] ou [n..m]: p[5] é '*' ou o limite superior
+        p[0] = Cardinality(p[2], p[5])
     else:
-        p[0] = ('cardinality', '*', '*')
+        # [n] ou [*]
+        p[0] = Cardinality(p[2], p[2])
 
 def p_relation_symbol(p):
     '''relation_symbol : HYPHEN HYPHEN
@@ -438,7 +366,66 @@ def p_empty(p):
     p[0] = None
 
 
-def p_error(p):
+# Erros (léxicos + sintáticos) por arquivo antes de interromper a análise;
+# 0 desliga o limite. Via ambiente para valer também nos processos do pool.
+MAX_ERROS = int(os.environ.get('TONTO_MAX_ERROS', 100))
+
+# Tokens que só aparecem no início de uma declaração de topo: o modo pânico
+# descarta tudo até um deles. `@` também abre uma declaração quando vem
+# seguido de `estereótipo relation` (as relações internas não têm o relation)
+SINCRONIA = frozenset(('EST_CLASS', 'DATATYPE', 'ENUM', 'GENSET', 'DISJOINT', 'COMPLETE', 'RELATION'))
+PREFIXO_RELACAO = ('EST_REL', 'RELATION')
+
+class _FluxoTokens:
+    # Tokens do lexer entregues ao parser, com devolução: o modo pânico olha
+    # alguns tokens à frente e devolve os que não descartou
+    def __init__(self, proximo):
+        self._proximo = proximo
+        self._devolvidos = []
+
+    def __call__(self):
+        if self._devolvidos:
+            return self._devolvidos.pop()
+        return self._proximo()
+
+    def devolver(self, tokens):
+        # tokens na ordem em que devem ser lidos de novo
+        self._devolvidos.extend(reversed(tokens))
+
+def _abre_declaracao(parser, tok):
+    if tok.type in SINCRONIA:
+        return True
+    if tok.type != 'ARROBA':
+        return False
+    seguintes = []
+    for _ in PREFIXO_RELACAO:
+        proximo = parser.token()
+        if proximo is None:
+            break
+        seguintes.append(proximo)
+    parser.fluxo.devolver(seguintes)
+    return tuple(proximo.type for proximo in seguintes) == PREFIXO_RELACAO
+
+def _sincronizar(parser, p):
+    # Modo pânico: descarta os tokens até a próxima declaração de topo e põe
+    # esse token no lugar do que causou o erro; a regra `content : error
+    # content` continua dali, sem uma cascata de erros no meio do caminho.
+    # Um `@estereótipo relation` é mantido inteiro, com o estereótipo
+    if _abre_declaracao(parser, p):
+        return
+    while True:
+        tok = parser.token()
+        if tok is None:
+            p.type = '$end'
+            return
+        if _abre_declaracao(parser, tok):
+            p.type, p.value, p.lineno, p.lexpos = tok.type, tok.value, tok.lineno, tok.lexpos
+            return
+
+def registrar_erro_sintatico(ast, p, parser=None, limite=None):
+    # parser e limite vêm do MotorSintatico: com eles há sincronização em
+    # modo pânico e interrupção ao atingir o limite de erros
+    relatorio = relatorios.atual()
     if p:
         error_msg = f"Token inesperado '{p.value}' (Tipo: {p.type})"
         suggestion = ""
@@ -453,14 +440,26 @@ def p_error(p):
         elif p.type == 'RBRACE':
             suggestion = "Pode estar faltando um atributo, relação ou vírgula."
         
-        ast.add_error(p.lineno, error_msg, suggestion)
-        print(f"[ERRO] Linha {p.lineno}: {error_msg}")
-        if suggestion:
-            print(f"  → Sugestão: {suggestion}")
+        anterior = ast.errors[-1] if ast.errors else None
+        if anterior is None or anterior['line'] != p.lineno or anterior['message'] != error_msg:
+            # O mesmo erro na mesma linha (recuperação que volta ao mesmo
+            # token) é registrado uma vez
+            ast.add_error(p.lineno, error_msg, suggestion)
+            relatorio.texto(f"[ERRO] Linha {p.lineno}: {error_msg}")
+            if suggestion:
+                relatorio.texto(f"  → Sugestão: {suggestion}")
+            analisador_lexico.verificar_limite_erros(limite, p.lineno, ast.errors, ast.lex_errors)
+        if parser is not None:
+            _sincronizar(parser, p)
     else:
         ast.add_error(-1, "Fim inesperado do arquivo", "Verifique se todas as chaves e parênteses foram fechados.")
-        print("[ERRO] Fim inesperado do arquivo")
-        print("  → Sugestão: Verifique se todas as chaves e parênteses foram fechados.")
+        relatorio.texto("[ERRO] Fim inesperado do arquivo")
+        relatorio.texto("  → Sugestão: Verifique se todas as chaves e parênteses foram fechados.")
+
+def p_error(p):
+    # Cada parse do MotorSintatico troca esta função por registrar_erro_sintatico
+    # ligada à AST da própria chamada; aqui fica só o registro exigido pelo yacc.
+    registrar_erro_sintatico(ast, p)
 
 LARGURA = 80
 
@@ -468,132 +467,154 @@ def _linha(char="="):
     return char * LARGURA
 
 def _cabecalho(titulo):
-    print("\n" + _linha())
-    print(titulo.center(LARGURA))
-    print(_linha())
+    relatorio = relatorios.atual()
+    relatorio.texto("\n" + _linha())
+    relatorio.texto(titulo.center(LARGURA))
+    relatorio.texto(_linha())
 
 def _subcabecalho(titulo):
-    print("\n" + _linha("-"))
-    print(titulo)
-    print(_linha("-"))
+    relatorio = relatorios.atual()
+    relatorio.texto("\n" + _linha("-"))
+    relatorio.texto(titulo)
+    relatorio.texto(_linha("-"))
 
-def exibir_analise_sintatica():
-    _cabecalho("ANÁLISE SINTÁTICA")
-    gerar_tabela_sintese()
-    gerar_relatorio_erros()
+def _ast_ou_ultima(arvore):
+    return arvore if arvore is not None else ast
 
-def gerar_tabela_sintese():
+def exibir_analise_sintatica(ast=None):
+    _cabecalho("ANÁLISE SINTÁTICA")
+    gerar_tabela_sintese(ast)
+    gerar_relatorio_erros(ast)
+
+def gerar_tabela_sintese(ast=None):
+    ast = _ast_ou_ultima(ast)
+    relatorio = relatorios.atual()
+    with relatorio.bloco():
+        _escrever_tabela_sintese(ast, relatorio)
+        if relatorio.estruturado:
+            _registrar_sintese(ast, relatorio)
+
+def _escrever_tabela_sintese(ast, relatorio):
     _cabecalho("ANÁLISE SINTÁTICA")
     
     _subcabecalho("INFORMAÇÕES DO PACOTE")
-    print(f"\n  Pacote: {ast.package_name if ast.package_name else 'Não definido'}")
+    relatorio.texto(f"\n  Pacote: {ast.package_name if ast.package_name else 'Não definido'}")
     
     _subcabecalho(f"CLASSES ({len(ast.classes)})")
     if ast.classes:
         for cls in ast.classes:
-            specializes_info = f" -> {cls['specializes']}" if cls['specializes'] else ""
-            attrs_count = len(cls['attributes'])
-            rels_count = len(cls['internal_relations'])
-            print(f"\n  [{cls['stereotype']}] {cls['name']}{specializes_info}")
+            specializes_info = f" -> {cls.specializes}" if cls.specializes else ""
+            attrs_count = len(cls.attributes)
+            rels_count = len(cls.internal_relations)
+            relatorio.texto(f"\n  [{cls.stereotype}] {cls.name}{specializes_info}")
             
             if attrs_count > 0:
-                print(f"    Atributos ({attrs_count}):")
-                for attr in cls['attributes']:
-                    attr_name = attr[1]
-                    attr_type = attr[2][1] if attr[2] else "?"
-                    metadata = f" {attr[3]}" if attr[3] else ""
-                    print(f"      - {attr_name}: {attr_type}{metadata}")
+                relatorio.texto(f"    Atributos ({attrs_count}):")
+                for attr in cls.attributes:
+                    attr_type = attr.type if attr.type else "?"
+                    metadata = f" {attr.cardinality}" if attr.cardinality else ""
+                    relatorio.texto(f"      - {attr.name}: {attr_type}{metadata}")
             
             if rels_count > 0:
-                print(f"    Relações internas ({rels_count}):")
-                for rel in cls['internal_relations']:
-                    stereotype = f"@{rel[1]}" if rel[1] else ""
-                    target = rel[5] if len(rel) > 5 else (rel[4] if len(rel) > 4 else "?")
-                    print(f"      - {stereotype} -> {target}")
+                relatorio.texto(f"    Relações internas ({rels_count}):")
+                for rel in cls.internal_relations:
+                    stereotype = f"@{rel.stereotype}" if rel.stereotype else ""
+                    relatorio.texto(f"      - {stereotype} -> {rel.target}")
     else:
-        print("\n  Nenhuma classe encontrada.")
+        relatorio.texto("\n  Nenhuma classe encontrada.")
     
     _subcabecalho(f"TIPOS DE DADOS ({len(ast.datatypes)})")
     if ast.datatypes:
         for dt in ast.datatypes:
-            attrs_count = len(dt['attributes'])
-            print(f"\n  {dt['name']}")
+            attrs_count = len(dt.attributes)
+            relatorio.texto(f"\n  {dt.name}")
             if attrs_count > 0:
-                for attr in dt['attributes']:
-                    attr_name = attr[1]
-                    attr_type = attr[2][1] if attr[2] else "?"
-                    print(f"    - {attr_name}: {attr_type}")
+                for attr in dt.attributes:
+                    attr_type = attr.type if attr.type else "?"
+                    relatorio.texto(f"    - {attr.name}: {attr_type}")
     else:
-        print("\n  Nenhum tipo de dado customizado.")
+        relatorio.texto("\n  Nenhum tipo de dado customizado.")
     
     _subcabecalho(f"ENUMERAÇÕES ({len(ast.enums)})")
     if ast.enums:
         for enum in ast.enums:
-            instances_str = ", ".join(enum['instances']) if enum['instances'] else "vazio"
-            print(f"\n  {enum['name']}: {instances_str}")
+            instances_str = ", ".join(enum.instances) if enum.instances else "vazio"
+            relatorio.texto(f"\n  {enum.name}: {instances_str}")
     else:
-        print("\n  Nenhuma enumeração encontrada.")
+        relatorio.texto("\n  Nenhuma enumeração encontrada.")
     
     _subcabecalho(f"RELAÇÕES EXTERNAS ({len(ast.relations)})")
     if ast.relations:
         for rel in ast.relations:
-            stereotype = f"@{rel.get('stereotype')} " if rel.get('stereotype') else ""
-            domain = rel.get('domain', '?')
-            range_cls = rel.get('range', '?')
-            name = rel.get('name', '')
-            name_str = f" -- {name} -- " if name else " -- "
-            
-            domain_card = rel.get('domain_card', '')
-            if isinstance(domain_card, tuple):
-                card_str = f"[{domain_card[1]}..{domain_card[2]}]"
-            else:
-                card_str = str(domain_card)
-            
-            range_card = rel.get('range_card', '')
-            if isinstance(range_card, tuple):
-                range_card_str = f"[{range_card[1]}..{range_card[2]}]"
-            else:
-                range_card_str = str(range_card)
-            
-            print(f"\n  {stereotype}{domain} {card_str}{name_str}{range_card_str} {range_cls}")
+            stereotype = f"@{rel.stereotype} " if rel.stereotype else ""
+            name_str = f" -- {rel.name} -- " if rel.name else " -- "
+            relatorio.texto(f"\n  {stereotype}{rel.domain} {rel.domain_card}{name_str}{rel.range_card} {rel.range}")
     else:
-        print("\n  Nenhuma relação externa encontrada.")
+        relatorio.texto("\n  Nenhuma relação externa encontrada.")
     
     _subcabecalho(f"CONJUNTOS DE GENERALIZAÇÃO ({len(ast.gensets)})")
     if ast.gensets:
         for genset in ast.gensets:
             modifiers_str = ""
-            if genset['modifiers']:
-                modifiers_str = f" [{', '.join(genset['modifiers'])}]"
-            specifics_str = ", ".join(genset['specifics'])
-            print(f"\n  {genset['name']}{modifiers_str}")
-            print(f"    Geral: {genset['general']}")
-            print(f"    Específicas: {specifics_str}")
-    else:
-        print("\n  Nenhum conjunto de generalização.")
-
-def gerar_relatorio_erros():
-    _subcabecalho("RESULTADO")
-    
-    if not ast.errors:
-        print("\n  [OK] Nenhum erro sintático encontrado.")
-        print("  Análise concluída com sucesso.")
+            if genset.modifiers:
+                modifiers_str = f" [{', '.join(genset.modifiers)}]"
+            specifics_str = ", ".join(genset.specifics)
+            relatorio.texto(f"\n  {genset.name}{modifiers_str}")
+            relatorio.texto(f"    Geral: {genset.general}")
+            relatorio.texto(f"    Específicas: {specifics_str}")
     else:
-        print(f"\n  [ERRO] {len(ast.errors)} erro(s) encontrado(s):\n")
-        for i, error in enumerate(ast.errors, 1):
-            line = error['line']
-            msg = error['message']
-            suggestion = error['suggestion']
-            
-            line_str = f"Linha {line}" if line > 0 else "Final do arquivo"
-            print(f"  {i}. [{line_str}] {msg}")
-            if suggestion:
-                print(f"     Sugestão: {suggestion}")
-    
-    print("\n" + _linha())
-    status = "com erros" if ast.errors else "com sucesso"
-    print(f"Análise sintática concluída {status}.".center(LARGURA))
-    print(_linha())
+        relatorio.texto("\n  Nenhum conjunto de generalização.")
+
+def _registrar_sintese(ast, relatorio):
+    # Uma linha por declaração e um total, para consumo por ferramentas
+    for cls in ast.classes:
+        relatorio.registrar('declaracao', categoria='classe', nome=cls.name, estereotipo=cls.stereotype,
+                            especializa=cls.specializes,
+                            atributos=[{'nome': attr.name, 'tipo': attr.type} for attr in cls.attributes],
+                            relacoes_internas=[{'estereotipo': rel.stereotype, 'alvo': rel.target}
+                                               for rel in cls.internal_relations])
+    for dt in ast.datatypes:
+        relatorio.registrar('declaracao', categoria='datatype', nome=dt.name,
+                            atributos=[{'nome': attr.name, 'tipo': attr.type} for attr in dt.attributes])
+    for enum in ast.enums:
+        relatorio.registrar('declaracao', categoria='enum', nome=enum.name, valores=list(enum.instances or []))
+    for rel in ast.relations:
+        relatorio.registrar('declaracao', categoria='relacao', nome=rel.name, estereotipo=rel.stereotype,
+                            origem=rel.domain, destino=rel.range)
+    for genset in ast.gensets:
+        relatorio.registrar('declaracao', categoria='genset', nome=genset.name,
+                            modificadores=list(genset.modifiers or []), geral=genset.general,
+                            especificas=list(genset.specifics))
+    relatorio.registrar('sintese', pacote=ast.package_name, classes=len(ast.classes),
+                        datatypes=len(ast.datatypes), enums=len(ast.enums),
+                        relacoes=len(ast.relations), gensets=len(ast.gensets))
+
+def gerar_relatorio_erros(ast=None):
+    ast = _ast_ou_ultima(ast)
+    relatorio = relatorios.atual()
+    with relatorio.bloco():
+        _subcabecalho("RESULTADO")
+        
+        if not ast.errors:
+            relatorio.texto("\n  [OK] Nenhum erro sintático encontrado.")
+            relatorio.texto("  Análise concluída com sucesso.")
+        else:
+            relatorio.texto(f"\n  [ERRO] {len(ast.errors)} erro(s) encontrado(s):\n")
+            for i, error in enumerate(ast.errors, 1):
+                line = error['line']
+                msg = error['message']
+                suggestion = error['suggestion']
+                
+                line_str = f"Linha {line}" if line > 0 else "Final do arquivo"
+                relatorio.texto(f"  {i}. [{line_str}] {msg}")
+                if suggestion:
+                    relatorio.texto(f"     Sugestão: {suggestion}")
+        relatorio.diagnosticos_da_ast(ast)
+        
+        relatorio.texto("\n" + _linha())
+        status = "com erros" if ast.errors else "com sucesso"
+        relatorio.texto(f"Análise sintática concluída {status}.".center(LARGURA))
+        relatorio.texto(_linha())
 
 def reset_ast():
     global ast
@@ -602,9 +623,85 @@ def reset_ast():
 def build(**kwargs):
     return yacc.yacc(**kwargs)
 
+class MotorSintatico:
+    # Constrói o lexer e as tabelas LALR uma única vez e os reutiliza
+    # em quantas chamadas de parse() forem necessárias. Cada chamada usa
+    # cópias leves do parser e do lexer com a sua própria AST, então o
+    # mesmo motor pode ser usado por várias threads ao mesmo tempo.
+    def __init__(self, backend=None, **kwargs):
+        self.lexer = analisador_lexico.build(backend)
+        self.parser = build(**kwargs)
+
+    def parse(self, code, max_erros=None, tabela=None):
+        # max_erros None usa MAX_ERROS; 0 analisa o arquivo inteiro.
+        # tabela: simbolos.TabelaSimbolos do build, compartilhada pelos
+        # arquivos analisados juntos; sem ela, uma tabela só deste arquivo
+        limite = MAX_ERROS if max_erros is None else max_erros
+        ast = OntologyAST()
+        parser = copy.copy(self.parser)
+        parser.ast = ast
+        parser.errorfunc = functools.partial(registrar_erro_sintatico, ast, parser=parser, limite=limite)
+        lexer = self.lexer.clone()
+        lexer.erros_lexicos = ast.lex_errors
+        lexer.erros_sintaticos = ast.errors
+        lexer.limite_erros = limite
+        lexer.tabela = tabela if tabela is not None else simbolos.TabelaSimbolos()
+
+        coletor = metricas.atual()
+        if not coletor.ativo:
+            parser.fluxo = _FluxoTokens(lexer.token)
+            return self._executar(parser, ast, code, lexer), ast
+
+        # Com métricas ativas os tokens consumidos pelo parser são contados
+        quantidade = 0
+        def proximo_token():
+            nonlocal quantidade
+            tok = lexer.token()
+            if tok is not None:
+                quantidade += 1
+            return tok
+
+        parser.fluxo = _FluxoTokens(proximo_token)
+        with coletor.fase('sintatico'):
+            result = self._executar(parser, ast, code, lexer)
+        coletor.contar('arquivos_analisados')
+        coletor.contar('tokens_sintatico', quantidade)
+        coletor.contar('declaracoes', contar_declaracoes(ast))
+        return result, ast
+
+    def _executar(self, parser, ast, code, lexer):
+        try:
+            result = parser.parse(code, lexer=lexer, tokenfunc=parser.fluxo)
+        except analisador_lexico.LimiteDeErros as erro:
+            ast.add_error(erro.linha, str(erro), "Corrija os primeiros erros ou ajuste o limite com --max-errors.")
+            relatorios.atual().texto(f"[ERRO] Linha {erro.linha}: {erro}")
+            result = None
+        if result is None:
+            _recuperar_cabecalho(parser, ast)
+        return result
+
+def _recuperar_cabecalho(parser, ast):
+    # Um parse interrompido (limite de erros ou erro perto do fim do arquivo)
+    # não reduz `program`: pacote e imports são lidos da pilha do parser
+    for simbolo in getattr(parser, 'symstack', ()):
+        if simbolo.type == 'package_declaration' and ast.package_name is None:
+            ast.package_name = simbolo.value[1]
+        elif simbolo.type == 'import_list' and not ast.imports:
+            ast.imports = simbolo.value if isinstance(simbolo.value, list) else [simbolo.value]
+
+def contar_declaracoes(ast):
+    return len(ast.classes) + len(ast.datatypes) + len(ast.enums) + len(ast.gensets) + len(ast.relations)
+
+_motores = {}
+
+def obter_motor(backend=None):
+    backend = backend or analisador_lexico.BACKEND_PADRAO
+    if backend not in _motores:
+        _motores[backend] = MotorSintatico(backend)
+    return _motores[backend]
+
 def parse(code, **kwargs):
-    reset_ast()
-    lexer = analisador_lexico.build()
-    parser = build(**kwargs)
-    result = parser.parse(code, lexer=lexer)
+    global ast
+    motor = MotorSintatico(**kwargs) if kwargs else obter_motor()
+    result, ast = motor.parse(code)
     return result, ast
@@ -0,0 +1,370 @@
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+
+from analisador_sintatico import OntologyAST
+from ast_nodes import Attribute, Cardinality, Class, DataType, Enum, GenSet, InternalRelation, Relation
+
+# Formato binário da OntologyAST, lido sob demanda via mmap. Nenhum nó é
+# construído ao abrir o arquivo: cada classe, relação, genset... só vira
+# objeto quando é acessado (e fica guardado, para que o mesmo índice devolva
+# sempre o mesmo objeto). Vários processos que abrem o mesmo arquivo
+# compartilham as páginas do cache do sistema.
+#
+#     ast_binario.escrever_ast(ast, 'modelo.tast')
+#     ast = ast_binario.abrir_ast('modelo.tast')   # ASTMapeada, só leitura
+#
+# Layout (little-endian):
+#   cabeçalho  MAGICO, versão, número de seções, nome do pacote, saída anexa
+#              e, por seção, (deslocamento u64, quantidade u32)
+#   strings    tabela de deslocamentos (quantidade + 1 u32) e os bytes UTF-8
+#   listas     referências a strings (u32), usadas por instâncias de enum,
+#              specifics e modificadores de genset e metadados de atributo
+#   registros  um struct de tamanho fixo por nó (REGISTROS); referências a
+#              strings são índices u32 e listas são (início, quantidade)
+#
+# Strings e listas ausentes (None) são NENHUM; cardinalidades são dois i32
+# com '*' = -1 e cardinalidade ausente = (-2, -2). Um limite que não cabe
+# em i32 (ou que não é inteiro) vai como texto para a tabela de strings e
+# fica registrado como -3 - índice da string.
+
+MAGICO = b'TONTOAST'
+VERSAO = 2
+
+# Arquivos a partir deste tamanho são abertos com mmap
+LIMITE_MMAP = 1 << 20
+
+NENHUM = 0xFFFFFFFF
+_MUITOS = -1
+_SEM_CARDINALIDADE = -2
+_TEXTO = -3
+_MAXIMO_I32 = 0x7FFFFFFF
+
+SECOES = ('indices', 'strings', 'listas', 'classes', 'atributos', 'relacoes_internas',
+          'datatypes', 'enums', 'gensets', 'relacoes', 'imports', 'erros', 'erros_lexicos')
+
+_CABECALHO = struct.Struct(f'<8sHHII{"QI" * len(SECOES)}')
+_INDICE = struct.Struct('<I')
+
+REGISTROS = {
+    # estereótipo, nome, specializes, atributos (início, qtd), relações internas (início, qtd)
+    'classes': struct.Struct('<7I'),
+    # nome, tipo, cardinalidade, metadados (início, qtd)
+    'atributos': struct.Struct('<2I2i2I'),
+    # estereótipo, nome, cardinalidade de origem, símbolo, cardinalidade do alvo, alvo
+    'relacoes_internas': struct.Struct('<2I2iI2iI'),
+    # nome, atributos (início, qtd)
+    'datatypes': struct.Struct('<3I'),
+    # nome, instâncias (início, qtd)
+    'enums': struct.Struct('<3I'),
+    # nome, modificadores (início, qtd), geral, specifics (início, qtd)
+    'gensets': struct.Struct('<6I'),
+    # estereótipo, nome, domínio, cardinalidade, símbolo, símbolo2, cardinalidade, imagem
+    'relacoes': struct.Struct('<3I2i2I2iI'),
+    # tipo ('import'), nome
+    'imports': struct.Struct('<2I'),
+    # linha, mensagem, sugestão
+    'erros': struct.Struct('<i2I'),
+    # linha, mensagem
+    'erros_lexicos': struct.Struct('<iI'),
+}
+
+class _Escrita:
+    def __init__(self):
+        self.strings = {}
+        self.listas = []
+        self.secoes = {nome: [] for nome in REGISTROS}
+
+    def string(self, texto):
+        if texto is None:
+            return NENHUM
+        indice = self.strings.get(texto)
+        if indice is None:
+            indice = self.strings[texto] = len(self.strings)
+        return indice
+
+    def lista(self, textos):
+        if textos is None:
+            return NENHUM, 0
+        inicio = len(self.listas)
+        self.listas.extend(self.string(texto) for texto in textos)
+        return inicio, len(textos)
+
+    def registro(self, secao, *campos):
+        self.secoes[secao].append(REGISTROS[secao].pack(*campos))
+
+    def atributos(self, atributos):
+        inicio = len(self.secoes['atributos'])
+        for atributo in atributos:
+            self.registro('atributos', self.string(atributo.name), self.string(atributo.type),
+                          *self.cardinalidade(atributo.cardinality), *self.lista(atributo.metadata))
+        return inicio, len(atributos)
+
+    def cardinalidade(self, cardinalidade):
+        if cardinalidade is None:
+            return _SEM_CARDINALIDADE, _SEM_CARDINALIDADE
+        return self.limite(cardinalidade.min), self.limite(cardinalidade.max)
+
+    def limite(self, valor):
+        if valor == '*':
+            return _MUITOS
+        if isinstance(valor, int) and 0 <= valor <= _MAXIMO_I32:
+            return valor
+        return _TEXTO - self.string(str(valor))
+
+def serializar_ast(ast, saida=None):
+    # Devolve os bytes do arquivo; saida é um texto anexo opcional (o cache
+    # guarda aqui o que o parser imprimiu)
+    escrita = _Escrita()
+    for classe in ast.classes:
+        primeiro_atributo = escrita.atributos(classe.attributes)
+        inicio = len(escrita.secoes['relacoes_internas'])
+        for relacao in classe.internal_relations:
+            escrita.registro('relacoes_internas', escrita.string(relacao.stereotype), escrita.string(relacao.name),
+                             *escrita.cardinalidade(relacao.source_card), escrita.string(relacao.symbol),
+                             *escrita.cardinalidade(relacao.target_card), escrita.string(relacao.target))
+        escrita.registro('classes', escrita.string(classe.stereotype), escrita.string(classe.name),
+                         escrita.string(classe.specializes), *primeiro_atributo,
+                         inicio, len(classe.internal_relations))
+    for datatype in ast.datatypes:
+        escrita.registro('datatypes', escrita.string(datatype.name), *escrita.atributos(datatype.attributes))
+    for enum in ast.enums:
+        escrita.registro('enums', escrita.string(enum.name), *escrita.lista(enum.instances))
+    for genset in ast.gensets:
+        escrita.registro('gensets', escrita.string(genset.name), *escrita.lista(genset.modifiers),
+                         escrita.string(genset.general), *escrita.lista(genset.specifics))
+    for relacao in ast.relations:
+        escrita.registro('relacoes', escrita.string(relacao.stereotype), escrita.string(relacao.name),
+                         escrita.string(relacao.domain), *escrita.cardinalidade(relacao.domain_card),
+                         escrita.string(relacao.symbol), escrita.string(relacao.symbol2),
+                         *escrita.cardinalidade(relacao.range_card), escrita.string(relacao.range))
+    for item_import in ast.imports or []:
+        escrita.registro('imports', escrita.string(item_import[0]), escrita.string(item_import[1]))
+    for erro in ast.errors:
+        escrita.registro('erros', erro['line'], escrita.string(erro['message']), escrita.string(erro['suggestion']))
+    for erro in ast.lex_errors:
+        escrita.registro('erros_lexicos', erro['line'], escrita.string(erro['message']))
+    pacote = escrita.string(ast.package_name)
+    anexo = escrita.string(saida)
+
+    codificadas = [texto.encode('utf-8') for texto in escrita.strings]
+    indices = bytearray(_INDICE.size * (len(codificadas) + 1))
+    posicao = 0
+    for i, dados in enumerate(codificadas):
+        _INDICE.pack_into(indices, i * _INDICE.size, posicao)
+        posicao += len(dados)
+    _INDICE.pack_into(indices, len(codificadas) * _INDICE.size, posicao)
+
+    conteudo = {
+        'indices': (bytes(indices), len(codificadas)),
+        'strings': (b''.join(codificadas), posicao),
+        'listas': (struct.pack(f'<{len(escrita.listas)}I', *escrita.listas), len(escrita.listas)),
+    }
+    for nome, registros in escrita.secoes.items():
+        conteudo[nome] = (b''.join(registros), len(registros))
+
+    # Seções alinhadas em 8 bytes depois do cabeçalho
+    partes = []
+    campos = []
+    deslocamento = _CABECALHO.size
+    for nome in SECOES:
+        dados, quantidade = conteudo[nome]
+        deslocamento += -deslocamento % 8
+        partes.append(dados)
+        campos += [deslocamento, quantidade]
+        deslocamento += len(dados)
+    saida_bytes = bytearray(_CABECALHO.pack(MAGICO, VERSAO, len(SECOES), pacote, anexo, *campos))
+    for dados in partes:
+        saida_bytes += bytes(-len(saida_bytes) % 8)
+        saida_bytes += dados
+    return bytes(saida_bytes)
+
+def escrever_ast(ast, destino, saida=None):
+    dados = serializar_ast(ast, saida)
+    if hasattr(destino, 'write'):
+        destino.write(dados)
+        return len(dados)
+    with open(destino, 'wb') as f:
+        f.write(dados)
+    return len(dados)
+
+class _Registros(Sequence):
+    # Lista só de leitura cujos itens são montados no primeiro acesso
+    def __init__(self, inicio, quantidade, montar):
+        self._inicio = inicio
+        self._quantidade = quantidade
+        self._montar = montar
+        self._itens = [None] * quantidade
+
+    def __len__(self):
+        return self._quantidade
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(self._quantidade))]
+        if indice < 0:
+            indice += self._quantidade
+        if not 0 <= indice < self._quantidade:
+            raise IndexError(indice)
+        item = self._itens[indice]
+        if item is None:
+            item = self._itens[indice] = self._montar(self._inicio + indice)
+        return item
+
+    def __iter__(self):
+        for indice in range(self._quantidade):
+            yield self[indice]
+
+    def __repr__(self):
+        return repr(list(self))
+
+class ASTMapeada:
+    # Mesma interface de leitura da OntologyAST; os nós vêm do arquivo
+    # mapeado conforme são acessados
+    CAMPOS = OntologyAST.CAMPOS
+
+    def __init__(self, dados, tabela=None):
+        # dados: bytes, mmap ou qualquer objeto com a interface de buffer;
+        # tabela: simbolos.TabelaSimbolos em que os textos são internados
+        self._dados = dados
+        self._tabela = tabela
+        if len(dados) < _CABECALHO.size:
+            raise ValueError("Arquivo de AST truncado")
+        campos = _CABECALHO.unpack_from(dados, 0)
+        magico, versao, secoes = campos[:3]
+        if magico != MAGICO:
+            raise ValueError("Não é um arquivo de AST do compilador TONTO")
+        if versao != VERSAO or secoes != len(SECOES):
+            raise ValueError(f"Versão do formato de AST não suportada: {versao} (esperada {VERSAO})")
+        self._secoes = {}
+        for i, nome in enumerate(SECOES):
+            deslocamento, quantidade = campos[5 + 2 * i], campos[6 + 2 * i]
+            if nome in REGISTROS:
+                tamanho = REGISTROS[nome].size * quantidade
+            else:
+                tamanho = {'indices': 4 * (quantidade + 1), 'strings': quantidade, 'listas': 4 * quantidade}[nome]
+            if deslocamento + tamanho > len(dados):
+                raise ValueError(f"Arquivo de AST truncado (seção {nome})")
+            self._secoes[nome] = (deslocamento, quantidade)
+        self._textos = [None] * self._secoes['indices'][1]
+
+        self.package_name = self._string(campos[3])
+        self.saida = self._string(campos[4])
+        self.classes = self._registros('classes', self._classe)
+        self.datatypes = self._registros('datatypes', self._datatype)
+        self.enums = self._registros('enums', self._enum)
+        self.gensets = self._registros('gensets', self._genset)
+        self.relations = self._registros('relacoes', self._relacao)
+        self.imports = self._registros('imports', self._import)
+        self.errors = self._registros('erros', self._erro)
+        self.lex_errors = self._registros('erros_lexicos', self._erro_lexico)
+        self._atributos = self._registros('atributos', self._atributo)
+        self._relacoes_internas = self._registros('relacoes_internas', self._relacao_interna)
+
+    def _registros(self, secao, montar):
+        return _Registros(0, self._secoes[secao][1], montar)
+
+    def _campos(self, secao, indice):
+        formato = REGISTROS[secao]
+        return formato.unpack_from(self._dados, self._secoes[secao][0] + indice * formato.size)
+
+    def _string(self, indice):
+        if indice == NENHUM:
+            return None
+        # A mesma string é decodificada uma vez e compartilhada por todos os nós
+        texto = self._textos[indice]
+        if texto is None:
+            base = self._secoes['indices'][0] + indice * 4
+            inicio, fim = struct.unpack_from('<2I', self._dados, base)
+            deslocamento = self._secoes['strings'][0]
+            texto = bytes(self._dados[deslocamento + inicio:deslocamento + fim]).decode('utf-8')
+            if self._tabela is not None:
+                texto = self._tabela.internar(texto)
+            self._textos[indice] = texto
+        return texto
+
+    def _lista(self, inicio, quantidade):
+        if inicio == NENHUM:
+            return None
+        indices = struct.unpack_from(f'<{quantidade}I', self._dados, self._secoes['listas'][0] + inicio * 4)
+        return [self._string(indice) for indice in indices]
+
+    def _cardinalidade(self, minimo, maximo):
+        if minimo == _SEM_CARDINALIDADE:
+            return None
+        return Cardinality(self._limite(minimo), self._limite(maximo))
+
+    def _limite(self, valor):
+        if valor >= 0:
+            return valor
+        if valor == _MUITOS:
+            return '*'
+        texto = self._string(_TEXTO - valor)
+        return int(texto) if texto.lstrip('-').isdigit() else texto
+
+    def _classe(self, indice):
+        estereotipo, nome, especializa, atributo, atributos, interna, internas = self._campos('classes', indice)
+        return Class(self._string(estereotipo), self._string(nome),
+                     self._atributos[atributo:atributo + atributos],
+                     self._relacoes_internas[interna:interna + internas],
+                     self._string(especializa))
+
+    def _atributo(self, indice):
+        nome, tipo, minimo, maximo, metadados, quantidade = self._campos('atributos', indice)
+        return Attribute(self._string(nome), self._string(tipo), self._cardinalidade(minimo, maximo),
+                         self._lista(metadados, quantidade))
+
+    def _relacao_interna(self, indice):
+        estereotipo, nome, smin, smax, simbolo, tmin, tmax, alvo = self._campos('relacoes_internas', indice)
+        return InternalRelation(self._string(estereotipo), self._string(nome), self._cardinalidade(smin, smax),
+                                self._string(simbolo), self._cardinalidade(tmin, tmax), self._string(alvo))
+
+    def _datatype(self, indice):
+        nome, atributo, atributos = self._campos('datatypes', indice)
+        return DataType(self._string(nome), self._atributos[atributo:atributo + atributos])
+
+    def _enum(self, indice):
+        nome, inicio, quantidade = self._campos('enums', indice)
+        return Enum(self._string(nome), self._lista(inicio, quantidade))
+
+    def _genset(self, indice):
+        nome, modificadores, qtd_modificadores, geral, inicio, quantidade = self._campos('gensets', indice)
+        return GenSet(self._string(nome), self._lista(modificadores, qtd_modificadores),
+                      self._string(geral), self._lista(inicio, quantidade))
+
+    def _relacao(self, indice):
+        estereotipo, nome, dominio, dmin, dmax, simbolo, simbolo2, rmin, rmax, imagem = self._campos('relacoes', indice)
+        return Relation(self._string(estereotipo), self._string(nome), self._string(dominio),
+                        self._cardinalidade(dmin, dmax), self._string(simbolo), self._cardinalidade(rmin, rmax),
+                        self._string(imagem), symbol2=self._string(simbolo2))
+
+    def _import(self, indice):
+        tipo, nome = self._campos('imports', indice)
+        return (self._string(tipo), self._string(nome))
+
+    def _erro(self, indice):
+        linha, mensagem, sugestao = self._campos('erros', indice)
+        return {'line': linha, 'message': self._string(mensagem), 'suggestion': self._string(sugestao)}
+
+    def _erro_lexico(self, indice):
+        linha, mensagem = self._campos('erros_lexicos', indice)
+        return {'line': linha, 'message': self._string(mensagem)}
+
+    def to_dict(self):
+        # Forma das OntologyAST (listas comuns): materializa todos os nós
+        return {campo: (list(valor) if isinstance(valor, _Registros) else valor)
+                for campo in self.CAMPOS for valor in (getattr(self, campo),)}
+
+    def para_ast(self):
+        return OntologyAST.from_dict(self.to_dict())
+
+def abrir_ast(caminho, tabela=None):
+    # Arquivos grandes são mapeados (o mapeamento fica aberto enquanto a
+    # ASTMapeada existir); os pequenos, como os do cache, são lidos de uma
+    # vez: cada mapeamento mantém um descritor aberto
+    with open(caminho, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < LIMITE_MMAP:
+            return ASTMapeada(f.read(), tabela)
+        dados = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return ASTMapeada(dados, tabela)
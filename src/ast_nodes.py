@@ -0,0 +1,103 @@
+# Nós compactos da AST: __slots__ em vez de dicionários e tuplas de tamanho
+# variável, com os mesmos nomes de campo que as chaves usadas antes.
+# O estereótipo é guardado como código inteiro (simbolos.py) e continua
+# legível como texto em `stereotype`.
+
+from simbolos import ESTEREOTIPOS, codigo_estereotipo
+
+class Node:
+    __slots__ = ()
+
+    def __repr__(self):
+        campos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+class NodeComEstereotipo(Node):
+    __slots__ = ()
+
+    @property
+    def stereotype(self):
+        return ESTEREOTIPOS[self.codigo]
+
+    @stereotype.setter
+    def stereotype(self, nome):
+        self.codigo = codigo_estereotipo(nome)
+
+class Cardinality(Node):
+    __slots__ = ('min', 'max')
+
+    def __init__(self, min, max):
+        self.min = min
+        self.max = max
+
+    def __str__(self):
+        return f"[{self.min}..{self.max}]"
+
+class Attribute(Node):
+    __slots__ = ('name', 'type', 'cardinality', 'metadata')
+
+    def __init__(self, name, type, cardinality=None, metadata=None):
+        self.name = name
+        self.type = type
+        self.cardinality = cardinality
+        self.metadata = metadata
+
+class InternalRelation(NodeComEstereotipo):
+    # Relação declarada dentro do corpo de uma classe; target é sempre a
+    # classe alvo, nas formas com nome (-- nome --) e sem nome ([1] -- [1])
+    __slots__ = ('codigo', 'name', 'source_card', 'symbol', 'target_card', 'target')
+
+    def __init__(self, stereotype, name, source_card, symbol, target_card, target):
+        self.codigo = codigo_estereotipo(stereotype)
+        self.name = name
+        self.source_card = source_card
+        self.symbol = symbol
+        self.target_card = target_card
+        self.target = target
+
+class Class(NodeComEstereotipo):
+    __slots__ = ('codigo', 'name', 'attributes', 'internal_relations', 'specializes')
+
+    def __init__(self, stereotype, name, attributes=None, internal_relations=None, specializes=None):
+        self.codigo = codigo_estereotipo(stereotype)
+        self.name = name
+        self.attributes = attributes if attributes is not None else []
+        self.internal_relations = internal_relations if internal_relations is not None else []
+        self.specializes = specializes
+
+class DataType(Node):
+    __slots__ = ('name', 'attributes')
+
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.attributes = attributes if attributes is not None else []
+
+class Enum(Node):
+    __slots__ = ('name', 'instances')
+
+    def __init__(self, name, instances=None):
+        self.name = name
+        self.instances = instances if instances is not None else []
+
+class GenSet(Node):
+    __slots__ = ('name', 'modifiers', 'general', 'specifics')
+
+    def __init__(self, name, modifiers, general, specifics):
+        self.name = name
+        self.modifiers = modifiers
+        self.general = general
+        self.specifics = specifics
+
+class Relation(NodeComEstereotipo):
+    # symbol2 só existe na forma com nome: Dominio [1] -- nome -- [1] Imagem
+    __slots__ = ('codigo', 'name', 'domain', 'domain_card', 'symbol', 'symbol2', 'range_card', 'range')
+
+    def __init__(self, stereotype, name, domain, domain_card, symbol, range_card, range, symbol2=None):
+        self.codigo = codigo_estereotipo(stereotype)
+        self.name = name
+        self.domain = domain
+        self.domain_card = domain_card
+        self.symbol = symbol
+        self.symbol2 = symbol2
+        self.range_card = range_card
+        self.range = range
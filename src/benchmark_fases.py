@@ -0,0 +1,242 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+
+diretorio_atual = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(diretorio_atual)
+
+import analisador_lexico
+import analisador_semantico
+import analisador_sintatico
+import cache_ast
+import gerador_projeto
+import resolvedor_imports
+
+# Mede cada fase do compilador sobre projetos sintéticos de tamanhos
+# crescentes e guarda os tempos num histórico JSON. Entre dois tamanhos
+# consecutivos calcula o expoente de escala (tempo ~ declarações^k): um
+# expoente acima do limite indica uma fase super-linear.
+
+HISTORICO_PADRAO = os.path.join(os.path.dirname(diretorio_atual), 'benchmarks', 'historico_fases.json')
+
+# Abaixo disso o tempo é dominado por ruído e não entra na verificação de escala
+TEMPO_MINIMO_ESCALA = 0.005
+
+class _CacheMemoria:
+    # Mesma interface de CacheAST, em memória: o resolvedor reaproveita as
+    # ASTs já medidas na fase sintática e mede-se só a resolução de imports
+    def __init__(self, asts):
+        self.asts = asts
+
+    def obter(self, chave, tabela=None):
+        return self.asts.get(chave)
+
+    def guardar(self, chave, ast, saida):
+        self.asts[chave] = (ast, saida)
+
+def _melhor(funcao, repeticoes):
+    melhor = None
+    valor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        valor = funcao()
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, valor
+
+def medir_projeto(resumo, repeticoes=3, backend=None):
+    caminhos = resumo['caminhos']
+    textos = {}
+    for caminho in caminhos:
+        with open(caminho, 'rb') as f:
+            textos[caminho] = f.read()
+
+    def lexico():
+        total = 0
+        lexer = analisador_lexico.build(backend)
+        for caminho in caminhos:
+            for _ in analisador_lexico.iter_tokens(caminho, lexer):
+                total += 1
+        return total
+
+    motor = analisador_sintatico.obter_motor(backend)
+
+    def sintatico():
+        asts = {}
+        for caminho in caminhos:
+            _, ast = motor.parse(textos[caminho].decode('utf-8', 'replace'))
+            asts[cache_ast.hash_conteudo(textos[caminho])] = (ast, "")
+        return asts
+
+    # Erros léxicos/sintáticos são impressos: não devem pesar na medição
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_lexico, tokens = _melhor(lexico, repeticoes)
+        t_sintatico, asts = _melhor(sintatico, repeticoes)
+
+    erros = sum(len(ast.errors) for ast, _ in asts.values())
+
+    def imports():
+        resolvedor = resolvedor_imports.ResolvedorImports(_CacheMemoria(dict(asts)))
+        resolvedor.carregar([resumo['raiz']])
+        return resolvedor.ast_mesclada(resumo['raiz'])
+
+    t_imports, ast_mesclada = _melhor(imports, repeticoes)
+
+    # Índices e regras: melhor tempo de cada um entre as repetições
+    t_indices = None
+    t_regras = {}
+    resultados = []
+    for _ in range(repeticoes):
+        analisador = analisador_semantico.AnalisadorSemantico(ast_mesclada)
+        resultados = analisador.analisar()
+        t_indices = analisador.tempo_indices if t_indices is None else min(t_indices, analisador.tempo_indices)
+        for padrao, duracao in analisador.tempos_regras.items():
+            t_regras[padrao] = min(t_regras.get(padrao, duracao), duracao)
+
+    fases = {
+        'lexico': t_lexico,
+        'sintatico': t_sintatico,
+        'imports': t_imports,
+        'semantico_indices': t_indices,
+    }
+    for padrao, duracao in t_regras.items():
+        fases[f"regra_{padrao}"] = duracao
+
+    return {
+        'kinds': resumo['parametros']['kinds'],
+        'arquivos': resumo['arquivos'],
+        'linhas': resumo['linhas'],
+        'bytes': resumo['bytes'],
+        'declaracoes': resumo['declaracoes'],
+        'tokens': tokens,
+        'erros_sintaticos': erros,
+        'resultados_semanticos': len(resultados),
+        'fases': fases,
+    }
+
+def expoentes_de_escala(medicoes):
+    # [(fase, tamanho_a, tamanho_b, expoente)] entre tamanhos consecutivos
+    expoentes = []
+    for anterior, atual in zip(medicoes, medicoes[1:]):
+        razao_tamanho = atual['declaracoes'] / anterior['declaracoes']
+        if razao_tamanho <= 1:
+            continue
+        for fase, tempo in atual['fases'].items():
+            tempo_anterior = anterior['fases'].get(fase)
+            if not tempo_anterior or tempo < TEMPO_MINIMO_ESCALA:
+                continue
+            expoente = math.log(tempo / tempo_anterior) / math.log(razao_tamanho)
+            expoentes.append((fase, anterior['kinds'], atual['kinds'], expoente))
+    return expoentes
+
+def carregar_historico(caminho):
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def gravar_historico(caminho, historico):
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=pasta, suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(historico, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+def _execucao_comparavel(historico, execucao):
+    for anterior in reversed(historico):
+        if (anterior.get('parametros') == execucao['parametros']
+                and anterior.get('tamanhos') == execucao['tamanhos']
+                and anterior.get('lexer') == execucao['lexer']):
+            return anterior
+    return None
+
+def _exibir(execucao, expoentes, limite, anterior):
+    print(f"\n  {'KINDS':>7} {'ARQS':>5} {'LINHAS':>8} {'TOKENS':>9}   FASE                       TEMPO (s)")
+    print("  " + "-" * 78)
+    for medicao in execucao['medicoes']:
+        primeira = True
+        for fase, tempo in medicao['fases'].items():
+            if primeira:
+                prefixo = (f"  {medicao['kinds']:>7} {medicao['arquivos']:>5} "
+                           f"{medicao['linhas']:>8} {medicao['tokens']:>9}")
+                primeira = False
+            else:
+                prefixo = " " * 34
+            print(f"{prefixo}   {fase:<26} {tempo:>9.4f}")
+        print("  " + "-" * 78)
+
+    if expoentes:
+        print(f"\n  Escala (tempo ~ declarações^k, limite k <= {limite}):")
+        for fase, de, para, expoente in expoentes:
+            marca = "  SUPER-LINEAR" if expoente > limite else ""
+            print(f"    {fase:<26} {de:>6} -> {para:<6} k = {expoente:5.2f}{marca}")
+
+    if anterior:
+        print(f"\n  Comparação com a execução de {anterior['data']}"
+              + (f" ({anterior['rotulo']})" if anterior.get('rotulo') else "") + ":")
+        ultima, ultima_anterior = execucao['medicoes'][-1], anterior['medicoes'][-1]
+        for fase, tempo in ultima['fases'].items():
+            tempo_anterior = ultima_anterior['fases'].get(fase)
+            if tempo_anterior:
+                print(f"    {fase:<26} {(tempo / tempo_anterior - 1) * 100:+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede as fases do compilador em projetos sintéticos")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[100, 400, 1600],
+                        help="quantidades de kinds dos projetos gerados")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--lexer', choices=analisador_lexico.BACKENDS, default=analisador_lexico.BACKEND_PADRAO)
+    parser.add_argument('--historico', default=HISTORICO_PADRAO)
+    parser.add_argument('--sem-historico', action='store_true', help="não grava a execução no histórico")
+    parser.add_argument('--rotulo', default="", help="texto livre guardado com a execução")
+    parser.add_argument('--expoente-maximo', type=float, default=1.5,
+                        help="expoente de escala acima do qual a fase é considerada super-linear")
+    gerador_projeto.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    parametros = gerador_projeto.parametros_dos_argumentos(args)
+    parametros.pop('kinds')
+    tamanhos = sorted(set(args.tamanhos))
+
+    medicoes = []
+    for kinds in tamanhos:
+        with tempfile.TemporaryDirectory() as pasta:
+            resumo = gerador_projeto.gerar_projeto(pasta, kinds=kinds, **parametros)
+            medicoes.append(medir_projeto(resumo, args.repeticoes, args.lexer))
+
+    execucao = {
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'rotulo': args.rotulo,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'lexer': args.lexer,
+        'repeticoes': args.repeticoes,
+        'tamanhos': tamanhos,
+        'parametros': parametros,
+        'medicoes': medicoes,
+    }
+
+    expoentes = expoentes_de_escala(medicoes)
+    historico = carregar_historico(args.historico)
+    _exibir(execucao, expoentes, args.expoente_maximo, _execucao_comparavel(historico, execucao))
+
+    execucao['expoentes'] = [{'fase': fase, 'de': de, 'para': para, 'expoente': expoente}
+                             for fase, de, para, expoente in expoentes]
+    if not args.sem_historico:
+        historico.append(execucao)
+        gravar_historico(args.historico, historico)
+        print(f"\n  Execução registrada em {args.historico}")
+
+    super_lineares = [fase for fase, _, _, expoente in expoentes if expoente > args.expoente_maximo]
+    return 1 if super_lineares else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
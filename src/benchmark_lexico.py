@@ -0,0 +1,69 @@
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+diretorio_atual = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(diretorio_atual)
+
+import analisador_lexico
+
+def gerar_entrada(megabytes):
+    # Concatena os exemplos do repositório até atingir o tamanho pedido
+    padrao = os.path.join(os.path.dirname(diretorio_atual), 'Compiladores_UFERSA-main', '**', '*.tonto')
+    textos = []
+    for caminho in sorted(glob.glob(padrao, recursive=True)):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            textos.append(f.read())
+    bloco = "\n".join(textos) + "\n"
+    alvo = int(megabytes * 1024 * 1024)
+    return bloco * max(1, alvo // len(bloco))
+
+def _tokens_objeto(lexer, texto):
+    lexer.input(texto)
+    return [(tok.lineno, tok.type, tok.value) for tok in iter(lexer.token, None)]
+
+def _tokens_tuplas(lexer, texto):
+    lexer.input(texto)
+    return [(lineno, tipo, valor) for lineno, tipo, valor, _ in lexer.tuplas()]
+
+def medir(nome, funcao, texto, repeticoes):
+    melhor = None
+    tokens = None
+    for _ in range(repeticoes):
+        # Erros léxicos são impressos: não devem pesar na medição
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            tokens = funcao(texto)
+            duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    print(f"  {nome:<28} {melhor:>8.3f} s  {len(tokens) / melhor:>14,.0f} tokens/s")
+    return tokens, melhor
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os backends do analisador léxico")
+    parser.add_argument('--mb', type=float, default=5, help="tamanho aproximado da entrada em MB")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    texto = gerar_entrada(args.mb)
+    print(f"\n  Entrada: {len(texto) / (1024 * 1024):.1f} MB, {texto.count(chr(10))} linhas\n")
+
+    ply, t_ply = medir("ply (token)", lambda t: _tokens_objeto(analisador_lexico.build('ply'), t),
+                       texto, args.repeticoes)
+    rapido, t_rapido = medir("rapido (token)", lambda t: _tokens_objeto(analisador_lexico.build('rapido'), t),
+                             texto, args.repeticoes)
+    tuplas, t_tuplas = medir("rapido (tuplas)", lambda t: _tokens_tuplas(analisador_lexico.build('rapido'), t),
+                             texto, args.repeticoes)
+
+    iguais = ply == rapido == tuplas
+    print(f"\n  Sequências de tokens idênticas: {'sim' if iguais else 'NÃO'}")
+    print(f"  Ganho rapido (token):  {t_ply / t_rapido:.2f}x")
+    print(f"  Ganho rapido (tuplas): {t_ply / t_tuplas:.2f}x")
+    return 0 if iguais else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
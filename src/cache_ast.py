@@ -0,0 +1,111 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+import analisador_sintatico
+import ast_binario
+import metricas
+import relatorios
+
+# Incrementar quando o formato gravado (ast_binario + saída anexa) mudar
+VERSAO_FORMATO = 3
+PASTA_CACHE = '.tonto_cache'
+ARQUIVOS_GRAMATICA = ('analisador_lexico.py', 'analisador_sintatico.py', 'ast_nodes.py', 'ast_binario.py')
+
+_versao = None
+
+def versao_gramatica():
+    # Hash do lexer e do parser: qualquer mudança na gramática invalida o cache
+    global _versao
+    if _versao is None:
+        h = hashlib.sha256(f"formato {VERSAO_FORMATO}".encode())
+        base = os.path.dirname(os.path.abspath(__file__))
+        for nome in ARQUIVOS_GRAMATICA:
+            with open(os.path.join(base, nome), 'rb') as f:
+                h.update(f.read())
+        _versao = h.hexdigest()[:16]
+    return _versao
+
+def hash_conteudo(dados):
+    # O limite de erros muda a AST de arquivos com erros: entra na chave
+    h = hashlib.sha256(dados)
+    h.update(f"\0max_erros={analisador_sintatico.MAX_ERROS}".encode())
+    return h.hexdigest()
+
+class CacheAST:
+    def __init__(self, pasta):
+        self.raiz = pasta
+        self.pasta = os.path.join(pasta, versao_gramatica())
+        self.acertos = 0
+        self.falhas = 0
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def limpar(self):
+        # Remove as pastas de outras versões da gramática e devolve quantas
+        # eram. Só por pedido explícito (tonto limpar-cache): um processo com
+        # outra versão do compilador pode estar usando a pasta dele
+        atual = os.path.basename(self.pasta)
+        removidas = 0
+        for nome in os.listdir(self.raiz):
+            caminho = os.path.join(self.raiz, nome)
+            if nome != atual and os.path.isdir(caminho):
+                shutil.rmtree(caminho, ignore_errors=True)
+                removidas += 1
+        return removidas
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave[:2], chave + '.tast')
+
+    def obter(self, chave, tabela=None):
+        # A AST volta como ast_binario.ASTMapeada: os nós só são montados
+        # quando alguém os acessa
+        try:
+            ast = ast_binario.abrir_ast(self._caminho(chave), tabela)
+        except (OSError, ValueError):
+            self.falhas += 1
+            metricas.atual().contar('falhas_cache')
+            return None
+        self.acertos += 1
+        metricas.atual().contar('acertos_cache')
+        return ast, ast.saida
+
+    def guardar(self, chave, ast, saida):
+        self.guardar_serializada(chave, ast_binario.serializar_ast(ast, saida))
+
+    def guardar_serializada(self, chave, dados):
+        # dados: bytes de ast_binario.serializar_ast (vindos de um worker)
+        destino = self._caminho(chave)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        # Grava num temporário e renomeia: leitores concorrentes nunca veem
+        # um arquivo pela metade
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(destino))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dados)
+        os.replace(temporario, destino)
+
+def parse_codigo(codigo, tabela=None):
+    # Parse com a saída do parser capturada em texto, qualquer que seja o
+    # formato do relatório ativo, para poder ser guardada no cache
+    saida = io.StringIO()
+    with relatorios.usar(relatorios.Relatorio(relatorios.EscritorTexto(saida))):
+        _, ast = analisador_sintatico.obter_motor().parse(codigo, tabela=tabela)
+    return ast, saida.getvalue()
+
+def parse_arquivo(caminho, cache=None, tabela=None):
+    # tabela: simbolos.TabelaSimbolos do build, vinda do parse ou do cache
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    chave = hash_conteudo(dados)
+
+    if cache is not None:
+        encontrado = cache.obter(chave, tabela)
+        if encontrado is not None:
+            ast, saida = encontrado
+            return ast, saida, True
+
+    ast, saida = parse_codigo(dados.decode('utf-8', 'replace'), tabela)
+    if cache is not None:
+        cache.guardar(chave, ast, saida)
+    return ast, saida, False
@@ -0,0 +1,572 @@
+import argparse
+import glob
+import os
+import sys
+
+diretorio_atual = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(diretorio_atual)
+
+import analisador_lexico
+import analisador_semantico
+import analisador_sintatico
+import cache_ast
+import gerador_gufo
+import metricas
+import ontouml_json
+import projeto
+import relatorios
+import resolvedor_imports
+
+# Interface de linha de comando para scripts e CI:
+#
+#     python src/cli.py check modelos/ outro.tonto 'testes/**/*.tonto' --phase semantic
+#     python src/cli.py gufo Compiladores_UFERSA-main/CarExample -o CarModel.ttl
+#     python src/cli.py ontouml Compiladores_UFERSA-main/CarExample -o CarModel.json
+#     python src/cli.py limpar-cache Compiladores_UFERSA-main/CarExample
+#
+# Cada entrada pode ser um arquivo, uma pasta (todos os .tonto dentro dela)
+# ou um glob. Arquivos .json passados explicitamente (ou por glob) são
+# modelos OntoUML exportados pelo editor visual, importados para a AST. O
+# lexer e o parser são construídos uma vez e reaproveitados em todos os
+# arquivos. Código de saída: 0 sem problemas, 1 com erros ou alertas, 2
+# quando alguma entrada não existe ou nenhum arquivo foi achado.
+
+FASES = ('lex', 'parse', 'semantic')
+MODOS_IMPORTS = ('todos', 'sob-demanda')
+
+SAIDA_OK = 0
+SAIDA_PROBLEMAS = 1
+SAIDA_ENTRADA_INVALIDA = 2
+
+def _arquivos_da_pasta(pasta):
+    arquivos = []
+    for root, dirs, files in os.walk(pasta):
+        # Pastas ocultas (.tonto_cache, .git, ...) nunca têm fontes
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for file in files:
+            if file.endswith('.tonto'):
+                arquivos.append(os.path.abspath(os.path.join(root, file)))
+    return arquivos
+
+def _eh_ontouml(caminho):
+    # O manifesto de projeto também é .json, mas não é um modelo
+    return caminho.endswith('.json') and os.path.basename(caminho) != projeto.MANIFESTO
+
+def expandir_entradas(entradas):
+    # Devolve (arquivos sem repetição em ordem estável, entradas sem correspondência)
+    arquivos = []
+    vistos = set()
+    invalidas = []
+
+    def adicionar(caminho):
+        if caminho not in vistos:
+            vistos.add(caminho)
+            arquivos.append(caminho)
+
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = _arquivos_da_pasta(entrada)
+        elif os.path.isfile(entrada):
+            candidatos = [os.path.abspath(entrada)]
+        elif glob.has_magic(entrada):
+            candidatos = []
+            for encontrado in sorted(glob.glob(entrada, recursive=True)):
+                if os.path.isdir(encontrado):
+                    candidatos.extend(_arquivos_da_pasta(encontrado))
+                elif encontrado.endswith('.tonto') or _eh_ontouml(encontrado):
+                    candidatos.append(os.path.abspath(encontrado))
+        else:
+            candidatos = []
+
+        if not candidatos:
+            invalidas.append(entrada)
+        for caminho in sorted(candidatos):
+            adicionar(caminho)
+    return arquivos, invalidas
+
+def _novo_resultado(caminho):
+    return {'caminho': caminho, 'tokens': 0, 'erros_lexicos': [], 'erros_sintaticos': [], 'alertas': []}
+
+class Verificador:
+    # Guarda as estruturas caras (lexer, tabelas do parser, caches e
+    # resolvedores de imports) para todas as entradas de uma execução
+    def __init__(self, fase, usar_cache=True, imports='todos', por_projeto=False):
+        if fase not in FASES:
+            raise ValueError(f"Fase desconhecida: {fase} (use {', '.join(FASES)})")
+        if imports not in MODOS_IMPORTS:
+            raise ValueError(f"Modo de imports desconhecido: {imports} (use {', '.join(MODOS_IMPORTS)})")
+        self.fase = fase
+        self.usar_cache = usar_cache
+        self.imports = imports
+        self.por_projeto = por_projeto
+        self.lexer = analisador_lexico.build() if fase == 'lex' else None
+        self._caches = {}
+        self._resolvedores = {}
+        # caminho -> alertas vindos da análise do projeto inteiro (por_projeto)
+        self._do_projeto = {}
+
+    def _raiz(self, caminho):
+        return projeto.localizar_raiz(caminho) or os.path.dirname(caminho)
+
+    def _cache(self, caminho):
+        if not self.usar_cache:
+            return None
+        raiz = self._raiz(caminho)
+        if raiz not in self._caches:
+            self._caches[raiz] = cache_ast.CacheAST(os.path.join(raiz, cache_ast.PASTA_CACHE))
+        return self._caches[raiz]
+
+    def _resolvedor(self, caminho):
+        # Um resolvedor por projeto: arquivos importados por várias entradas
+        # são analisados uma única vez
+        raiz = self._raiz(caminho)
+        if raiz not in self._resolvedores:
+            self._resolvedores[raiz] = resolvedor_imports.ResolvedorImports(self._cache(caminho))
+        return self._resolvedores[raiz]
+
+    def preparar(self, arquivos):
+        # Na fase semântica carrega todas as entradas de cada projeto de uma
+        # vez: o grafo de imports é montado uma única vez por resolvedor.
+        # Com imports sob demanda nada é lido antes da hora
+        if self.fase != 'semantic' or self.imports == 'sob-demanda':
+            return
+        por_raiz = {}
+        for caminho in arquivos:
+            if _eh_ontouml(caminho):
+                continue
+            por_raiz.setdefault(self._raiz(caminho), []).append(caminho)
+        for raiz, entradas in por_raiz.items():
+            if self.por_projeto and os.path.exists(os.path.join(raiz, projeto.MANIFESTO)):
+                self._analisar_projeto(raiz)
+            pendentes = [caminho for caminho in entradas if caminho not in self._do_projeto]
+            if pendentes:
+                self._resolvedor(pendentes[0]).carregar(pendentes)
+
+    def verificar_todos(self, arquivos, workers=None):
+        # Gera os resultados na ordem de arquivos. Nas fases parse e semantic
+        # os .tonto passam pela esteira (projeto.compilar_em_esteira): um
+        # arquivo é verificado assim que ele e os arquivos do seu fecho de
+        # imports que também são entradas chegam, enquanto os seguintes
+        # ainda são lidos e analisados nos processos do pool. O padrão deixa
+        # um núcleo para a verificação e os outros para o parse; workers=0
+        # (ou uma CPU só) verifica um arquivo por vez, sem esteira
+        if workers is None:
+            workers = (os.cpu_count() or 1) - 1
+        if self.fase == 'lex' or workers <= 0:
+            self.preparar(arquivos)
+            for caminho in arquivos:
+                yield self.verificar(caminho)
+            return
+
+        semantica = self.fase == 'semantic'
+        if semantica and self.imports == 'todos' and self.por_projeto:
+            for raiz in dict.fromkeys(self._raiz(caminho) for caminho in arquivos if not _eh_ontouml(caminho)):
+                if os.path.exists(os.path.join(raiz, projeto.MANIFESTO)):
+                    self._analisar_projeto(raiz)
+        tarefas = []
+        for caminho in arquivos:
+            if _eh_ontouml(caminho) or caminho in self._do_projeto:
+                continue
+            if not semantica:
+                tarefas.append((caminho, self._cache(caminho), None))
+            elif caminho not in self._resolvedor(caminho).asts:
+                tarefas.append((caminho, self._cache(caminho), self._resolvedor(caminho).tabela))
+        na_esteira = {caminho for caminho, _, _ in tarefas}
+        esperados = set(na_esteira)
+        prontos = {}
+        aguardando = []
+        proximo = 0
+
+        def escoar():
+            # Resultados prontos, na ordem das entradas; quem não passa pela
+            # esteira é verificado na sua vez
+            nonlocal proximo
+            while proximo < len(arquivos):
+                caminho = arquivos[proximo]
+                if caminho not in na_esteira:
+                    yield self.verificar(caminho)
+                elif caminho in prontos:
+                    yield prontos.pop(caminho)
+                else:
+                    return
+                proximo += 1
+
+        for caminho, ast, saida, do_cache in projeto.compilar_em_esteira(tarefas, workers):
+            esperados.discard(caminho)
+            if not semantica:
+                prontos[caminho] = self._resultado_sintatico(caminho, ast)
+            else:
+                resolvedor = self._resolvedor(caminho)
+                # Sob demanda, outra entrada pode ter precisado dele antes
+                if caminho not in resolvedor.asts:
+                    resolvedor.registrar(caminho, ast, saida, do_cache)
+                aguardando.append(caminho)
+                restantes = []
+                for outro in aguardando:
+                    if self._fecho_chegou(outro, esperados):
+                        prontos[outro] = self._verificar_semantico(outro)
+                    else:
+                        restantes.append(outro)
+                aguardando = restantes
+            yield from escoar()
+        yield from escoar()
+
+    def _fecho_chegou(self, caminho, esperados):
+        # Nenhum arquivo do fecho de imports ainda está na esteira
+        if self.imports == 'sob-demanda':
+            return True
+        resolvedor = self._resolvedor(caminho)
+        vistos = set()
+        pilha = [caminho]
+        while pilha:
+            atual = pilha.pop()
+            if atual in vistos:
+                continue
+            vistos.add(atual)
+            if atual in esperados:
+                return False
+            if atual in resolvedor.asts:
+                pilha.extend(resolvedor.dependencias(atual))
+        return True
+
+    def _analisar_projeto(self, raiz):
+        # Uma única análise semântica sobre todos os arquivos do projeto
+        # (tonto.json), em vez de uma por fecho de imports de cada entrada;
+        # os alertas são distribuídos pelos arquivos que os originaram
+        resultados, analisador = projeto.compilar_projeto(raiz, usar_cache=self.usar_cache)
+        resolvedor = self._resolvedor(raiz)
+        alertas = {}
+        for caminho, ast, saida, do_cache in resultados:
+            resolvedor.registrar(caminho, ast, saida, do_cache)
+            alertas[caminho] = []
+        for conflito in analisador.ast.conflitos:
+            for caminho in conflito['arquivos']:
+                alertas[caminho].append({'padrao': 'ConflitoDeNomes', 'mensagem': conflito['mensagem']})
+        for caminho, itens in projeto.resultados_por_arquivo(analisador).items():
+            alertas[caminho].extend({'padrao': item['padrao'], 'mensagem': item['mensagem']}
+                                    for item in itens if item['tipo'] == 'ALERTA')
+        self._do_projeto.update(alertas)
+
+    def verificar(self, caminho):
+        if _eh_ontouml(caminho):
+            return self._verificar_ontouml(caminho)
+        if self.fase == 'lex':
+            return self._verificar_lexico(caminho)
+        if self.fase == 'parse':
+            return self._verificar_sintatico(caminho)
+        return self._verificar_semantico(caminho)
+
+    def _verificar_lexico(self, caminho):
+        resultado = _novo_resultado(caminho)
+        self.lexer.erros_lexicos = resultado['erros_lexicos']
+        self.lexer.lineno = 1
+        self.lexer.limite_erros = analisador_sintatico.MAX_ERROS
+        try:
+            for _ in analisador_lexico.iter_tokens(caminho, self.lexer):
+                resultado['tokens'] += 1
+        except analisador_lexico.LimiteDeErros as erro:
+            resultado['erros_lexicos'].append({'line': erro.linha, 'message': str(erro)})
+        return resultado
+
+    def _verificar_sintatico(self, caminho):
+        ast, _, _ = cache_ast.parse_arquivo(caminho, self._cache(caminho))
+        return self._resultado_sintatico(caminho, ast)
+
+    def _resultado_sintatico(self, caminho, ast):
+        resultado = _novo_resultado(caminho)
+        resultado['erros_lexicos'] = list(ast.lex_errors)
+        resultado['erros_sintaticos'] = list(ast.errors)
+        return resultado
+
+    def _verificar_ontouml(self, caminho):
+        # Modelo do editor: não há léxico; erros de JSON e referências
+        # quebradas contam como sintáticos
+        resultado = _novo_resultado(caminho)
+        ast = ontouml_json.importar_ontouml(caminho)
+        resultado['erros_sintaticos'] = list(ast.errors)
+        if self.fase == 'semantic':
+            for item in analisador_semantico.AnalisadorSemantico(ast).analisar():
+                if item['tipo'] == 'ALERTA':
+                    resultado['alertas'].append({'padrao': item['padrao'], 'mensagem': item['mensagem']})
+        return resultado
+
+    def _verificar_semantico(self, caminho):
+        resultado = _novo_resultado(caminho)
+        resolvedor = self._resolvedor(caminho)
+        do_projeto = self._do_projeto.get(caminho)
+        if do_projeto is not None:
+            modelo = None
+        elif self.imports == 'sob-demanda':
+            modelo = resolvedor.modelo_sob_demanda(caminho)
+        else:
+            if caminho not in resolvedor.asts:
+                resolvedor.carregar([caminho])
+            modelo = resolvedor.ast_mesclada(caminho)
+        ast = resolvedor.asts[caminho]
+        resultado['erros_lexicos'] = list(ast.lex_errors)
+        resultado['erros_sintaticos'] = list(ast.errors)
+
+        for nome, _, existe in resolvedor.imports[caminho]:
+            if not existe:
+                resultado['alertas'].append({'padrao': 'Import', 'mensagem': f"Arquivo não encontrado: {nome}.tonto"})
+        if do_projeto is not None:
+            resultado['alertas'].extend(do_projeto)
+            return resultado
+
+        # Os conflitos são lidos depois da análise: sob demanda, só então o
+        # modelo tem todos os imports que a análise precisou
+        analisador = analisador_semantico.AnalisadorSemantico(modelo)
+        alertas = [{'padrao': item['padrao'], 'mensagem': item['mensagem']}
+                   for item in analisador.analisar() if item['tipo'] == 'ALERTA']
+        for conflito in modelo.conflitos:
+            resultado['alertas'].append({'padrao': 'ConflitoDeNomes', 'mensagem': conflito['mensagem']})
+        resultado['alertas'].extend(alertas)
+        return resultado
+
+def _exibir(relatorio, resultado, base, detalhes):
+    caminho = resultado['caminho']
+    relativo = os.path.relpath(caminho, base)
+    erros = resultado['erros_lexicos'] + resultado['erros_sintaticos']
+    alertas = resultado['alertas']
+    if erros:
+        status = "ERRO"
+    elif alertas:
+        status = "ALERTA"
+    else:
+        status = "OK"
+    relatorio.texto(f"{status:<6} {relativo} ({len(erros)} erro(s), {len(alertas)} alerta(s))")
+    relatorio.registrar('arquivo', arquivo=caminho, status=status.lower(),
+                        erros=len(erros), alertas=len(alertas))
+
+    for erro in resultado['erros_lexicos']:
+        if detalhes:
+            relatorio.texto(f"       {relativo}:{erro['line']}: léxico: {erro['message']}")
+        relatorio.diagnostico('lexico', 'erro', erro['message'], linha=erro['line'], arquivo=caminho)
+    for erro in resultado['erros_sintaticos']:
+        if detalhes:
+            relatorio.texto(f"       {relativo}:{erro['line']}: sintático: {erro['message']}")
+        relatorio.diagnostico('sintatico', 'erro', erro['message'], linha=erro['line'],
+                              sugestao=erro['suggestion'], arquivo=caminho)
+    for alerta in alertas:
+        if detalhes:
+            relatorio.texto(f"       {relativo}: {alerta['padrao']}: {alerta['mensagem']}")
+        relatorio.diagnostico('semantico', 'alerta', alerta['mensagem'], regra=alerta['padrao'], arquivo=caminho)
+
+def check(args):
+    arquivos, invalidas = expandir_entradas(args.caminhos)
+    for entrada in invalidas:
+        print(f"[ERRO] Nenhum arquivo .tonto em: {entrada}", file=sys.stderr)
+    if not arquivos:
+        return SAIDA_ENTRADA_INVALIDA
+
+    verificador = Verificador(args.phase, not args.sem_cache, args.imports, args.projeto)
+    relatorio = relatorios.atual()
+    # O lexer e o parser escrevem os erros ao encontrá-los; aqui eles são
+    # descartados e saem uma vez, no formato do relatório
+    silencioso = relatorios.Relatorio(relatorios.Escritor())
+    base = os.getcwd()
+    com_erros = com_alertas = 0
+    resultados = verificador.verificar_todos(arquivos, args.workers)
+    with relatorio.bloco():
+        while True:
+            with relatorios.usar(silencioso):
+                resultado = next(resultados, None)
+            if resultado is None:
+                break
+            if resultado['erros_lexicos'] or resultado['erros_sintaticos']:
+                com_erros += 1
+            elif resultado['alertas']:
+                com_alertas += 1
+            _exibir(relatorio, resultado, base, not args.quiet)
+
+        relatorio.texto(f"\n{len(arquivos)} arquivo(s) verificado(s) [{args.phase}]: "
+                        f"{com_erros} com erros, {com_alertas} com alertas")
+        relatorio.registrar('resumo_check', fase=args.phase, arquivos=len(arquivos),
+                            com_erros=com_erros, com_alertas=com_alertas)
+    if invalidas:
+        return SAIDA_ENTRADA_INVALIDA
+    return SAIDA_PROBLEMAS if com_erros or com_alertas else SAIDA_OK
+
+def _fonte_de_asts(entrada, usar_cache=True):
+    # Função que devolve as ASTs da entrada em ordem, para o gerador:
+    # projeto (tonto.json) ou pasta -> arquivos relidos a cada etapa, do
+    # cache quando possível; arquivo -> ele e os imports, já em memória;
+    # modelo OntoUML (.json) -> importado uma vez
+    if _eh_ontouml(entrada):
+        ast = ontouml_json.importar_ontouml(entrada)
+        return [entrada], lambda: iter([ast])
+    if os.path.isdir(entrada):
+        if os.path.exists(os.path.join(entrada, projeto.MANIFESTO)):
+            arquivos = projeto.descobrir_arquivos(entrada)
+        else:
+            arquivos = sorted(_arquivos_da_pasta(entrada))
+        cache = projeto.cache_do_projeto(entrada) if usar_cache else None
+        if cache is None:
+            asts = [cache_ast.parse_arquivo(caminho)[0] for caminho in arquivos]
+            return arquivos, lambda: iter(asts)
+        return arquivos, lambda: (cache_ast.parse_arquivo(caminho, cache)[0] for caminho in arquivos)
+
+    resolvedor = resolvedor_imports.ResolvedorImports(projeto.cache_do_projeto(entrada) if usar_cache else None)
+    resolvedor.carregar([entrada])
+    arquivos = resolvedor.fecho(entrada)
+    return arquivos, lambda: (resolvedor.asts[caminho] for caminho in arquivos)
+
+def gufo(args):
+    if not os.path.exists(args.entrada):
+        print(f"[ERRO] Entrada não encontrada: {args.entrada}", file=sys.stderr)
+        return SAIDA_ENTRADA_INVALIDA
+
+    erros = 0
+    with relatorios.usar(relatorios.Relatorio(relatorios.Escritor())):
+        arquivos, obter_asts = _fonte_de_asts(args.entrada, not args.sem_cache)
+
+        def contar_erros():
+            nonlocal erros
+            for ast in obter_asts():
+                erros += len(ast.errors) + len(ast.lex_errors)
+                yield ast
+        primeira = [True]
+
+        def asts():
+            # Os erros são contados só na primeira etapa
+            if primeira[0]:
+                primeira[0] = False
+                return contar_erros()
+            return obter_asts()
+
+        if args.saida == '-':
+            triplas = gerador_gufo.gerar_turtle(asts, sys.stdout, args.base)
+        else:
+            triplas = gerador_gufo.gerar_turtle(asts, args.saida, args.base)
+
+    print(f"{triplas} tripla(s) de {len(arquivos)} arquivo(s)"
+          + (f" em {args.saida}" if args.saida != '-' else ""), file=sys.stderr)
+    if erros:
+        print(f"[AVISO] {erros} erro(s) léxico(s)/sintático(s): a ontologia pode estar incompleta",
+              file=sys.stderr)
+        return SAIDA_PROBLEMAS
+    return SAIDA_OK
+
+def ontouml(args):
+    if not os.path.exists(args.entrada):
+        print(f"[ERRO] Entrada não encontrada: {args.entrada}", file=sys.stderr)
+        return SAIDA_ENTRADA_INVALIDA
+
+    erros = 0
+    with relatorios.usar(relatorios.Relatorio(relatorios.Escritor())):
+        arquivos, obter_asts = _fonte_de_asts(args.entrada, not args.sem_cache)
+        for ast in obter_asts():
+            erros += len(ast.errors) + len(ast.lex_errors)
+        nome = args.nome or os.path.splitext(os.path.basename(os.path.normpath(args.entrada)))[0]
+        destino = sys.stdout if args.saida == '-' else args.saida
+        elementos = ontouml_json.exportar_ontouml(obter_asts, destino, nome)
+
+    print(f"{elementos} elemento(s) de {len(arquivos)} arquivo(s)"
+          + (f" em {args.saida}" if args.saida != '-' else ""), file=sys.stderr)
+    if erros:
+        print(f"[AVISO] {erros} erro(s) léxico(s)/sintático(s): o modelo pode estar incompleto",
+              file=sys.stderr)
+        return SAIDA_PROBLEMAS
+    return SAIDA_OK
+
+def limpar_cache(args):
+    # Apaga do cache de cada projeto as ASTs de outras versões da gramática
+    for caminho in args.caminhos:
+        if not os.path.exists(caminho):
+            print(f"[ERRO] Entrada não encontrada: {caminho}", file=sys.stderr)
+            return SAIDA_ENTRADA_INVALIDA
+    for caminho in args.caminhos:
+        cache = projeto.cache_do_projeto(caminho)
+        removidas = cache.limpar()
+        print(f"{removidas} versão(ões) antiga(s) removida(s) de {cache.raiz}", file=sys.stderr)
+    return SAIDA_OK
+
+def argumentos(argv=None):
+    parser = argparse.ArgumentParser(prog='tonto', description="Compilador TONTO (linha de comando)")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_check = comandos.add_parser('check', help="verifica arquivos, pastas ou globs")
+    p_check.add_argument('caminhos', nargs='+', metavar='CAMINHO',
+                         help="arquivo .tonto, pasta ou glob (use aspas para '**')")
+    p_check.add_argument('--phase', choices=FASES, default='semantic',
+                         help="até qual fase analisar (padrão: semantic)")
+    p_check.add_argument('--lexer', choices=analisador_lexico.BACKENDS, default=None,
+                         help="backend do analisador léxico (padrão: ply)")
+    p_check.add_argument('--max-errors', type=int, default=None, metavar='N',
+                         help="erros por arquivo antes de interromper a análise (0 = sem limite)")
+    p_check.add_argument('--sem-cache', action='store_true',
+                         help="ignora o cache de ASTs em disco (.tonto_cache)")
+    p_check.add_argument('--imports', choices=MODOS_IMPORTS, default='todos',
+                         help="todos: lê o fecho de imports antes da análise semântica; "
+                              "sob-demanda: só os imports que declaram nomes usados (padrão: todos)")
+    p_check.add_argument('--workers', type=int, default=None, metavar='N',
+                         help="processos de análise sintática da esteira (padrão: núcleos da CPU "
+                              "menos um; 0 = um arquivo por vez, sem esteira)")
+    p_check.add_argument('--projeto', action='store_true',
+                         help="na fase semântica, analisa cada projeto (tonto.json) de uma vez e "
+                              "atribui cada alerta ao arquivo que o originou")
+    p_check.add_argument('-q', '--quiet', action='store_true',
+                         help="só uma linha por arquivo, sem o detalhe dos problemas")
+    p_check.add_argument('--metrics', nargs='?', const='-', default=None, metavar='ARQUIVO',
+                         help="ao final, emite um resumo JSON das métricas da execução")
+    relatorios.adicionar_argumentos(p_check, tabela_tokens=False)
+
+    p_gufo = comandos.add_parser('gufo', help="gera a ontologia gUFO (OWL/Turtle) do modelo")
+    p_gufo.add_argument('entrada', help="arquivo .tonto (com seus imports), pasta, projeto (tonto.json) "
+                                        "ou modelo OntoUML (.json)")
+    p_gufo.add_argument('-o', '--saida', default='-', metavar='ARQUIVO',
+                        help="arquivo Turtle de saída (padrão: stdout)")
+    p_gufo.add_argument('--base', default=gerador_gufo.BASE_PADRAO,
+                        help=f"IRI base da ontologia (padrão: {gerador_gufo.BASE_PADRAO})")
+    p_gufo.add_argument('--lexer', choices=analisador_lexico.BACKENDS, default=None,
+                        help="backend do analisador léxico (padrão: ply)")
+    p_gufo.add_argument('--max-errors', type=int, default=None, metavar='N',
+                        help="erros por arquivo antes de interromper a análise (0 = sem limite)")
+    p_gufo.add_argument('--sem-cache', action='store_true',
+                        help="ignora o cache de ASTs em disco (.tonto_cache)")
+
+    p_ontouml = comandos.add_parser('ontouml', help="exporta o modelo no formato JSON do OntoUML")
+    p_ontouml.add_argument('entrada', help="arquivo .tonto (com seus imports), pasta ou projeto (tonto.json)")
+    p_ontouml.add_argument('-o', '--saida', default='-', metavar='ARQUIVO',
+                           help="arquivo JSON de saída (padrão: stdout)")
+    p_ontouml.add_argument('--nome', default=None,
+                           help="nome do projeto OntoUML (padrão: nome da entrada)")
+    p_ontouml.add_argument('--lexer', choices=analisador_lexico.BACKENDS, default=None,
+                           help="backend do analisador léxico (padrão: ply)")
+    p_ontouml.add_argument('--max-errors', type=int, default=None, metavar='N',
+                           help="erros por arquivo antes de interromper a análise (0 = sem limite)")
+    p_ontouml.add_argument('--sem-cache', action='store_true',
+                           help="ignora o cache de ASTs em disco (.tonto_cache)")
+
+    p_limpar = comandos.add_parser('limpar-cache',
+                                   help="remove do .tonto_cache as ASTs de outras versões da gramática")
+    p_limpar.add_argument('caminhos', nargs='*', default=['.'], metavar='CAMINHO',
+                          help="projeto, pasta ou arquivo cujo cache limpar (padrão: pasta atual)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = argumentos(argv)
+    if args.comando == 'limpar-cache':
+        return limpar_cache(args)
+    if args.lexer:
+        # Via ambiente para valer também nos processos do pool
+        os.environ['TONTO_LEXER'] = args.lexer
+        analisador_lexico.BACKEND_PADRAO = args.lexer
+    if args.max_errors is not None:
+        os.environ['TONTO_MAX_ERROS'] = str(args.max_errors)
+        analisador_sintatico.MAX_ERROS = args.max_errors
+    if args.comando == 'gufo':
+        return gufo(args)
+    if args.comando == 'ontouml':
+        return ontouml(args)
+
+    with relatorios.usar_dos_argumentos(args):
+        if args.metrics is None:
+            return check(args)
+        with metricas.coletar() as coletor:
+            codigo = check(args)
+        metricas.emitir(coletor, args.metrics)
+    return codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+import re
+
+# Gera uma ontologia OWL em Turtle, segundo o gUFO, a partir das ASTs de um
+# modelo, no mesmo formato dos arquivos em generated-files/. As triplas são
+# escritas no destino à medida que são produzidas: nenhum grafo é montado em
+# memória. Guarda-se só o necessário para nomear os recursos (nomes já
+# usados e as classes renomeadas de cada arquivo).
+#
+# A saída segue a ordem de declaração dos arquivos, sempre igual para a
+# mesma entrada:
+#   1. cabeçalho (prefixos e owl:Ontology)
+#   2. classes, tipos de dados, enumerações e atributos
+#   3. especializações (gensets e specializes) e axiomas dos gensets
+#   4. relações (internas e externas) como owl:ObjectProperty
+
+BASE_PADRAO = 'https://example.com'
+
+PREFIXOS = (
+    ('gufo', 'http://purl.org/nemo/gufo#'),
+    ('rdf', 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'),
+    ('rdfs', 'http://www.w3.org/2000/01/rdf-schema#'),
+    ('owl', 'http://www.w3.org/2002/07/owl#'),
+    ('xsd', 'http://www.w3.org/2001/XMLSchema#'),
+)
+
+# estereótipo -> (tipo gUFO da classe, superclasse gUFO quando a classe não
+# especializa nenhuma outra)
+ESTEREOTIPOS = {
+    'kind': ('gufo:Kind', 'gufo:FunctionalComplex'),
+    'subkind': ('gufo:SubKind', None),
+    'collective': ('gufo:Kind', 'gufo:Collection'),
+    'quantity': ('gufo:Kind', 'gufo:Quantity'),
+    'quality': ('gufo:Kind', 'gufo:Quality'),
+    'mode': ('gufo:Kind', 'gufo:IntrinsicMode'),
+    'intrisicMode': ('gufo:Kind', 'gufo:IntrinsicMode'),
+    'extrinsicMode': ('gufo:Kind', 'gufo:ExtrinsicMode'),
+    'relator': ('gufo:Kind', 'gufo:Relator'),
+    'role': ('gufo:Role', None),
+    'phase': ('gufo:Phase', None),
+    'historicalRole': ('gufo:HistoricalRole', None),
+    'category': ('gufo:Category', 'gufo:FunctionalComplex'),
+    'mixin': ('gufo:Mixin', 'gufo:FunctionalComplex'),
+    'phaseMixin': ('gufo:PhaseMixin', 'gufo:FunctionalComplex'),
+    'roleMixin': ('gufo:RoleMixin', 'gufo:FunctionalComplex'),
+    'historicalRoleMixin': ('gufo:HistoricalRoleMixin', 'gufo:FunctionalComplex'),
+    'event': (None, 'gufo:Event'),
+    'process': (None, 'gufo:Event'),
+    'situation': (None, 'gufo:Situation'),
+}
+
+# estereótipo de relação -> propriedade gUFO especializada
+PROPRIEDADES = {
+    'mediation': 'gufo:mediates',
+    'characterization': 'gufo:inheresIn',
+    'inherence': 'gufo:inheresIn',
+    'externalDependence': 'gufo:externallyDependsOn',
+    'componentOf': 'gufo:isComponentOf',
+    'memberOf': 'gufo:isCollectionMemberOf',
+    'subCollectionOf': 'gufo:isSubCollectionOf',
+    'composition': 'gufo:isProperPartOf',
+    'aggregation': 'gufo:isProperPartOf',
+    'participation': 'gufo:participatedIn',
+    'historicalDependence': 'gufo:historicallyDependsOn',
+    'creation': 'gufo:wasCreatedIn',
+    'termination': 'gufo:wasTerminatedIn',
+    'manifestation': 'gufo:manifestedIn',
+    'bringsAbout': 'gufo:broughtAbout',
+    'triggers': 'gufo:contributedToTrigger',
+}
+
+TIPOS_NATIVOS = {
+    'string': 'xsd:string',
+    'number': 'xsd:decimal',
+    'boolean': 'xsd:boolean',
+    'date': 'xsd:date',
+    'time': 'xsd:time',
+    'datetime': 'xsd:dateTime',
+}
+
+# Nomes que podem ser escritos como :nome (PN_LOCAL simplificado)
+_NOME_LOCAL = re.compile(r'[A-Za-z_][A-Za-z0-9_\-]*\Z')
+
+def _literal(texto):
+    escapado = texto.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{escapado}"@en'
+
+class GeradorTurtle:
+    def __init__(self, saida, base=BASE_PADRAO):
+        self.saida = saida
+        self.base = base.rstrip('#')
+        # Nomes locais já atribuídos e o próximo sufixo de cada nome repetido
+        self._usados = set()
+        self._sufixos = {}
+        # Por arquivo, só as classes que receberam um nome diferente do
+        # declarado (homônimas de classes de arquivos anteriores)
+        self._renomeadas = []
+        self._enums = set()
+        self.triplas = 0
+
+    def _termo(self, nome):
+        if _NOME_LOCAL.match(nome):
+            return f":{nome}"
+        return f"<{self.base}#{nome}>"
+
+    def _novo_nome(self, nome):
+        # Primeiro uso fica com o próprio nome; os seguintes ganham _1, _2, ...
+        if nome not in self._usados:
+            self._usados.add(nome)
+            return nome
+        sufixo = self._sufixos.get(nome, 1)
+        while f"{nome}_{sufixo}" in self._usados:
+            sufixo += 1
+        self._sufixos[nome] = sufixo + 1
+        unico = f"{nome}_{sufixo}"
+        self._usados.add(unico)
+        return unico
+
+    def _classe(self, indice, nome):
+        # Referência a uma classe: a do próprio arquivo, senão a primeira
+        # declarada com esse nome
+        return self._termo(self._renomeadas[indice].get(nome, nome))
+
+    def _escrever(self, sujeito, predicados):
+        # predicados: [(predicado, [objetos])] agrupados com ';' e ','
+        partes = []
+        for predicado, objetos in predicados:
+            partes.append(f"{predicado} {', '.join(objetos)}")
+            self.triplas += len(objetos)
+        self.saida.write(f"{sujeito} " + ";\n    ".join(partes) + ".\n")
+
+    def gerar(self, obter_asts):
+        # obter_asts() devolve as ASTs dos arquivos em ordem e é chamada uma
+        # vez por etapa: quem a fornece pode reler cada AST (do cache, por
+        # exemplo) em vez de manter todas em memória
+        self._cabecalho()
+        for indice, ast in enumerate(obter_asts()):
+            self._declaracoes(indice, ast)
+        for indice, ast in enumerate(obter_asts()):
+            self._especializacoes(indice, ast)
+        for indice, ast in enumerate(obter_asts()):
+            self._gensets(indice, ast)
+        for indice, ast in enumerate(obter_asts()):
+            self._relacoes(indice, ast)
+        return self.triplas
+
+    def _cabecalho(self):
+        self.saida.write(f"@prefix : <{self.base}#>.\n")
+        for prefixo, iri in PREFIXOS:
+            self.saida.write(f"@prefix {prefixo}: <{iri}>.\n")
+        self.saida.write("\n")
+        self._escrever(f"<{self.base}>", [('rdf:type', ['owl:Ontology']), ('owl:imports', ['gufo:'])])
+
+    def _declaracoes(self, indice, ast):
+        renomeadas = {}
+        self._renomeadas.append(renomeadas)
+        for classe in ast.classes:
+            nome = self._novo_nome(classe.name)
+            if nome != classe.name:
+                renomeadas[classe.name] = nome
+            tipo, superclasse = ESTEREOTIPOS.get(classe.stereotype, (None, None))
+            tipos = ['owl:Class'] + ([tipo] if tipo else []) + ['owl:NamedIndividual']
+            predicados = [('rdf:type', tipos)]
+            if superclasse and not classe.specializes:
+                predicados.append(('rdfs:subClassOf', [superclasse]))
+            predicados.append(('rdfs:label', [_literal(classe.name)]))
+            self._escrever(self._termo(nome), predicados)
+
+        for datatype in ast.datatypes:
+            nome = self._novo_nome(datatype.name)
+            if nome != datatype.name:
+                renomeadas[datatype.name] = nome
+            self._escrever(self._termo(nome), [('rdf:type', ['rdfs:Datatype']),
+                                               ('rdfs:label', [_literal(datatype.name)])])
+
+        for enum in ast.enums:
+            nome = self._novo_nome(enum.name)
+            if nome != enum.name:
+                renomeadas[enum.name] = nome
+            self._enums.add(nome)
+            termo = self._termo(nome)
+            valores = [self._termo(self._novo_nome(valor)) for valor in enum.instances]
+            self._escrever(termo, [('rdf:type', ['owl:Class']), ('rdfs:label', [_literal(enum.name)])])
+            if valores:
+                self.saida.write(f"{termo} owl:equivalentClass [\n  rdf:type owl:Class;\n"
+                                 f"  owl:oneOf ({' '.join(valores)})\n].\n")
+                self.triplas += 3
+            for termo_valor, valor in zip(valores, enum.instances):
+                self._escrever(termo_valor, [('rdf:type', ['owl:NamedIndividual', termo]),
+                                             ('rdfs:label', [_literal(valor)])])
+
+        for dono in list(ast.classes) + list(ast.datatypes):
+            for atributo in dono.attributes:
+                self._atributo(indice, dono.name, atributo)
+
+    def _atributo(self, indice, dono, atributo):
+        tipo = atributo.type
+        nome = self._termo(self._novo_nome(atributo.name))
+        if tipo in TIPOS_NATIVOS:
+            categoria, faixa = 'owl:DatatypeProperty', TIPOS_NATIVOS[tipo]
+        else:
+            faixa = self._classe(indice, tipo) if tipo else 'xsd:string'
+            categoria = 'owl:ObjectProperty' if faixa[1:] in self._enums else 'owl:DatatypeProperty'
+        self._escrever(nome, [('rdf:type', [categoria]), ('rdfs:domain', [self._classe(indice, dono)]),
+                              ('rdfs:range', [faixa]), ('rdfs:label', [_literal(atributo.name)])])
+
+    def _especializacoes(self, indice, ast):
+        for genset in ast.gensets:
+            geral = self._classe(indice, genset.general)
+            for especifica in genset.specifics:
+                self._escrever(self._classe(indice, especifica), [('rdfs:subClassOf', [geral])])
+        for classe in ast.classes:
+            if classe.specializes:
+                self._escrever(self._classe(indice, classe.name),
+                               [('rdfs:subClassOf', [self._classe(indice, classe.specializes)])])
+
+    def _gensets(self, indice, ast):
+        for genset in ast.gensets:
+            if len(genset.specifics) < 2 and 'complete' not in (genset.modifiers or []):
+                continue
+            membros = ' '.join(self._classe(indice, especifica) for especifica in genset.specifics)
+            if 'disjoint' in (genset.modifiers or []) and len(genset.specifics) > 1:
+                self.saida.write(f"[ rdf:type owl:AllDisjointClasses ] owl:members ({membros}).\n")
+                self.triplas += 2
+            if 'complete' in (genset.modifiers or []):
+                self.saida.write(f"{self._classe(indice, genset.general)} owl:equivalentClass [\n"
+                                 f"  rdf:type owl:Class;\n  owl:unionOf ({membros})\n].\n")
+                self.triplas += 3
+
+    def _relacoes(self, indice, ast):
+        for classe in ast.classes:
+            for relacao in classe.internal_relations:
+                self._propriedade(indice, relacao.stereotype, relacao.name, classe.name, relacao.target)
+        for relacao in ast.relations:
+            self._propriedade(indice, relacao.stereotype, relacao.name, relacao.domain, relacao.range)
+
+    def _propriedade(self, indice, estereotipo, nome, dominio, alvo):
+        rotulo = nome or f"{estereotipo or 'relation'}_{dominio}_{alvo}"
+        predicados = [('rdf:type', ['owl:ObjectProperty']),
+                      ('rdfs:domain', [self._classe(indice, dominio)]),
+                      ('rdfs:range', [self._classe(indice, alvo)]),
+                      ('rdfs:label', [_literal(rotulo)])]
+        if estereotipo in PROPRIEDADES:
+            predicados.append(('rdfs:subPropertyOf', [PROPRIEDADES[estereotipo]]))
+        self._escrever(self._termo(self._novo_nome(rotulo)), predicados)
+
+def gerar_turtle(obter_asts, destino, base=BASE_PADRAO):
+    # destino: caminho ou arquivo já aberto; devolve o número de triplas
+    if hasattr(destino, 'write'):
+        return GeradorTurtle(destino, base).gerar(obter_asts)
+    with open(destino, 'w', encoding='utf-8', buffering=1 << 20) as saida:
+        return GeradorTurtle(saida, base).gerar(obter_asts)
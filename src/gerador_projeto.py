@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import sys
+
+# Gera projetos TONTO sintéticos e válidos, de tamanho configurável, para
+# medir como o lexer, o parser e a análise semântica escalam. Os arquivos
+# formam uma árvore de imports completa: a raiz importa `fanout` módulos,
+# cada um importa outros `fanout`, até `profundidade` níveis.
+
+PARAMETROS_PADRAO = {
+    'kinds': 100,
+    'subkinds': 2,
+    'phases': 2,
+    'roles': 2,
+    'relators': 1,
+    'mediacoes': 2,
+    'modes': 1,
+    'rolemixins': 1,
+    'atributos': 2,
+    'enums': 1,
+    'valores': 4,
+    'fanout': 2,
+    'profundidade': 2,
+}
+
+def _letras(n):
+    # 0 -> a, 25 -> z, 26 -> ba ... : nomes em minúsculas sem dígito final,
+    # que o lexer classifica como RELATION_NAME (e não INSTANCE)
+    texto = ''
+    while True:
+        texto = chr(ord('a') + n % 26) + texto
+        n //= 26
+        if n == 0:
+            return texto
+
+def nomes_dos_arquivos(fanout, profundidade):
+    total = sum(fanout ** nivel for nivel in range(profundidade + 1)) if fanout else 1
+    return ['Modelo'] + [f"Modulo_{indice}" for indice in range(1, total)]
+
+def filhos_do_arquivo(indice, fanout, total):
+    primeiro = indice * fanout + 1
+    return [filho for filho in range(primeiro, primeiro + fanout) if filho < total]
+
+def _distribuir(quantidade, partes):
+    # Divide range(quantidade) em `partes` fatias contíguas de tamanho parecido
+    base, resto = divmod(quantidade, partes)
+    fatias = []
+    inicio = 0
+    for parte in range(partes):
+        fim = inicio + base + (1 if parte < resto else 0)
+        fatias.append(range(inicio, fim))
+        inicio = fim
+    return fatias
+
+def _texto_arquivo(nome, imports, kinds, roles_alcancaveis, p, contagem):
+    linhas = []
+    for nome_import in imports:
+        linhas.append(f"import {nome_import}")
+    linhas.append(f"package {nome}")
+    linhas.append("")
+
+    for k in kinds:
+        kind = f"Kind_{k}"
+        if p['atributos']:
+            linhas.append(f"kind {kind} {{")
+            for a in range(p['atributos']):
+                linhas.append(f"    campo_{_letras(a)} : string [1]")
+            linhas.append("}")
+        else:
+            linhas.append(f"kind {kind}")
+        contagem['declaracoes'] += 1
+
+        for estereotipo, quantidade, rotulo in (('subkind', p['subkinds'], 'Sub'),
+                                                 ('phase', p['phases'], 'Fase'),
+                                                 ('role', p['roles'], 'Papel')):
+            if not quantidade:
+                continue
+            especificos = [f"{kind}_{rotulo}_{i}" for i in range(quantidade)]
+            for especifico in especificos:
+                linhas.append(f"{estereotipo} {especifico} specializes {kind}")
+            contagem['declaracoes'] += quantidade
+            if estereotipo != 'role':
+                linhas.append(f"disjoint complete genset {kind}_{rotulo}s {{")
+                linhas.append(f"    general {kind}")
+                linhas.append(f"    specifics {', '.join(especificos)}")
+                linhas.append("}")
+                contagem['declaracoes'] += 1
+
+        for r in range(p['relators']):
+            linhas.append(f"relator {kind}_Relator_{r} {{")
+            for m in range(p['mediacoes']):
+                if roles_alcancaveis:
+                    alvo = roles_alcancaveis[(k + r + m) % len(roles_alcancaveis)]
+                else:
+                    alvo = kind
+                linhas.append(f"    @mediation [1..*] -- [1] {alvo}")
+            linhas.append("}")
+            contagem['declaracoes'] += 1
+
+        for m in range(p['modes']):
+            linhas.append(f"mode {kind}_Modo_{m} {{")
+            linhas.append(f"    @characterization [1..*] -- [1] {kind}")
+            linhas.append(f"    @externalDependence [1..*] -- [1] {kind}")
+            linhas.append("}")
+            contagem['declaracoes'] += 1
+        linhas.append("")
+
+    if kinds and p['roles'] >= 2:
+        # Relação material entre os dois primeiros papéis do primeiro kind
+        primeiro = f"Kind_{kinds[0]}"
+        linhas.append(f"@material relation {primeiro}_Papel_0 [1..*] -- [1..*] {primeiro}_Papel_1")
+        contagem['declaracoes'] += 1
+
+    for r in range(p['rolemixins']):
+        mixin = f"{nome}_Mixin_{r}"
+        papeis = [f"{mixin}_Papel_{i}" for i in range(2)]
+        linhas.append(f"roleMixin {mixin}")
+        for papel in papeis:
+            linhas.append(f"role {papel} specializes {mixin}")
+        linhas.append(f"disjoint complete genset {mixin}_Papeis {{")
+        linhas.append(f"    general {mixin}")
+        linhas.append(f"    specifics {', '.join(papeis)}")
+        linhas.append("}")
+        contagem['declaracoes'] += 4
+
+    for e in range(p['enums']):
+        valores = ', '.join(f"Valor_{v}" for v in range(p['valores']))
+        linhas.append(f"enum {nome}_Enum_{e} {{ {valores} }}")
+        contagem['declaracoes'] += 1
+
+    return "\n".join(linhas) + "\n"
+
+def gerar_projeto(destino, **parametros):
+    # Escreve tonto.json e src/*.tonto em destino e devolve um resumo do
+    # que foi gerado (arquivos, linhas, bytes e declarações)
+    desconhecidos = set(parametros) - set(PARAMETROS_PADRAO)
+    if desconhecidos:
+        raise ValueError(f"Parâmetros desconhecidos: {', '.join(sorted(desconhecidos))}")
+    p = dict(PARAMETROS_PADRAO, **parametros)
+
+    nomes = nomes_dos_arquivos(p['fanout'], p['profundidade'])
+    total = len(nomes)
+    fatias = _distribuir(p['kinds'], total)
+
+    # Papéis de cada arquivo, para que os relators mediem papéis do próprio
+    # arquivo e dos módulos que ele importa diretamente
+    papeis = [[f"Kind_{k}_Papel_{i}" for k in fatia for i in range(p['roles'])] for fatia in fatias]
+
+    pasta_src = os.path.join(destino, 'src')
+    os.makedirs(pasta_src, exist_ok=True)
+    with open(os.path.join(destino, 'tonto.json'), 'w', encoding='utf-8') as f:
+        json.dump({'projectName': 'ModeloSintetico', 'version': '1.0.0',
+                   'parametros': p, 'outFolder': 'generated-files'}, f, indent=2)
+
+    contagem = {'arquivos': total, 'linhas': 0, 'bytes': 0, 'declaracoes': 0}
+    caminhos = []
+    for indice, nome in enumerate(nomes):
+        filhos = filhos_do_arquivo(indice, p['fanout'], total)
+        alcancaveis = list(papeis[indice])
+        for filho in filhos:
+            alcancaveis.extend(papeis[filho])
+
+        texto = _texto_arquivo(nome, [nomes[filho] for filho in filhos],
+                               list(fatias[indice]), alcancaveis, p, contagem)
+        caminho = os.path.join(pasta_src, f"{nome}.tonto")
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        contagem['linhas'] += texto.count("\n")
+        contagem['bytes'] += len(texto.encode('utf-8'))
+        caminhos.append(caminho)
+
+    contagem['raiz'] = caminhos[0]
+    contagem['caminhos'] = caminhos
+    contagem['parametros'] = p
+    return contagem
+
+def adicionar_argumentos(parser):
+    for nome, padrao in PARAMETROS_PADRAO.items():
+        parser.add_argument(f"--{nome}", type=int, default=padrao)
+
+def parametros_dos_argumentos(args):
+    return {nome: getattr(args, nome) for nome in PARAMETROS_PADRAO}
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um projeto TONTO sintético")
+    parser.add_argument('destino')
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    resumo = gerar_projeto(args.destino, **parametros_dos_argumentos(args))
+    print(f"\n  {resumo['arquivos']} arquivo(s), {resumo['linhas']} linhas, "
+          f"{resumo['declaracoes']} declarações em {os.path.abspath(args.destino)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 
@@ -7,6 +8,11 @@ sys.path.append(diretorio_atual)
 import analisador_lexico
 import analisador_sintatico
 import analisador_semantico
+import metricas
+import relatorios
+import modo_watch
+import projeto
+import resolvedor_imports
 
 LARGURA = 80
 
@@ -14,14 +20,16 @@ def linha(char="="):
     return char * LARGURA
 
 def cabecalho(titulo):
-    print("\n" + linha())
-    print(titulo.center(LARGURA))
-    print(linha())
+    relatorio = relatorios.atual()
+    relatorio.texto("\n" + linha())
+    relatorio.texto(titulo.center(LARGURA))
+    relatorio.texto(linha())
 
 def subcabecalho(titulo):
-    print("\n" + linha("-"))
-    print(titulo)
-    print(linha("-"))
+    relatorio = relatorios.atual()
+    relatorio.texto("\n" + linha("-"))
+    relatorio.texto(titulo)
+    relatorio.texto(linha("-"))
 
 def listar_testes():
     projetos = {}
@@ -100,91 +108,168 @@ def selecionar_arquivo():
     print("\n  [ERRO] Seleção inválida.")
     return None
 
-def processar_imports_recursivamente(caminho_arquivo, ast_principal, arquivos_processados=None):
+def selecionar_projeto():
+    # Pastas de teste com tonto.json: analisadas inteiras, de uma vez
+    caminho_testes = os.path.join(os.path.dirname(diretorio_atual), 'Compiladores_UFERSA-main')
+    raizes = []
+    if os.path.exists(caminho_testes):
+        for nome_pasta in sorted(os.listdir(caminho_testes)):
+            caminho_pasta = os.path.join(caminho_testes, nome_pasta)
+            if os.path.exists(os.path.join(caminho_pasta, projeto.MANIFESTO)):
+                raizes.append(caminho_pasta)
+
+    if not raizes:
+        print("\n  [AVISO] Nenhum projeto com tonto.json encontrado.")
+        return None
+
+    cabecalho("SELEÇÃO DE PROJETO (tonto.json)")
+    for i, raiz in enumerate(raizes, 1):
+        qtd = len(projeto.descobrir_arquivos(raiz))
+        print(f"  [{i}] {os.path.basename(raiz)} ({qtd} arquivo(s))")
+    print("\n  [0] Voltar")
+
+    escolha = input("\n  Escolha o PROJETO: ").strip()
+    if escolha == "0":
+        return None
+    if escolha.isdigit() and 0 < int(escolha) <= len(raizes):
+        return raizes[int(escolha) - 1]
+
+    print("\n  [ERRO] Seleção inválida.")
+    return None
+
+def exibir_saida(saida):
+    # Saída capturada de um parse (possivelmente vinda do cache)
+    if saida:
+        relatorios.atual().texto(saida.rstrip("\n"))
+
+def exibir_imports(resolvedor, caminho_arquivo, arquivos_processados=None):
+    relatorio = relatorios.atual()
     if arquivos_processados is None:
-        arquivos_processados = set()
-    
-    arquivos_processados.add(os.path.abspath(caminho_arquivo))
-    
-    if not hasattr(ast_principal, 'imports') or not ast_principal.imports:
-        return
+        arquivos_processados = {caminho_arquivo}
 
-    diretorio_base = os.path.dirname(caminho_arquivo)
-    
-    for item_import in ast_principal.imports:
-        if isinstance(item_import, tuple) and len(item_import) >= 2:
-            nome_arquivo_import = item_import[1]
-        else:
-            nome_arquivo_import = str(item_import)
-        
-        caminho_import = os.path.join(diretorio_base, f"{nome_arquivo_import}.tonto")
-        caminho_import_abs = os.path.abspath(caminho_import)
-        
-        if caminho_import_abs in arquivos_processados:
+    for nome_arquivo_import, caminho_import, existe in resolvedor.imports[caminho_arquivo]:
+        if caminho_import in arquivos_processados:
             continue
-            
-        if os.path.exists(caminho_import):
-            print(f"     Importando: {nome_arquivo_import}.tonto")
-            
-            with open(caminho_import, 'r') as f:
-                codigo_import = f.read()
-            
-            _, ast_importada = analisador_sintatico.parse(codigo_import)
-            
-            processar_imports_recursivamente(caminho_import, ast_importada, arquivos_processados)
-            
-            ast_principal.classes.extend(ast_importada.classes)
-            ast_principal.relations.extend(ast_importada.relations)
-            ast_principal.gensets.extend(ast_importada.gensets)
-            ast_principal.datatypes.extend(ast_importada.datatypes)
-            ast_principal.enums.extend(ast_importada.enums)
-            
+
+        if existe:
+            arquivos_processados.add(caminho_import)
+            relatorio.texto(f"     Importando: {nome_arquivo_import}.tonto")
+            exibir_saida(resolvedor.saidas[caminho_import])
+            relatorio.diagnosticos_da_ast(resolvedor.asts[caminho_import], caminho_import)
+            exibir_imports(resolvedor, caminho_import, arquivos_processados)
         else:
-            print(f"    [AVISO] Arquivo não encontrado: {nome_arquivo_import}.tonto")
+            relatorio.texto(f"    [AVISO] Arquivo não encontrado: {nome_arquivo_import}.tonto")
+            relatorio.diagnostico('imports', 'alerta', f"Arquivo não encontrado: {nome_arquivo_import}.tonto",
+                                  regra='Import', arquivo=caminho_arquivo)
 
-def executar_analise_lexica(codigo):
-    cabecalho("ANÁLISE LÉXICA")
-    lexer = analisador_lexico.build()
-    tabela, contagem = analisador_lexico.lex_table(codigo, lexer)
-    
-    subcabecalho("TABELA DE TOKENS")
-    print(f"\n  {'LINHA':<8} {'TOKEN':<25} {'VALOR'}")
-    print("  " + "-" * 50)
-    for linha_num, tipo, valor in tabela:
-        print(f"  {linha_num:<8} {tipo:<25} {valor}")
-    
-    subcabecalho("RESUMO")
-    print(f"\n  Total de tokens: {len(tabela)}")
-    print()
-    print(f"  {'TIPO':<25} {'QTD':>5}")
-    print("  " + "-" * 32)
-    for tipo, qtd in sorted(contagem.items()):
-        print(f"  {tipo:<25} {qtd:>5}")
-    
-    print("\n" + linha())
-    print("Análise léxica concluída.".center(LARGURA))
-    print(linha())
+def executar_analise_lexica(caminho_arquivo):
+    relatorio = relatorios.atual()
+    with relatorio.bloco(), relatorio.em_arquivo(caminho_arquivo):
+        cabecalho("ANÁLISE LÉXICA")
+        lexer = analisador_lexico.build()
+        lexer.erros_lexicos = []
+
+        # Os tokens são escritos à medida que são reconhecidos: a tabela
+        # completa nunca fica em memória
+        if relatorio.tabela_tokens:
+            subcabecalho("TABELA DE TOKENS")
+        contagem = analisador_lexico.emitir_tabela_tokens(
+            relatorio, analisador_lexico.iter_tokens(caminho_arquivo, lexer),
+            f"\n  {'LINHA':<8} {'TOKEN':<25} {'VALOR'}", "  " + "-" * 50, recuo="  ")
+        for erro in lexer.erros_lexicos:
+            relatorio.diagnostico('lexico', 'erro', erro['message'], linha=erro['line'])
 
-def executar_analise_sintatica(codigo):
+        subcabecalho("RESUMO")
+        relatorio.texto(f"\n  Total de tokens: {sum(contagem.values())}")
+        relatorio.texto()
+        relatorio.texto(f"  {'TIPO':<25} {'QTD':>5}")
+        relatorio.texto("  " + "-" * 32)
+        for tipo, qtd in sorted(contagem.items()):
+            relatorio.texto(f"  {tipo:<25} {qtd:>5}")
+        relatorio.registrar('contagem_tokens', total=sum(contagem.values()), por_tipo=dict(sorted(contagem.items())))
+
+        relatorio.texto("\n" + linha())
+        relatorio.texto("Análise léxica concluída.".center(LARGURA))
+        relatorio.texto(linha())
+
+def executar_analise_sintatica(codigo, caminho_arquivo=None):
     resultado, ast = analisador_sintatico.parse(codigo)
-    analisador_sintatico.gerar_tabela_sintese()
-    analisador_sintatico.gerar_relatorio_erros()
+    with relatorios.atual().em_arquivo(caminho_arquivo):
+        analisador_sintatico.gerar_tabela_sintese(ast)
+        analisador_sintatico.gerar_relatorio_erros(ast)
     return ast
 
-def executar_analise_semantica(codigo, caminho_arquivo):
+def executar_analise_semantica(caminho_arquivo):
     cabecalho("ANÁLISE SEMÂNTICA")
     
     nome_arquivo = os.path.basename(caminho_arquivo)
-    print(f"  Arquivo principal: {nome_arquivo}")
+    relatorio = relatorios.atual()
+    relatorio.texto(f"  Arquivo principal: {nome_arquivo}")
     
-    _, ast_completa = analisador_sintatico.parse(codigo)
+    caminho_abs = os.path.abspath(caminho_arquivo)
+    resolvedor = resolvedor_imports.ResolvedorImports(projeto.cache_do_projeto(caminho_arquivo))
+    resolvedor.carregar([caminho_abs])
+    exibir_saida(resolvedor.saidas[caminho_abs])
+    relatorio.diagnosticos_da_ast(resolvedor.asts[caminho_abs], caminho_abs)
     
-    if hasattr(ast_completa, 'imports') and ast_completa.imports:
-        print("\n  Resolvendo imports...")
-        processar_imports_recursivamente(caminho_arquivo, ast_completa)
-        print("  Imports processados.\n")
+    if resolvedor.asts[caminho_abs].imports:
+        relatorio.texto("\n  Resolvendo imports...")
+        exibir_imports(resolvedor, caminho_abs)
+        for ciclo in resolvedor.ciclos:
+            nomes = " -> ".join(os.path.basename(arquivo) for arquivo in ciclo)
+            relatorio.texto(f"    [AVISO] Ciclo de imports: {nomes}")
+            relatorio.diagnostico('imports', 'alerta', f"Ciclo de imports: {nomes}", regra='CicloImports',
+                                  arquivo=caminho_abs)
+        relatorio.texto("  Imports processados.\n")
     
-    analisador_semantico.analisar(ast_completa)
+    modelo = resolvedor.ast_mesclada(caminho_abs)
+    exibir_conflitos(modelo, caminho_abs)
+    with relatorio.em_arquivo(caminho_abs):
+        analisador_semantico.analisar(modelo)
+
+def exibir_conflitos(modelo, caminho_arquivo):
+    # Declarações duplicadas e nomes em mais de um pacote do modelo mesclado
+    relatorio = relatorios.atual()
+    for conflito in modelo.conflitos:
+        relatorio.texto(f"  [AVISO] Conflito de nomes: {conflito['mensagem']}")
+        relatorio.diagnostico('imports', 'alerta', conflito['mensagem'], regra='ConflitoDeNomes',
+                              arquivo=caminho_arquivo)
+
+def executar_projeto(raiz, workers=None, usar_cache=True):
+    cabecalho("COMPILAÇÃO DO PROJETO")
+    manifesto = projeto.carregar_manifesto(raiz)
+    nome = manifesto.get('projectName') or os.path.basename(os.path.abspath(raiz))
+    relatorio = relatorios.atual()
+    relatorio.texto(f"  Projeto: {nome}")
+
+    resultados, analisador = projeto.compilar_projeto(raiz, workers, usar_cache)
+
+    with relatorio.bloco():
+        subcabecalho(f"ARQUIVOS ({len(resultados)})")
+        total_erros = 0
+        for caminho, ast, saida, do_cache in resultados:
+            relativo = os.path.relpath(caminho, raiz)
+            erros = len(ast.errors)
+            total_erros += erros
+            status = "[OK]  " if not erros else "[ERRO]"
+            origem = " [cache]" if do_cache else ""
+            relatorio.texto(f"\n  {status} {relativo} ({len(ast.classes)} classe(s), {erros} erro(s)){origem}")
+            for linha_saida in saida.splitlines():
+                relatorio.texto(f"         {linha_saida}")
+            relatorio.registrar('arquivo', arquivo=caminho, classes=len(ast.classes), erros=erros, do_cache=do_cache)
+            relatorio.diagnosticos_da_ast(ast, caminho)
+
+        em_cache = sum(1 for resultado in resultados if resultado[3])
+        relatorio.texto(f"\n  Arquivos analisados: {len(resultados) - em_cache}  |  Reaproveitados do cache: {em_cache}")
+
+        conflitos = analisador.ast.conflitos
+        if conflitos:
+            subcabecalho(f"CONFLITOS DE NOMES ({len(conflitos)})")
+            relatorio.texto()
+            exibir_conflitos(analisador.ast, os.path.abspath(raiz))
+
+    analisador.gerar_relatorio()
+    return total_erros
 
 def menu_tipo_analise(caminho_arquivo):
     nome_arq = os.path.basename(caminho_arquivo)
@@ -200,19 +285,22 @@ def menu_tipo_analise(caminho_arquivo):
         
         opcao = input("\n  Escolha a análise: ").strip()
         
-        try:
-            with open(caminho_arquivo, 'r') as f:
-                codigo = f.read()
-        except Exception as e:
-            print(f"\n  [ERRO] Não foi possível ler o arquivo: {e}")
+        if not os.path.isfile(caminho_arquivo):
+            print(f"\n  [ERRO] Não foi possível ler o arquivo: {caminho_arquivo}")
             return False
 
         if opcao == "1":
-            executar_analise_lexica(codigo)
+            executar_analise_lexica(caminho_arquivo)
         elif opcao == "2":
-            executar_analise_sintatica(codigo)
+            try:
+                with open(caminho_arquivo, 'r', encoding='utf-8', errors='replace') as f:
+                    codigo = f.read()
+            except Exception as e:
+                print(f"\n  [ERRO] Não foi possível ler o arquivo: {e}")
+                return False
+            executar_analise_sintatica(codigo, caminho_arquivo)
         elif opcao == "3":
-            executar_analise_semantica(codigo, caminho_arquivo)
+            executar_analise_semantica(caminho_arquivo)
         elif opcao == "4":
             return True
         elif opcao == "0":
@@ -231,9 +319,43 @@ def menu_principal():
     print("Análise Léxica, Sintática e Semântica".center(LARGURA))
     print(linha())
     print("\n  [1] Selecionar Arquivo de Teste")
+    print("  [2] Analisar Projeto Inteiro (tonto.json)")
     print("  [0] Sair")
 
-if __name__ == "__main__":
+def argumentos():
+    parser = argparse.ArgumentParser(description="Compilador TONTO")
+    parser.add_argument('--projeto', metavar='PASTA',
+                        help="compila todos os .tonto do projeto (tonto.json) em paralelo")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="número de processos usados em --projeto (padrão: núcleos da CPU)")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="ignora o cache de ASTs em disco (.tonto_cache)")
+    parser.add_argument('--lexer', choices=analisador_lexico.BACKENDS, default=None,
+                        help="backend do analisador léxico (padrão: ply)")
+    parser.add_argument('--max-errors', type=int, default=None, metavar='N',
+                        help="interrompe a análise de um arquivo após N erros (padrão: "
+                             f"{analisador_sintatico.MAX_ERROS}; 0 = sem limite)")
+    parser.add_argument('--watch', action='store_true',
+                        help="com --projeto: observa a pasta e reanalisa só o que mudou")
+    parser.add_argument('--intervalo', type=float, default=0.5,
+                        help="intervalo de polling do --watch em segundos (padrão: 0.5)")
+    parser.add_argument('--metrics', nargs='?', const='-', default=None, metavar='ARQUIVO',
+                        help="ao final, emite um resumo JSON das métricas da execução "
+                             "(em stderr, ou no ARQUIVO indicado)")
+    relatorios.adicionar_argumentos(parser)
+    args = parser.parse_args()
+    if args.watch and not args.projeto:
+        parser.error("--watch precisa de --projeto PASTA")
+    return args
+
+def executar(args):
+    if args.projeto and args.watch:
+        modo_watch.observar(args.projeto, args.intervalo, not args.sem_cache)
+        return 0
+    if args.projeto:
+        erros = executar_projeto(args.projeto, args.workers, not args.sem_cache)
+        return 1 if erros else 0
+
     while True:
         menu_principal()
         opcao = input("\n  Escolha uma opção: ").strip()
@@ -247,10 +369,39 @@ if __name__ == "__main__":
                         break
                 else:
                     break
+        elif opcao == "2":
+            raiz = selecionar_projeto()
+            if raiz:
+                executar_projeto(raiz, args.workers, not args.sem_cache)
+                input("\n  Pressione ENTER para continuar...")
         elif opcao == "0":
             print("\n" + linha())
             print("Encerrando...".center(LARGURA))
             print(linha() + "\n")
-            break
+            return 0
         else:
             print("\n  [ERRO] Opção inválida!")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'check':
+        # Modo em lote, sem menu (veja cli.py)
+        import cli
+        sys.exit(cli.main())
+
+    args = argumentos()
+    if args.lexer:
+        # Via ambiente para valer também nos processos do pool
+        os.environ['TONTO_LEXER'] = args.lexer
+        analisador_lexico.BACKEND_PADRAO = args.lexer
+    if args.max_errors is not None:
+        os.environ['TONTO_MAX_ERROS'] = str(args.max_errors)
+        analisador_sintatico.MAX_ERROS = args.max_errors
+
+    with relatorios.usar_dos_argumentos(args):
+        if args.metrics is None:
+            codigo = executar(args)
+        else:
+            with metricas.coletar() as coletor:
+                codigo = executar(args)
+            metricas.emitir(coletor, args.metrics)
+    sys.exit(codigo)
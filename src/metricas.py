@@ -0,0 +1,151 @@
+import contextlib
+import contextvars
+import json
+import sys
+import time
+from collections import Counter
+
+# Instrumentação das execuções do compilador. As fases instrumentadas
+# (léxico, sintático, imports, semântico, ...) registram tempo de parede e
+# de CPU no coletor ativo; fora de `coletar()` o coletor é inativo e nada é
+# medido.
+#
+#     with metricas.coletar() as m:
+#         main.executar_projeto(raiz)
+#     print(m.resumo())
+#
+# As fases podem se sobrepor: "imports" inclui o "sintatico" dos arquivos
+# carregados e "semantico" inclui o tempo de cada regra.
+
+VERSAO_RESUMO = 1
+
+class Metricas:
+    ativo = True
+
+    def __init__(self):
+        # nome -> {'parede': s, 'cpu': s, 'chamadas': n}
+        self.fases = {}
+        self.contadores = Counter()
+        # padrão ODP -> tempo de parede acumulado
+        self.regras = {}
+        self.inicio = time.time()
+        self._parede = time.perf_counter()
+        self._cpu = time.process_time()
+        self.parede_total = None
+        self.cpu_total = None
+
+    @contextlib.contextmanager
+    def fase(self, nome):
+        parede, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield self
+        finally:
+            self.somar_fase(nome, time.perf_counter() - parede, time.process_time() - cpu)
+
+    def somar_fase(self, nome, parede, cpu, chamadas=1):
+        fase = self.fases.setdefault(nome, {'parede': 0.0, 'cpu': 0.0, 'chamadas': 0})
+        fase['parede'] += parede
+        fase['cpu'] += cpu
+        fase['chamadas'] += chamadas
+
+    def contar(self, nome, quantidade=1):
+        self.contadores[nome] += quantidade
+
+    def registrar_regras(self, tempos):
+        for padrao, duracao in tempos.items():
+            self.regras[padrao] = self.regras.get(padrao, 0.0) + duracao
+
+    def exportar(self):
+        # Forma serializável, para somar medidas feitas em outro processo
+        return {'fases': self.fases, 'contadores': dict(self.contadores), 'regras': self.regras}
+
+    def incorporar(self, medidas):
+        for nome, fase in medidas['fases'].items():
+            self.somar_fase(nome, fase['parede'], fase['cpu'], fase['chamadas'])
+        self.contadores.update(medidas['contadores'])
+        self.registrar_regras(medidas['regras'])
+
+    def encerrar(self):
+        self.parede_total = time.perf_counter() - self._parede
+        self.cpu_total = time.process_time() - self._cpu
+
+    def _por_segundo(self, contador, fase):
+        parede = self.fases.get(fase, {}).get('parede')
+        quantidade = self.contadores.get(contador, 0)
+        if not parede or not quantidade:
+            return None
+        return quantidade / parede
+
+    def resumo(self):
+        if self.parede_total is None:
+            self.encerrar()
+        return {
+            'versao': VERSAO_RESUMO,
+            'inicio': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.inicio)),
+            'parede_total': self.parede_total,
+            'cpu_total': self.cpu_total,
+            'fases': self.fases,
+            'taxas': {
+                'tokens_por_segundo_lexico': self._por_segundo('tokens_lexico', 'lexico'),
+                'tokens_por_segundo_sintatico': self._por_segundo('tokens_sintatico', 'sintatico'),
+                'declaracoes_por_segundo': self._por_segundo('declaracoes', 'sintatico'),
+            },
+            'arquivos': {
+                'analisados': self.contadores.get('arquivos_analisados', 0),
+                'do_cache': self.contadores.get('acertos_cache', 0),
+                'falhas_cache': self.contadores.get('falhas_cache', 0),
+            },
+            'contadores': dict(sorted(self.contadores.items())),
+            'regras': self.regras,
+        }
+
+    def para_json(self, indent=2):
+        return json.dumps(self.resumo(), indent=indent, ensure_ascii=False)
+
+class _MetricasInativas(Metricas):
+    # Coletor padrão: mesma interface, sem custo de medição
+    ativo = False
+
+    def __init__(self):
+        super().__init__()
+
+    @contextlib.contextmanager
+    def fase(self, nome):
+        yield self
+
+    def somar_fase(self, nome, parede, cpu, chamadas=1):
+        pass
+
+    def contar(self, nome, quantidade=1):
+        pass
+
+    def registrar_regras(self, tempos):
+        pass
+
+    def incorporar(self, medidas):
+        pass
+
+# Coletor ativo por contexto, como o relatório ativo (relatorios.atual)
+_atual = contextvars.ContextVar('metricas', default=_MetricasInativas())
+
+def atual():
+    return _atual.get()
+
+@contextlib.contextmanager
+def coletar():
+    coletor = Metricas()
+    marca = _atual.set(coletor)
+    try:
+        yield coletor
+    finally:
+        coletor.encerrar()
+        _atual.reset(marca)
+
+def emitir(coletor, destino='-'):
+    # '-' escreve em stderr, deixando stdout só com os relatórios
+    texto = coletor.para_json()
+    if destino == '-':
+        print(texto, file=sys.stderr)
+        return
+    with open(destino, 'w', encoding='utf-8') as f:
+        f.write(texto + "\n")
@@ -0,0 +1,387 @@
+import itertools
+import os
+from collections import deque
+from collections.abc import Sequence
+
+# Modelo formado por vários arquivos (o fecho de imports de uma entrada ou um
+# projeto inteiro) sem copiar nenhum nó: cada pacote tem a sua tabela de
+# símbolos e as listas classes, relations, ... são vistas somente leitura
+# sobre as ASTs dos arquivos, na ordem em que foram dados.
+#
+# Tipos (classes, datatypes e enums) são identificados pelo nome qualificado
+# Pacote.Nome. Uma segunda declaração do mesmo nome qualificado é duplicada:
+# vale a primeira, e a repetida fica fora das vistas. O mesmo nome em pacotes
+# diferentes fica nos dois pacotes, mas é registrado como conflito, já que
+# uma referência sem pacote é ambígua.
+
+TIPOS = ('classes', 'datatypes', 'enums')
+CATEGORIAS = TIPOS + ('gensets', 'relations')
+
+def qualificado(pacote, nome):
+    return f"{pacote}.{nome}"
+
+class VisaoEncadeada(Sequence):
+    # Concatenação somente leitura das listas dos arquivos, sem os nós ocultos
+    def __init__(self, listas, ocultos=()):
+        self._listas = listas
+        self._ocultos = ocultos
+
+    def __iter__(self):
+        ocultos = self._ocultos
+        for lista in self._listas:
+            if not ocultos:
+                yield from lista
+            else:
+                for no in lista:
+                    if id(no) not in ocultos:
+                        yield no
+
+    def __len__(self):
+        if not self._ocultos:
+            return sum(len(lista) for lista in self._listas)
+        return sum(1 for _ in self)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return list(self)[indice]
+        if indice < 0:
+            indice += len(self)
+        for no in itertools.islice(self, indice, None):
+            return no
+        raise IndexError(indice)
+
+    def __repr__(self):
+        return repr(list(self))
+
+class ModeloMesclado:
+    # Mesma interface de leitura da OntologyAST (package_name, imports,
+    # errors e as listas de nós); package_name, imports e erros são os do
+    # arquivo principal
+    def __init__(self, arquivos, package_name=None, imports=None, errors=None):
+        # arquivos: [(caminho, ast)] na ordem de mesclagem
+        self.package_name = package_name
+        self.imports = imports if imports is not None else []
+        self.errors = errors if errors is not None else []
+        self.lex_errors = []
+        self._asts = {}
+        self._ordem = {}
+        self._caminhos = []
+        # pacote -> {nome: nó}: a declaração que vale
+        self.pacotes = {}
+        # pacote -> ordens dos arquivos que o declaram
+        self._arquivos_do_pacote = {}
+        # (pacote, nome) -> [(ordem, nó)] das declarações repetidas, e os ids
+        # desses nós, que as vistas pulam
+        self._repetidas = {}
+        self._ocultos = set()
+        # nome -> primeiro pacote que o declarou; nomes vistos em mais de um
+        # pacote guardam todos eles em _ambiguos
+        self._pacote_do_nome = {}
+        self._ambiguos = {}
+        # id do nó -> ordem do arquivo, montado só quando arquivo_de é usado
+        self._origens = None
+        # id do nó -> (categoria, ordem do arquivo, índice na lista), montado
+        # só quando posicao é usada (análise incremental)
+        self._posicoes = None
+        # caminho -> AST substituída em trocar, e a posição que os nós dela
+        # tinham: os nós que saíram continuam ordenáveis até o analisador
+        # retirá-los
+        self._anteriores = {}
+        self._posicoes_anteriores = {}
+        for caminho, ast in arquivos:
+            self._adicionar(caminho, ast)
+
+    def _adicionar(self, caminho, ast):
+        # Arquivo no fim da ordem de mesclagem
+        ordem = len(self._caminhos)
+        self._origens = None
+        self._caminhos.append(caminho)
+        self._ordem[caminho] = ordem
+        self._asts[caminho] = ast
+        if self._posicoes is not None:
+            self._registrar_posicoes(ordem, ast)
+        pacote = self._pacote(caminho, ast)
+        self._arquivos_do_pacote.setdefault(pacote, []).append(ordem)
+        for no in _tipos(ast):
+            self._declarar(ordem, pacote, no)
+
+    def _pacote(self, caminho, ast):
+        # Arquivo sem `package` (ou com erro antes dele) é um pacote próprio
+        return ast.package_name or os.path.splitext(os.path.basename(caminho))[0]
+
+    # Vistas
+
+    def _visao(self, campo):
+        return VisaoEncadeada([getattr(ast, campo) for ast in self._asts.values()], self._ocultos)
+
+    @property
+    def classes(self):
+        return self._visao('classes')
+
+    @property
+    def datatypes(self):
+        return self._visao('datatypes')
+
+    @property
+    def enums(self):
+        return self._visao('enums')
+
+    @property
+    def gensets(self):
+        return self._visao('gensets')
+
+    @property
+    def relations(self):
+        return self._visao('relations')
+
+    def __len__(self):
+        # Declarações distintas de tipos
+        return sum(len(tabela) for tabela in self.pacotes.values())
+
+    # Tabelas de símbolos
+
+    def _declarar(self, ordem, pacote, no):
+        # Devolve (nó que passou a valer, nó que deixou de valer)
+        tabela = self.pacotes.setdefault(pacote, {})
+        nome = no.name
+        atual = tabela.get(nome)
+        if atual is None:
+            tabela[nome] = no
+            primeiro = self._pacote_do_nome.setdefault(nome, pacote)
+            if primeiro != pacote or nome in self._ambiguos:
+                self._ambiguos.setdefault(nome, {primeiro}).add(pacote)
+            return no, None
+        # Na montagem (e em trocar no último arquivo) a declaração nova é
+        # sempre a mais recente: não é preciso procurar a ordem da atual
+        ordem_atual = ordem
+        if ordem < len(self._caminhos) - 1:
+            ordem_atual = self._ordem_da_declaracao(pacote, atual)
+        if ordem < ordem_atual:
+            # Arquivo anterior na ordem de mesclagem (só em trocar): passa a valer
+            tabela[nome] = no
+            self._ocultar(pacote, (ordem_atual, atual))
+            return no, atual
+        self._ocultar(pacote, (ordem, no))
+        return None, None
+
+    def _ordem_da_declaracao(self, pacote, no):
+        # Só é chamada quando um nome se repete: procura o nó nos arquivos do pacote
+        for ordem in self._arquivos_do_pacote[pacote]:
+            if any(outro is no for outro in _tipos(self._asts[self._caminhos[ordem]])):
+                return ordem
+        raise KeyError(no.name)
+
+    def _ocultar(self, pacote, declaracao):
+        self._repetidas.setdefault((pacote, declaracao[1].name), []).append(declaracao)
+        self._ocultos.add(id(declaracao[1]))
+
+    def _retirar(self, pacote, no):
+        # Devolve (nó que passou a valer, nó que deixou de valer)
+        chave = (pacote, no.name)
+        if id(no) in self._ocultos:
+            self._ocultos.discard(id(no))
+            repetidas = self._repetidas[chave]
+            repetidas[:] = [declaracao for declaracao in repetidas if declaracao[1] is not no]
+            if not repetidas:
+                del self._repetidas[chave]
+            return None, None
+        tabela = self.pacotes[pacote]
+        repetidas = self._repetidas.get(chave)
+        if not repetidas:
+            del tabela[no.name]
+            if not tabela:
+                del self.pacotes[pacote]
+            return None, no
+        # A primeira repetida (na ordem de mesclagem e, no mesmo arquivo, na
+        # ordem de declaração) assume o lugar
+        ordem = min(declaracao[0] for declaracao in repetidas)
+        candidatas = {id(declaracao[1]): declaracao for declaracao in repetidas if declaracao[0] == ordem}
+        if len(candidatas) == 1:
+            seguinte, = candidatas.values()
+        else:
+            seguinte = next(candidatas[id(outro)] for outro in _tipos(self._asts[self._caminhos[ordem]])
+                            if id(outro) in candidatas)
+        repetidas.remove(seguinte)
+        if not repetidas:
+            del self._repetidas[chave]
+        self._ocultos.discard(id(seguinte[1]))
+        tabela[no.name] = seguinte[1]
+        return seguinte[1], no
+
+    def adicionar(self, caminho, ast):
+        # Acrescenta um arquivo no fim da ordem de mesclagem e devolve os nós
+        # que entraram nas vistas, para AnalisadorSemantico.receber
+        self._adicionar(caminho, ast)
+        return [no for campo in CATEGORIAS for no in getattr(ast, campo) if id(no) not in self._ocultos]
+
+    def trocar(self, caminho, ast):
+        # Substitui a AST de um arquivo do modelo e devolve (removidos,
+        # adicionados): os nós que saíram ou entraram nas vistas, no formato
+        # de AnalisadorSemantico.atualizar
+        antiga = self._asts[caminho]
+        ordem = self._ordem[caminho]
+        self._origens = None
+        removidos = [no for campo in CATEGORIAS for no in getattr(antiga, campo) if id(no) not in self._ocultos]
+        adicionados = []
+        pacote = self._pacote(caminho, antiga)
+        # As repetidas da própria AST antiga saem antes: nenhuma delas pode
+        # ser promovida no lugar de uma declaração do mesmo arquivo
+        visiveis = []
+        for no in _tipos(antiga):
+            if id(no) in self._ocultos:
+                self._retirar(pacote, no)
+            else:
+                visiveis.append(no)
+        for no in visiveis:
+            entrou, _ = self._retirar(pacote, no)
+            if entrou is not None:
+                adicionados.append(entrou)
+        self._arquivos_do_pacote[pacote].remove(ordem)
+        if not self._arquivos_do_pacote[pacote]:
+            del self._arquivos_do_pacote[pacote]
+        self._asts[caminho] = ast
+        anterior = self._anteriores.get(caminho)
+        if anterior is not None:
+            for campo in CATEGORIAS:
+                for no in getattr(anterior, campo):
+                    self._posicoes_anteriores.pop(id(no), None)
+        self._anteriores[caminho] = antiga
+        for categoria, campo in enumerate(CATEGORIAS):
+            for indice, no in enumerate(getattr(antiga, campo)):
+                self._posicoes_anteriores[id(no)] = (categoria, ordem, indice)
+                if self._posicoes is not None:
+                    del self._posicoes[id(no)]
+        if self._posicoes is not None:
+            self._registrar_posicoes(ordem, ast)
+        pacote = self._pacote(caminho, ast)
+        self._arquivos_do_pacote.setdefault(pacote, []).append(ordem)
+        for no in _tipos(ast):
+            _, saiu = self._declarar(ordem, pacote, no)
+            if saiu is not None:
+                removidos.append(saiu)
+        adicionados.extend(no for campo in CATEGORIAS for no in getattr(ast, campo) if id(no) not in self._ocultos)
+        # Um nó que saiu e voltou (repetida de outro arquivo) não muda nada
+        saiu_e_voltou = {id(no) for no in removidos} & {id(no) for no in adicionados}
+        if saiu_e_voltou:
+            removidos = [no for no in removidos if id(no) not in saiu_e_voltou]
+            adicionados = [no for no in adicionados if id(no) not in saiu_e_voltou]
+        return removidos, adicionados
+
+    def arquivo_de(self, no):
+        # Caminho do arquivo que declara o nó (de qualquer categoria)
+        if self._origens is None:
+            self._origens = {id(outro): ordem for ordem, caminho in enumerate(self._caminhos)
+                             for campo in CATEGORIAS for outro in getattr(self._asts[caminho], campo)}
+        return self._caminhos[self._origens[id(no)]]
+
+    def _registrar_posicoes(self, ordem, ast):
+        for categoria, campo in enumerate(CATEGORIAS):
+            for indice, no in enumerate(getattr(ast, campo)):
+                self._posicoes[id(no)] = (categoria, ordem, indice)
+
+    def posicao(self, no):
+        # Chave de ordenação do nó (de qualquer categoria): a ordem em que uma
+        # passada pelas vistas o encontra, contando também os ocultos. Um nó
+        # da versão anterior de um arquivo mantém a posição que tinha
+        posicao = self._posicoes_anteriores.get(id(no))
+        if posicao is not None:
+            return posicao
+        if self._posicoes is None:
+            self._posicoes = {}
+            for ordem, caminho in enumerate(self._caminhos):
+                self._registrar_posicoes(ordem, self._asts[caminho])
+        return self._posicoes[id(no)]
+
+    def resolver(self, nome, pacote=None):
+        # Declaração de `nome` (simples ou Pacote.Nome), procurada primeiro no
+        # pacote indicado; um nome simples presente em vários pacotes é
+        # ambíguo e fica sem resolução (None)
+        if '.' in nome:
+            pacote, nome = nome.rsplit('.', 1)
+        if pacote is not None:
+            declaracao = self.pacotes.get(pacote, {}).get(nome)
+            if declaracao is not None:
+                return declaracao
+        pacotes = [outro for outro in self._ambiguos.get(nome, (self._pacote_do_nome.get(nome),))
+                   if outro is not None and nome in self.pacotes.get(outro, ())]
+        if len(pacotes) == 1:
+            return self.pacotes[pacotes[0]][nome]
+        return None
+
+    @property
+    def conflitos(self):
+        # [{'tipo', 'nome', 'mensagem', 'arquivos'}]: declarações duplicadas
+        # e nomes presentes em mais de um pacote, em ordem de nome; arquivos
+        # são os que têm a declaração repetida ou ambígua
+        conflitos = []
+        ambiguos = {}
+        for nome in self._ambiguos:
+            pacotes = sorted(pacote for pacote in self._ambiguos[nome] if nome in self.pacotes.get(pacote, ()))
+            if len(pacotes) > 1:
+                ambiguos[nome] = pacotes
+        # Arquivo de cada declaração dos pacotes envolvidos (uma passada por pacote)
+        origem = {}
+        envolvidos = {pacote for pacote, _ in self._repetidas}
+        envolvidos.update(pacote for pacotes in ambiguos.values() for pacote in pacotes)
+        for pacote in envolvidos:
+            for ordem in self._arquivos_do_pacote[pacote]:
+                for no in _tipos(self._asts[self._caminhos[ordem]]):
+                    origem.setdefault(id(no), ordem)
+        for pacote, nome in sorted(self._repetidas):
+            primeira = self._caminhos[origem[id(self.pacotes[pacote][nome])]]
+            for ordem, _ in sorted(self._repetidas[(pacote, nome)], key=lambda declaracao: declaracao[0]):
+                conflitos.append({
+                    'tipo': 'duplicada', 'nome': qualificado(pacote, nome),
+                    'mensagem': f"'{qualificado(pacote, nome)}' declarado em {os.path.basename(primeira)} "
+                                f"e novamente em {os.path.basename(self._caminhos[ordem])}: "
+                                f"vale a primeira declaração",
+                    'arquivos': [self._caminhos[ordem]]})
+        for nome in sorted(ambiguos):
+            pacotes = ambiguos[nome]
+            conflitos.append({
+                'tipo': 'ambigua', 'nome': nome,
+                'mensagem': f"'{nome}' declarado nos pacotes {', '.join(pacotes)}: "
+                            f"referências sem pacote são ambíguas",
+                'arquivos': [self._caminhos[origem[id(self.pacotes[pacote][nome])]] for pacote in pacotes]})
+        return conflitos
+
+class ModeloSobDemanda(ModeloMesclado):
+    # Começa só com o arquivo principal. Quando o analisador semântico
+    # procura um nome que o modelo ainda não declara (o alvo de um
+    # specializes ou de uma mediação), os imports são localizados e
+    # analisados em largura a partir do arquivo principal até o nome
+    # aparecer ou os imports acabarem. Uma resposta negativa sobre gensets
+    # ou relações lê todos os que faltam. O resolvedor guarda as ASTs: um
+    # arquivo é analisado uma única vez na execução, e o que nenhum nome
+    # exigiu nunca é lido.
+    def __init__(self, resolvedor, caminho):
+        raiz = resolvedor.asts[caminho]
+        super().__init__([(caminho, raiz)], raiz.package_name, raiz.imports, raiz.errors)
+        self._resolvedor = resolvedor
+        self._pendentes = deque(resolvedor.dependencias(caminho))
+
+    @property
+    def arquivos(self):
+        # Arquivos já mesclados, na ordem em que entraram
+        return list(self._caminhos)
+
+    def carregar(self, nome=None):
+        # Devolve os nós que entraram nas vistas, no formato de
+        # AnalisadorSemantico.atualizar. Sem nome, lê todos os imports que
+        # faltam
+        if nome is not None:
+            nome = nome.rsplit('.', 1)[-1]
+        novos = []
+        while self._pendentes and (nome is None or nome not in self._pacote_do_nome):
+            caminho = self._pendentes.popleft()
+            if caminho in self._ordem:
+                continue
+            ast = self._resolvedor.arquivo(caminho)
+            self._adicionar(caminho, ast)
+            novos.extend(no for campo in CATEGORIAS for no in getattr(ast, campo) if id(no) not in self._ocultos)
+            self._pendentes.extend(self._resolvedor.dependencias(caminho))
+        return novos
+
+def _tipos(ast):
+    for campo in TIPOS:
+        yield from getattr(ast, campo)
@@ -0,0 +1,132 @@
+import os
+import time
+
+import analisador_semantico
+import cache_ast
+import projeto
+import resolvedor_imports
+
+class Observador:
+    # Acompanha uma pasta de projeto por polling. A cada alteração só os
+    # arquivos modificados são analisados de novo, e a análise semântica é
+    # refeita apenas para os arquivos cujo fecho de imports os contém.
+    def __init__(self, raiz, cache=None):
+        self.raiz = os.path.abspath(raiz)
+        self.resolvedor = resolvedor_imports.ResolvedorImports(cache)
+        # caminho -> (mtime_ns, tamanho, hash do conteúdo)
+        self.assinaturas = {}
+        # caminho -> [(tipo, padrão, mensagem)]
+        self.resultados = {}
+        # caminho -> (analisador semântico vivo, arquivos do fecho analisado)
+        self.analisadores = {}
+
+    def _assinatura(self, caminho, anterior):
+        info = os.stat(caminho)
+        if anterior and anterior[0] == info.st_mtime_ns and anterior[1] == info.st_size:
+            return anterior
+        with open(caminho, 'rb') as f:
+            return (info.st_mtime_ns, info.st_size, cache_ast.hash_conteudo(f.read()))
+
+    def varrer(self):
+        # Devolve (alterados, removidos) desde a última varredura. Um arquivo
+        # só conta como alterado se o conteúdo mudou, não apenas o mtime.
+        atuais = set(projeto.descobrir_arquivos(self.raiz))
+        alterados = []
+        for caminho in sorted(atuais):
+            anterior = self.assinaturas.get(caminho)
+            try:
+                assinatura = self._assinatura(caminho, anterior)
+            except OSError:
+                continue
+            self.assinaturas[caminho] = assinatura
+            if anterior is None or anterior[2] != assinatura[2]:
+                alterados.append(caminho)
+
+        removidos = sorted(set(self.assinaturas) - atuais)
+        for caminho in removidos:
+            del self.assinaturas[caminho]
+        return alterados, removidos
+
+    def reconstruir(self, alterados, removidos):
+        # Devolve {arquivo: (adicionados, retirados)} com a diferença dos resultados
+        antigas = {os.path.abspath(caminho): self.resolvedor.asts.get(os.path.abspath(caminho))
+                   for caminho in alterados}
+        self.resolvedor.atualizar(alterados, removidos)
+        afetados = self.resolvedor.dependentes(list(alterados) + list(removidos))
+
+        deltas = {}
+        for caminho in sorted(afetados):
+            anteriores = self.resultados.get(caminho, [])
+            if caminho in self.assinaturas:
+                novos = [(r['tipo'], r['padrao'], r['mensagem'])
+                         for r in self._analisar(caminho, antigas)]
+                self.resultados[caminho] = novos
+            else:
+                novos = []
+                self.resultados.pop(caminho, None)
+                self.analisadores.pop(caminho, None)
+
+            conjunto_anteriores, conjunto_novos = set(anteriores), set(novos)
+            adicionados = [r for r in novos if r not in conjunto_anteriores]
+            retirados = [r for r in anteriores if r not in conjunto_novos]
+            if adicionados or retirados:
+                deltas[caminho] = (adicionados, retirados)
+        return deltas
+
+    def _analisar(self, caminho, antigas):
+        # Com o mesmo conjunto de arquivos no fecho, troca só os nós dos
+        # arquivos alterados no modelo e no analisador existentes; senão
+        # analisa do zero
+        fecho = frozenset(self.resolvedor.fecho(caminho))
+        existente = self.analisadores.get(caminho)
+        if existente and existente[1] == fecho:
+            analisador = existente[0]
+            removidos, adicionados = [], []
+            for arquivo, antiga in antigas.items():
+                if arquivo in fecho and antiga is not None:
+                    # O modelo diz quais nós entram e saem das vistas
+                    # (declarações duplicadas ficam de fora)
+                    saem, entram = analisador.ast.trocar(arquivo, self.resolvedor.asts[arquivo])
+                    removidos.extend(saem)
+                    adicionados.extend(entram)
+            return analisador.atualizar(removidos, adicionados)
+
+        analisador = analisador_semantico.AnalisadorSemantico(self.resolvedor.ast_mesclada(caminho))
+        self.analisadores[caminho] = (analisador, fecho)
+        return analisador.analisar()
+
+def _exibir_delta(raiz, observador, alterados, removidos, deltas, duracao):
+    print(f"\n  [{time.strftime('%H:%M:%S')}] {len(alterados)} alterado(s), "
+          f"{len(removidos)} removido(s) - reconstrução em {duracao * 1000:.1f} ms")
+
+    for caminho in alterados:
+        saida = observador.resolvedor.saidas.get(caminho, "")
+        relativo = os.path.relpath(caminho, raiz)
+        if saida:
+            print(f"\n  {relativo}:")
+            for linha_saida in saida.splitlines():
+                print(f"    {linha_saida}")
+
+    for caminho, (adicionados, retirados) in deltas.items():
+        print(f"\n  {os.path.relpath(caminho, raiz)}")
+        for tipo, _, mensagem in retirados:
+            print(f"    - [{tipo}] {mensagem}")
+        for tipo, _, mensagem in adicionados:
+            print(f"    + [{tipo}] {mensagem}")
+
+def observar(raiz, intervalo=0.5, usar_cache=True):
+    cache = projeto.cache_do_projeto(raiz) if usar_cache else None
+    observador = Observador(raiz, cache)
+
+    print(f"\n  Observando {observador.raiz} (Ctrl+C para sair)")
+    try:
+        while True:
+            inicio = time.perf_counter()
+            alterados, removidos = observador.varrer()
+            if alterados or removidos:
+                deltas = observador.reconstruir(alterados, removidos)
+                duracao = time.perf_counter() - inicio
+                _exibir_delta(observador.raiz, observador, alterados, removidos, deltas, duracao)
+            time.sleep(intervalo)
+    except KeyboardInterrupt:
+        print("\n  Modo watch encerrado.")
@@ -0,0 +1,571 @@
+import codecs
+import json
+import re
+import unicodedata
+
+from analisador_sintatico import OntologyAST
+from ast_nodes import Attribute, Cardinality, Class, DataType, Enum, GenSet, InternalRelation, Relation
+
+# Importação e exportação de modelos no formato JSON do OntoUML (o mesmo do
+# editor visual e dos exemplos em Compiladores_UFERSA-main). As duas direções
+# trabalham por partes: a importação lê o arquivo em blocos e converte cada
+# elemento de `contents` assim que ele termina, sem montar o documento em
+# memória (a seção `diagrams` é só pulada); a exportação escreve um elemento
+# por linha à medida que percorre as ASTs.
+#
+#     ast = ontouml_json.importar_ontouml('modelo.json')
+#     ontouml_json.exportar_ontouml(lambda: iter([ast]), 'copia.json', 'Modelo')
+#
+# Da importação só se guardam, além da AST, os ids já vistos (id -> nome) e,
+# em tuplas compactas, as generalizações, gensets, relações e tipos de
+# atributos, resolvidos no final: as pontas podem aparecer depois deles.
+# Os dicts dos elementos são descartados assim que convertidos.
+
+BLOCO_LEITURA = 1 << 20
+
+# Relações que o TONTO declara dentro da classe de origem (relator, mode)
+RELACOES_INTERNAS = ('mediation', 'characterization', 'externalDependence')
+
+TIPOS_NATIVOS = ('string', 'number', 'boolean', 'date', 'time', 'datetime')
+
+_ESPACOS = re.compile(r'[ \t\n\r]*')
+_ESTRUTURA = re.compile(r'["\[\]{}]')
+_FIM_STRING = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+_NAO_IDENTIFICADOR = re.compile(r'[^A-Za-z0-9_]+')
+_IDENTIFICADOR = re.compile(r'[A-Za-z][A-Za-z0-9_]*\Z')
+_CARDINALIDADE = re.compile(r'\s*(\d+|\*)\s*(?:\.\.\s*(\d+|\*)\s*)?\Z')
+
+def detectar_codificacao(caminho):
+    # UTF-8 (com ou sem BOM) quando o arquivo inteiro for válido; senão
+    # cp1252, usada pelo editor no Windows (é o caso de alergia-alimentar.json)
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    with open(caminho, 'rb') as f:
+        inicio = f.read(3)
+        f.seek(0)
+        try:
+            while True:
+                dados = f.read(BLOCO_LEITURA)
+                if not dados:
+                    decodificador.decode(b'', final=True)
+                    break
+                decodificador.decode(dados)
+        except UnicodeDecodeError:
+            return 'cp1252'
+    return 'utf-8-sig' if inicio == codecs.BOM_UTF8 else 'utf-8'
+
+class LeitorJSON:
+    # Cursor sobre um documento JSON lido em blocos. valor() decodifica um
+    # valor completo (só usado para valores pequenos); pular() atravessa
+    # arrays e objetos sem construí-los.
+    def __init__(self, arquivo, bloco=BLOCO_LEITURA):
+        self.arquivo = arquivo
+        self.bloco = bloco
+        self.buffer = ''
+        self.pos = 0
+        self.fim = False
+        # Linhas já descartadas do buffer, para localizar erros
+        self._linhas = 1
+        self._decodificador = json.JSONDecoder()
+
+    def linha(self):
+        return self._linhas + self.buffer.count('\n', 0, self.pos)
+
+    def _ler(self):
+        if self.fim:
+            return False
+        dados = self.arquivo.read(self.bloco)
+        if not dados:
+            self.fim = True
+            return False
+        self._linhas += self.buffer.count('\n', 0, self.pos)
+        self.buffer = self.buffer[self.pos:] + dados
+        self.pos = 0
+        return True
+
+    def erro(self, mensagem):
+        return ValueError(f"JSON inválido na linha {self.linha()}: {mensagem}")
+
+    def proximo(self):
+        # Próximo caractere significativo, sem consumi-lo ('' no fim)
+        while True:
+            self.pos = _ESPACOS.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._ler():
+                return ''
+
+    def consumir(self, esperado):
+        encontrado = self.proximo()
+        if encontrado != esperado:
+            raise self.erro(f"esperado '{esperado}', encontrado '{encontrado or 'fim do arquivo'}'")
+        self.pos += 1
+
+    def separador(self, fechamento):
+        # Depois de um item: ',' (há outro) ou o fechamento (acabou)
+        encontrado = self.proximo()
+        if encontrado == ',':
+            self.pos += 1
+            return True
+        self.consumir(fechamento)
+        return False
+
+    def valor(self):
+        self.proximo()
+        while True:
+            try:
+                valor, fim = self._decodificador.raw_decode(self.buffer, self.pos)
+                # Um número no fim do buffer pode continuar no próximo bloco
+                if fim < len(self.buffer) or self.fim:
+                    self.pos = fim
+                    return valor
+            except json.JSONDecodeError as erro:
+                if self.fim:
+                    raise self.erro(erro.msg) from None
+            self._ler()
+
+    def completo(self):
+        # O valor seguinte, se couber no que já foi lido; senão None e nada
+        # é consumido
+        try:
+            valor, fim = self._decodificador.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            return None
+        self.pos = fim
+        return valor
+
+    def pular(self):
+        if self.proximo() not in ('[', '{'):
+            self.valor()
+            return
+        profundidade = 0
+        while True:
+            encontrado = _ESTRUTURA.search(self.buffer, self.pos)
+            if encontrado is None:
+                self.pos = len(self.buffer)
+                if not self._ler():
+                    raise self.erro("fim do arquivo dentro de um array ou objeto")
+                continue
+            self.pos = encontrado.end()
+            caractere = encontrado.group()
+            if caractere == '"':
+                while True:
+                    fim_string = _FIM_STRING.match(self.buffer, self.pos)
+                    if fim_string:
+                        self.pos = fim_string.end()
+                        break
+                    if not self._ler():
+                        raise self.erro("string não terminada")
+            elif caractere in '[{':
+                profundidade += 1
+            else:
+                profundidade -= 1
+                if profundidade == 0:
+                    return
+
+    def objeto(self, ao_encontrar):
+        # Percorre um objeto chave a chave: ao_encontrar(chave) devolve True
+        # quando já consumiu o valor; senão o valor é decodificado e guardado
+        campos = {}
+        self.consumir('{')
+        if self.proximo() == '}':
+            self.pos += 1
+            return campos
+        while True:
+            chave = self.valor()
+            if not isinstance(chave, str):
+                raise self.erro("chave de objeto deve ser string")
+            self.consumir(':')
+            if not ao_encontrar(chave):
+                campos[chave] = self.valor()
+            if not self.separador('}'):
+                return campos
+
+def nome_classe(nome, reserva='Classe'):
+    # Nome do editor ("Hyperactivity Symptom", "Alergia Não-IgE") ->
+    # identificador TONTO (Hyperactivity_Symptom, Alergia_Nao_IgE)
+    if nome and _IDENTIFICADOR.match(nome):
+        return nome[0].upper() + nome[1:]
+    texto = unicodedata.normalize('NFKD', nome or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    texto = _NAO_IDENTIFICADOR.sub('_', texto).strip('_')
+    if not texto:
+        return reserva
+    if not texto[0].isalpha():
+        texto = f"{reserva}_{texto}"
+    return texto[0].upper() + texto[1:]
+
+def nome_relacao(nome):
+    if not nome:
+        return None
+    texto = nome_classe(nome, 'r')
+    return texto[0].lower() + texto[1:]
+
+def cardinalidade(texto):
+    # "1..*", "0..1", "*", "1" -> Cardinality; ausente ou inválida -> None
+    if not texto:
+        return None
+    encontrada = _CARDINALIDADE.match(str(texto))
+    if not encontrada:
+        return None
+    # Números como int, igual ao parser
+    minimo, maximo = [int(v) if v and v.isdigit() else v for v in encontrada.groups()]
+    return Cardinality(minimo, maximo if maximo is not None else minimo)
+
+class ImportadorOntoUML:
+    def __init__(self):
+        self.ast = OntologyAST()
+        # id -> nó da AST (Class, DataType ou Enum) e id -> nome TONTO
+        self._por_id = {}
+        self._nomes = {}
+        # Datatypes nativos do editor (string, number, ...) não viram DataType
+        self._nativos = set()
+        # id -> (geral, específica) e as pendências resolvidas no final:
+        # gensets (ids das generalizações, modificadores, nome) e relações
+        # (estereótipo, nome, id de origem, cardinalidade, símbolo,
+        # cardinalidade, id de alvo)
+        self._generalizacoes = {}
+        self._gensets = []
+        self._relacoes = []
+        self._atributos = []
+
+    def importar(self, arquivo):
+        leitor = LeitorJSON(arquivo)
+        try:
+            leitor.objeto(lambda chave: self._raiz(leitor, chave))
+            if leitor.proximo():
+                raise leitor.erro("conteúdo após o fim do documento")
+        except ValueError as erro:
+            self.ast.add_error(leitor.linha(), str(erro))
+        self._resolver()
+        return self.ast
+
+    def _raiz(self, leitor, chave):
+        if chave == 'model':
+            self._elemento(leitor)
+            return True
+        if chave == 'name':
+            nome = leitor.valor()
+            self.ast.package_name = nome_classe(nome, 'Modelo') if nome else None
+            return True
+        # diagrams e demais campos do projeto não interessam à análise
+        leitor.pular()
+        return True
+
+    def _elemento(self, leitor):
+        if leitor.proximo() != '{':
+            leitor.pular()
+            return
+        # Caminho rápido: o elemento inteiro já está no buffer (quase sempre;
+        # só pacotes grandes passam do tamanho do bloco)
+        completo = leitor.completo()
+        if completo is not None:
+            self._elemento_decodificado(completo)
+            return
+
+        def ao_encontrar(chave):
+            if chave == 'contents' and leitor.proximo() == '[':
+                self._conteudo(leitor)
+                return True
+            return False
+
+        self._converter(leitor.objeto(ao_encontrar))
+
+    def _elemento_decodificado(self, elemento):
+        if not isinstance(elemento, dict):
+            return
+        for filho in elemento.get('contents') or []:
+            self._elemento_decodificado(filho)
+        self._converter(elemento)
+
+    def _converter(self, elemento):
+        tipo = elemento.get('type')
+        if tipo == 'Class':
+            self._classe(elemento)
+        elif tipo == 'Generalization':
+            self._generalizacoes[elemento.get('id')] = (_ref(elemento.get('general')), _ref(elemento.get('specific')))
+        elif tipo == 'GeneralizationSet':
+            self._genset(elemento)
+        elif tipo == 'Relation':
+            self._relacao(elemento)
+        elif tipo == 'Package' and self.ast.package_name is None and elemento.get('name'):
+            self.ast.package_name = nome_classe(elemento['name'], 'Modelo')
+
+    def _conteudo(self, leitor):
+        leitor.consumir('[')
+        if leitor.proximo() == ']':
+            leitor.pos += 1
+            return
+        while True:
+            self._elemento(leitor)
+            if not leitor.separador(']'):
+                return
+
+    def _classe(self, elemento):
+        identificador = elemento.get('id')
+        estereotipo = elemento.get('stereotype')
+        nome = nome_classe(elemento.get('name'))
+        if estereotipo == 'enumeration':
+            no = Enum(nome, [literal.get('name') for literal in elemento.get('literals') or []
+                             if literal.get('name')])
+            self.ast.enums.append(no)
+        elif estereotipo == 'datatype':
+            if (elemento.get('name') or '').lower() in TIPOS_NATIVOS:
+                nome = elemento['name'].lower()
+                self._nativos.add(identificador)
+                no = None
+            else:
+                no = DataType(nome)
+                self.ast.datatypes.append(no)
+        else:
+            no = Class(estereotipo, nome)
+            self.ast.classes.append(no)
+        self._nomes[identificador] = nome
+        self._por_id[identificador] = no
+        if no is not None and not isinstance(no, Enum):
+            for propriedade in elemento.get('properties') or []:
+                atributo = Attribute(propriedade.get('name'), None, cardinalidade(propriedade.get('cardinality')))
+                no.attributes.append(atributo)
+                self._atributos.append((atributo, _ref(propriedade.get('propertyType'))))
+
+    def _genset(self, elemento):
+        generalizacoes = tuple(_ref(ref) for ref in elemento.get('generalizations') or [])
+        modificadores = tuple(m for m, ativo in (('disjoint', elemento.get('isDisjoint')),
+                                                  ('complete', elemento.get('isComplete'))) if ativo)
+        self._gensets.append((generalizacoes, modificadores, elemento.get('name') or ''))
+
+    def _relacao(self, elemento):
+        pontas = elemento.get('properties') or []
+        if len(pontas) != 2:
+            return
+        origem, alvo = pontas
+        self._relacoes.append((
+            elemento.get('stereotype'), nome_relacao(elemento.get('name')),
+            _ref(origem.get('propertyType')), cardinalidade(origem.get('cardinality')), _simbolo(origem, alvo),
+            cardinalidade(alvo.get('cardinality')), _ref(alvo.get('propertyType'))))
+
+    def _nome(self, identificador, contexto):
+        nome = self._nomes.get(identificador)
+        if nome is None:
+            self.ast.add_error(0, f"{contexto}: referência a um elemento inexistente ({identificador})")
+        return nome
+
+    def _resolver(self):
+        for atributo, tipo in self._atributos:
+            atributo.type = self._nomes.get(tipo, 'string')
+
+        # A primeira generalização de cada classe vira `specializes`; as
+        # demais (herança múltipla) só aparecem nos gensets
+        for geral, especifica in self._generalizacoes.values():
+            no = self._por_id.get(especifica)
+            nome_geral = self._nome(geral, "Generalização")
+            if isinstance(no, Class) and nome_geral and no.specializes is None:
+                no.specializes = nome_geral
+            elif especifica not in self._nomes:
+                self._nome(especifica, "Generalização")
+
+        usados = {}
+        for generalizacoes, modificadores, nome in self._gensets:
+            pares = [self._generalizacoes.get(ref) for ref in generalizacoes]
+            pares = [par for par in pares if par is not None]
+            if not pares:
+                continue
+            geral = self._nome(pares[0][0], "Genset")
+            especificas = [self._nomes[especifica] for _, especifica in pares if especifica in self._nomes]
+            if not geral or not especificas:
+                continue
+            # Os nomes do editor costumam ser só os modificadores ("{disjoint}")
+            nome = nome_classe(nome, geral) if nome and not nome.startswith('{') else f"{geral}_Genset"
+            usados[nome] = usados.get(nome, 0) + 1
+            if usados[nome] > 1:
+                nome = f"{nome}_{usados[nome]}"
+            self.ast.gensets.append(GenSet(nome, list(modificadores) or None, geral, especificas))
+
+        for estereotipo, nome, origem, card_origem, simbolo, card_alvo, alvo in self._relacoes:
+            dominio = self._nome(origem, "Relação")
+            imagem = self._nome(alvo, "Relação")
+            if not dominio or not imagem:
+                continue
+            no_origem = self._por_id.get(origem)
+            if estereotipo in RELACOES_INTERNAS and isinstance(no_origem, Class):
+                no_origem.internal_relations.append(InternalRelation(
+                    estereotipo, nome, card_origem, simbolo, card_alvo, imagem))
+            else:
+                self.ast.relations.append(Relation(
+                    estereotipo, nome, dominio, card_origem, simbolo,
+                    card_alvo, imagem, symbol2=simbolo if nome else None))
+
+def _ref(referencia):
+    return referencia.get('id') if isinstance(referencia, dict) else referencia
+
+def _simbolo(origem, alvo):
+    # O losango fica na ponta cujo aggregationKind não é NONE
+    if (origem.get('aggregationKind') or 'NONE') != 'NONE':
+        return '<>--'
+    if (alvo.get('aggregationKind') or 'NONE') != 'NONE':
+        return '--<>'
+    return '--'
+
+def importar_ontouml(caminho, codificacao=None):
+    # Erros de JSON e referências quebradas vão para ast.errors, como os
+    # erros sintáticos de um .tonto
+    codificacao = codificacao or detectar_codificacao(caminho)
+    with open(caminho, 'r', encoding=codificacao, errors='replace') as f:
+        return ImportadorOntoUML().importar(f)
+
+class ExportadorOntoUML:
+    # Um Package por AST, com classes, generalizações, gensets e relações.
+    # Os ids são gerados em ordem (sempre iguais para a mesma entrada); os
+    # tipos referenciados mas não declarados (nativos, imports ausentes)
+    # viram classes no pacote raiz, ao final.
+    def __init__(self, saida, nome='Modelo'):
+        self.saida = saida
+        self.nome = nome
+        self._contador = 0
+        self._ids = {}
+        self._faltantes = {}
+        self._declarados = set()
+        self._primeiro = True
+        self.elementos = 0
+
+    def _novo_id(self):
+        self._contador += 1
+        return f"tonto_{self._contador:06d}"
+
+    def _ref(self, nome):
+        if nome not in self._ids:
+            self._ids[nome] = self._faltantes[nome] = self._novo_id()
+        return {'id': self._ids[nome], 'type': 'Class'}
+
+    def _escrever(self, elemento):
+        self.saida.write(("\n" if self._primeiro else ",\n") + json.dumps(elemento, ensure_ascii=False))
+        self._primeiro = False
+        self.elementos += 1
+
+    def exportar(self, obter_asts):
+        # Primeira passada: só os ids das declarações, para que referências
+        # a classes de pacotes seguintes já tenham id
+        for ast in obter_asts():
+            for no in list(ast.classes) + list(ast.datatypes) + list(ast.enums):
+                if no.name not in self._ids:
+                    self._ids[no.name] = self._novo_id()
+
+        cabecalho = {'id': self._novo_id(), 'name': self.nome, 'description': None, 'type': 'Project'}
+        self.saida.write(json.dumps(cabecalho, ensure_ascii=False)[:-1]
+                         + ', "model": {"id": "' + cabecalho['id'] + '_root", "name": '
+                         + json.dumps(self.nome, ensure_ascii=False)
+                         + ', "description": null, "type": "Package", "propertyAssignments": null, "contents": [')
+        for ast in obter_asts():
+            self._pacote(ast)
+        for nome, identificador in self._faltantes.items():
+            self._escrever(_classe_json(identificador, nome, 'datatype' if nome in TIPOS_NATIVOS else None))
+        self.saida.write("\n]}, \"diagrams\": []}\n")
+        return self.elementos
+
+    def _pacote(self, ast):
+        identificador = self._novo_id()
+        self.saida.write(("\n" if self._primeiro else ",\n")
+                         + '{"id": "' + identificador + '", "name": '
+                         + json.dumps(ast.package_name, ensure_ascii=False)
+                         + ', "description": null, "type": "Package", "propertyAssignments": null, "contents": [')
+        self._primeiro = True
+        self.elementos += 1
+
+        for classe in ast.classes:
+            elemento = self._declaracao(classe, classe.stereotype)
+            if elemento is not None:
+                elemento['properties'] = self._atributos(classe.attributes)
+                self._escrever(elemento)
+        for datatype in ast.datatypes:
+            elemento = self._declaracao(datatype, 'datatype')
+            if elemento is not None:
+                elemento['properties'] = self._atributos(datatype.attributes)
+                self._escrever(elemento)
+        for enum in ast.enums:
+            elemento = self._declaracao(enum, 'enumeration')
+            if elemento is not None:
+                elemento['literals'] = [{'id': self._novo_id(), 'name': valor, 'description': None,
+                                         'type': 'Literal', 'propertyAssignments': None}
+                                        for valor in enum.instances]
+                self._escrever(elemento)
+
+        generalizacoes = {}
+        for classe in ast.classes:
+            if classe.specializes:
+                self._generalizacao(generalizacoes, classe.specializes, classe.name)
+        for genset in ast.gensets:
+            ids = [self._generalizacao(generalizacoes, genset.general, especifica)
+                   for especifica in genset.specifics]
+            modificadores = genset.modifiers or []
+            self._escrever({'id': self._novo_id(), 'name': genset.name, 'description': None,
+                            'type': 'GeneralizationSet', 'propertyAssignments': None,
+                            'isDisjoint': 'disjoint' in modificadores,
+                            'isComplete': 'complete' in modificadores, 'categorizer': None,
+                            'generalizations': [{'id': g, 'type': 'Generalization'} for g in ids]})
+
+        for classe in ast.classes:
+            for relacao in classe.internal_relations:
+                self._relacao(relacao.stereotype, relacao.name, classe.name, relacao.source_card,
+                              relacao.symbol, relacao.target_card, relacao.target)
+        for relacao in ast.relations:
+            self._relacao(relacao.stereotype, relacao.name, relacao.domain, relacao.domain_card,
+                          relacao.symbol, relacao.range_card, relacao.range)
+
+        self.saida.write("\n]}")
+        self._primeiro = False
+
+    def _declaracao(self, no, estereotipo):
+        # Homônimos no modelo ficam só com a primeira declaração
+        if no.name in self._declarados:
+            return None
+        self._declarados.add(no.name)
+        return _classe_json(self._ids[no.name], no.name, estereotipo)
+
+    def _atributos(self, atributos):
+        if not atributos:
+            return None
+        return [_propriedade(self._novo_id(), atributo.name, atributo.cardinality,
+                             self._ref(atributo.type or 'string'))
+                for atributo in atributos]
+
+    def _generalizacao(self, generalizacoes, geral, especifica):
+        chave = (geral, especifica)
+        if chave not in generalizacoes:
+            generalizacoes[chave] = self._novo_id()
+            self._escrever({'id': generalizacoes[chave], 'name': None, 'description': None,
+                            'type': 'Generalization', 'propertyAssignments': None,
+                            'general': self._ref(geral), 'specific': self._ref(especifica)})
+        return generalizacoes[chave]
+
+    def _relacao(self, estereotipo, nome, origem, card_origem, simbolo, card_alvo, alvo):
+        pontas = [_propriedade(self._novo_id(), None, card_origem, self._ref(origem)),
+                  _propriedade(self._novo_id(), None, card_alvo, self._ref(alvo))]
+        if simbolo == '<>--':
+            pontas[0]['aggregationKind'] = 'SHARED'
+        elif simbolo == '--<>':
+            pontas[1]['aggregationKind'] = 'SHARED'
+        self._escrever({'id': self._novo_id(), 'name': nome, 'description': None, 'type': 'Relation',
+                        'propertyAssignments': None, 'stereotype': estereotipo, 'isAbstract': False,
+                        'isDerived': False, 'properties': pontas})
+
+def _classe_json(identificador, nome, estereotipo):
+    return {'id': identificador, 'name': nome, 'description': None, 'type': 'Class',
+            'propertyAssignments': None, 'stereotype': estereotipo, 'isAbstract': False,
+            'isDerived': False, 'properties': None, 'isExtensional': False, 'isPowertype': None,
+            'order': None, 'literals': None, 'restrictedTo': None}
+
+def _propriedade(identificador, nome, cardinalidade, tipo):
+    texto = None
+    if cardinalidade is not None:
+        minimo, maximo = cardinalidade.min, cardinalidade.max
+        texto = str(minimo) if minimo == maximo else f"{minimo}..{maximo}"
+    return {'id': identificador, 'name': nome, 'description': None, 'type': 'Property',
+            'propertyAssignments': None, 'stereotype': None, 'isDerived': False, 'isReadOnly': False,
+            'isOrdered': False, 'cardinality': texto, 'propertyType': tipo,
+            'subsettedProperties': None, 'redefinedProperties': None, 'aggregationKind': 'NONE'}
+
+def exportar_ontouml(obter_asts, destino, nome='Modelo'):
+    # destino: caminho ou arquivo já aberto; devolve o número de elementos
+    if hasattr(destino, 'write'):
+        return ExportadorOntoUML(destino, nome).exportar(obter_asts)
+    with open(destino, 'w', encoding='utf-8', buffering=1 << 20) as saida:
+        return ExportadorOntoUML(saida, nome).exportar(obter_asts)
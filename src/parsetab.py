@@ -6,7 +6,7 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'ANNOTATION ARROBA ASTERISCO BOOLEAN_LITERAL CLASS CLASS_NAME COLON COMMA COMPLETE CONTEM CONTIDO DATATYPE DIFFERENTFROM DISJOINT DISJOINTWITH DOMAIN DOT ENUM EQUIVALENTTO EST_CLASS EST_REL GENERAL GENSET HYPHEN ID IMPORT INDIVIDUAL INSTANCE LBRACE LBRACKET LPAREN MAIOR MAIORIGUAL MENOR MENORIGUAL META_CONST META_DERIVED META_ORDERED META_REDEFINES META_SUBSETS NATIVE_BOOLEAN NATIVE_DATE NATIVE_DATETIME NATIVE_NUMBER NATIVE_STRING NATIVE_TIME NEW_DATATYPE NUMBER ONTOLOGY PACKAGE PROPERTY RANGE RBRACE RBRACKET RELATION RELATION_NAME RPAREN SAMEAS SPECIALIZES SPECIFICS STRING SUBCLASSOF WHEREprogram : import_list package_declaration content_list\n| import_list package_declaration\n| package_declaration content_list\n| package_declarationpackage_declaration : PACKAGE CLASS_NAME\n| PACKAGE RELATION_NAMEimport_declaration : IMPORT CLASS_NAME\n| IMPORT RELATION_NAMEimport_list : import_list import_declaration\n| import_declarationcontent_list : content_list content\n| contentinternal_relation : ARROBA EST_REL HYPHEN HYPHEN RELATION_NAME HYPHEN HYPHEN cardinality CLASS_NAME\n| HYPHEN HYPHEN RELATION_NAME HYPHEN HYPHEN cardinality CLASS_NAMEcontent : class_declaration\n| datatype_declaration\n| enum_declaration\n| genset_declaration\n| relation_declaration\n| error content\nclass_declaration : EST_CLASS CLASS_NAME LBRACE class_body RBRACE\n| EST_CLASS CLASS_NAME LBRACE RBRACE\n| EST_CLASS CLASS_NAME SPECIALIZES CLASS_NAME\n| EST_CLASS CLASS_NAMEclass_body : class_body_item\n| class_body class_body_itemclass_body_item : attribute\n| internal_relationattribute : RELATION_NAME COLON type cardinality_opt\n| RELATION_NAME COLON type cardinality_opt metadata_block\n| ID COLON type cardinality_opt\n| ID COLON type cardinality_opt metadata_block\n| NATIVE_NUMBER COLON type cardinality_opt\n| NATIVE_NUMBER COLON type cardinality_opt metadata_block\ntype : NATIVE_STRING\n| NATIVE_NUMBER\n| NATIVE_BOOLEAN\n| NATIVE_DATE\n| NATIVE_TIME\n| NATIVE_DATETIME\n| CLASS_NAME\n| RELATION_NAME\n| IDmetadata_block : LBRACE metadata_list RBRACEmetadata_list : metadata_item\n| metadata_list metadata_itemmetadata_item : META_CONST\n| META_ORDERED\n| META_DERIVED\n| META_SUBSETS\n| META_REDEFINESinternal_relation : ARROBA EST_REL cardinality relation_symbol cardinality CLASS_NAME\n| EST_REL cardinality relation_symbol cardinality CLASS_NAMEdatatype_declaration : DATATYPE CLASS_NAME LBRACE attribute_list RBRACE\n| DATATYPE CLASS_NAME LBRACE RBRACEattribute_list : attribute\n| attribute_list attributeenum_declaration : ENUM CLASS_NAME LBRACE instance_list RBRACE\n| ENUM CLASS_NAME LBRACE RBRACEinstance_list : instance_name\n| instance_list COMMA instance_name\n| instance_list instance_nameinstance_name : INSTANCE\n| CLASS_NAMEgenset_declaration : modifiers GENSET CLASS_NAME WHERE class_list SPECIALIZES CLASS_NAME\n| GENSET CLASS_NAME WHERE class_list SPECIALIZES CLASS_NAME\n| GENSET CLASS_NAME LBRACE GENERAL CLASS_NAME SPECIFICS class_list RBRACE\n| modifiers GENSET CLASS_NAME LBRACE GENERAL CLASS_NAME SPECIFICS class_list RBRACEmodifiers : DISJOINT COMPLETE\n| COMPLETE DISJOINT\n| DISJOINT\n| COMPLETEclass_list : CLASS_NAME\n| class_list COMMA CLASS_NAMErelation_declaration : ARROBA EST_REL RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME\n| RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME\n| RELATION CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAME\n| CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAMEcardinality : LBRACKET NUMBER DOT DOT ASTERISCO RBRACKET\n| LBRACKET NUMBER RBRACKET\n| LBRACKET NUMBER DOT DOT NUMBER RBRACKET\n| LBRACKET ASTERISCO RBRACKETrelation_symbol : HYPHEN HYPHEN\n| CONTEM\n| CONTIDOcardinality_opt : cardinality\n| emptyempty :'
+_lr_signature = 'ANNOTATION ARROBA ASTERISCO BOOLEAN_LITERAL CLASS CLASS_NAME COLON COMMA COMPLETE CONTEM CONTIDO DATATYPE DIFFERENTFROM DISJOINT DISJOINTWITH DOMAIN DOT ENUM EQUIVALENTTO EST_CLASS EST_REL GENERAL GENSET HYPHEN ID IMPORT INDIVIDUAL INSTANCE LBRACE LBRACKET LPAREN MAIOR MAIORIGUAL MENOR MENORIGUAL META_CONST META_DERIVED META_ORDERED META_REDEFINES META_SUBSETS NATIVE_BOOLEAN NATIVE_DATE NATIVE_DATETIME NATIVE_NUMBER NATIVE_STRING NATIVE_TIME NEW_DATATYPE NUMBER ONTOLOGY PACKAGE PROPERTY RANGE RBRACE RBRACKET RELATION RELATION_NAME RPAREN SAMEAS SPECIALIZES SPECIFICS STRING SUBCLASSOF WHEREprogram : import_list package_declaration content_list\n               | import_list package_declaration\n               | package_declaration content_list\n               | package_declarationpackage_declaration : PACKAGE CLASS_NAME\n                          | PACKAGE RELATION_NAMEimport_declaration : IMPORT CLASS_NAME\n                          | IMPORT RELATION_NAMEimport_list : import_list import_declaration\n                   | import_declarationcontent_list : content_list content\n                    | contentinternal_relation : ARROBA EST_REL HYPHEN HYPHEN RELATION_NAME HYPHEN HYPHEN cardinality CLASS_NAME\n                         | HYPHEN HYPHEN RELATION_NAME HYPHEN HYPHEN cardinality CLASS_NAMEcontent : class_declaration\n               | datatype_declaration\n               | enum_declaration\n               | genset_declaration\n               | relation_declaration\n               | error content\n    class_declaration : EST_CLASS CLASS_NAME LBRACE class_body RBRACE\n                         | EST_CLASS CLASS_NAME LBRACE RBRACE\n                         | EST_CLASS CLASS_NAME SPECIALIZES CLASS_NAME\n                         | EST_CLASS CLASS_NAMEclass_body : class_body_item\n                  | class_body class_body_itemclass_body_item : attribute\n                       | internal_relationattribute : RELATION_NAME COLON type cardinality_opt\n                 | RELATION_NAME COLON type cardinality_opt metadata_block\n                 | ID COLON type cardinality_opt\n                 | ID COLON type cardinality_opt metadata_block\n                 | NATIVE_NUMBER COLON type cardinality_opt\n                 | NATIVE_NUMBER COLON type cardinality_opt metadata_block\n    type : NATIVE_STRING\n            | NATIVE_NUMBER\n            | NATIVE_BOOLEAN\n            | NATIVE_DATE\n            | NATIVE_TIME\n            | NATIVE_DATETIME\n            | CLASS_NAME\n            | RELATION_NAME\n            | IDmetadata_block : LBRACE metadata_list RBRACEmetadata_list : metadata_item\n                     | metadata_list metadata_itemmetadata_item : META_CONST\n                     | META_ORDERED\n                     | META_DERIVED\n                     | META_SUBSETS\n                     | META_REDEFINESinternal_relation : ARROBA EST_REL cardinality relation_symbol cardinality CLASS_NAME\n                         | EST_REL cardinality relation_symbol cardinality CLASS_NAMEdatatype_declaration : DATATYPE CLASS_NAME LBRACE attribute_list RBRACE\n                            | DATATYPE CLASS_NAME LBRACE RBRACEattribute_list : attribute\n                      | attribute_list attributeenum_declaration : ENUM CLASS_NAME LBRACE instance_list RBRACE\n                        | ENUM CLASS_NAME LBRACE RBRACEinstance_list : instance_name\n                     | instance_list COMMA instance_name\n                     | instance_list instance_nameinstance_name : INSTANCE\n                     | CLASS_NAMEgenset_declaration : modifiers GENSET CLASS_NAME WHERE class_list SPECIALIZES CLASS_NAME\n                          | GENSET CLASS_NAME WHERE class_list SPECIALIZES CLASS_NAME\n                          | GENSET CLASS_NAME LBRACE GENERAL CLASS_NAME SPECIFICS class_list RBRACE\n                          | modifiers GENSET CLASS_NAME LBRACE GENERAL CLASS_NAME SPECIFICS class_list RBRACEmodifiers : DISJOINT COMPLETE\n                 | COMPLETE DISJOINT\n                 | DISJOINT\n                 | COMPLETEclass_list : CLASS_NAME\n                  | class_list COMMA CLASS_NAMErelation_declaration : ARROBA EST_REL RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME\n                            | RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME\n                            | RELATION CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAME\n                            | CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAMEcardinality : LBRACKET NUMBER DOT DOT ASTERISCO RBRACKET\n                   | LBRACKET NUMBER RBRACKET\n                   | LBRACKET NUMBER DOT DOT NUMBER RBRACKET\n                   | LBRACKET ASTERISCO RBRACKETrelation_symbol : HYPHEN HYPHEN\n                       | CONTEM\n                       | CONTIDOcardinality_opt : cardinality\n                       | emptyempty :'
     
 _lr_action_items = {'PACKAGE':([0,2,4,8,29,30,],[5,5,-10,-9,-7,-8,]),'IMPORT':([0,2,4,8,29,30,],[6,6,-10,-9,-7,-8,]),'$end':([1,3,7,9,10,11,12,13,14,15,27,28,31,32,33,34,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[0,-4,-2,-3,-12,-15,-16,-17,-18,-19,-5,-6,-1,-11,-20,-24,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'error':([3,7,9,10,11,12,13,14,15,16,27,28,31,32,33,34,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[16,16,16,-12,-15,-16,-17,-18,-19,16,-5,-6,16,-11,-20,-24,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'EST_CLASS':([3,7,9,10,11,12,13,14,15,16,27,28,31,32,33,34,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[17,17,17,-12,-15,-16,-17,-18,-19,17,-5,-6,17,-11,-20,-24,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'DATATYPE':([3,7,9,10,11,12,13,14,15,16,27,28,31,32,33,34,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[19,19,19,-12,-15,-16,-17,-18,-19,19,-5,-6,19,-11,-20,-24,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'ENUM':([3,7,9,10,11,12,13,14,15,16,27,28,31,32,33,34,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[20,20,20,-12,-15,-16,-17,-18,-19,20,-5,-6,20,-11,-20,-24,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'GENSET':([3,7,9,10,11,12,13,14,15,16,21,25,26,27,28,31,32,33,34,43,44,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[22,22,22,-12,-15,-16,-17,-18,-19,22,39,-71,-72,-5,-6,22,-11,-20,-24,-69,-70,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'ARROBA':([3,7,9,10,11,12,13,14,15,16,27,28,31,32,33,34,45,60,61,62,63,64,71,75,76,78,82,92,93,102,104,115,116,117,118,119,120,121,122,123,124,125,126,137,141,143,144,145,146,147,152,153,154,155,160,162,163,166,169,170,171,180,182,183,186,188,],[23,23,23,-12,-15,-16,-17,-18,-19,23,-5,-6,23,-11,-20,-24,68,68,-22,-25,-27,-28,-23,-80,-82,-55,-59,-21,-26,-54,-58,-42,-88,-35,-36,-37,-38,-39,-40,-41,-43,-88,-88,-66,-76,-29,-86,-87,-31,-33,-78,-81,-79,-65,-30,-32,-34,-53,-67,-75,-77,-52,-68,-44,-14,-13,]),'RELATION':([3,7,9,10,11,12,13,14,15,16,27,28,31,32,33,34,41,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[24,24,24,-12,-15,-16,-17,-18,-19,24,-5,-6,24,-11,-20,-24,58,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'CLASS_NAME':([3,5,6,7,9,10,11,12,13,14,15,16,17,19,20,22,24,27,28,31,32,33,34,39,46,54,56,58,61,71,75,76,78,80,81,82,83,84,85,89,92,94,95,96,102,104,105,106,108,109,110,113,131,134,135,137,139,141,150,152,153,154,155,156,158,159,165,169,170,171,181,182,187,],[18,27,29,18,18,-12,-15,-16,-17,-18,-19,18,34,37,38,40,42,-5,-6,18,-11,-20,-24,55,71,80,87,90,-22,-23,-80,-82,-55,-64,80,-59,-60,-63,87,111,-21,123,123,123,-54,-58,80,-62,136,137,138,141,152,-61,155,-66,87,-76,166,-78,-81,-79,-65,87,170,171,180,-67,-75,-77,186,-68,188,]),'DISJOINT':([3,7,9,10,11,12,13,14,15,16,26,27,28,31,32,33,34,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[25,25,25,-12,-15,-16,-17,-18,-19,25,44,-5,-6,25,-11,-20,-24,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'COMPLETE':([3,7,9,10,11,12,13,14,15,16,25,27,28,31,32,33,34,61,71,78,82,92,102,104,137,141,152,155,169,170,171,182,],[26,26,26,-12,-15,-16,-17,-18,-19,26,43,-5,-6,26,-11,-20,-24,-22,-23,-55,-59,-21,-54,-58,-66,-76,-78,-65,-67,-75,-77,-68,]),'RELATION_NAME':([5,6,45,47,49,50,53,60,62,63,64,73,75,76,77,79,91,93,94,95,96,99,103,115,116,117,118,119,120,121,122,123,124,125,126,143,144,145,146,147,148,153,154,160,162,163,166,180,183,186,188,],[28,30,65,72,-84,-85,65,65,-25,-27,-28,-83,-80,-82,65,-56,114,-26,115,115,115,130,-57,-42,-88,-35,-36,-37,-38,-39,-40,-41,-43,-88,-88,-29,-86,-87,-31,-33,164,-81,-79,-30,-32,-34,-53,-52,-44,-14,-13,]),'LBRACKET':([18,42,49,50,69,73,90,91,97,100,115,116,117,118,119,120,121,122,123,124,125,126,129,140,142,149,167,185,],[36,36,-84,-85,36,-83,36,36,36,36,-42,36,-35,-36,-37,-38,-39,-40,-41,-43,36,36,36,36,36,36,36,36,]),'EST_REL':([23,45,60,62,63,64,68,75,76,93,115,116,117,118,119,120,121,122,123,124,125,126,143,144,145,146,147,153,154,160,162,163,166,180,183,186,188,],[41,69,69,-25,-27,-28,97,-80,-82,-26,-42,-88,-35,-36,-37,-38,-39,-40,-41,-43,-88,-88,-29,-86,-87,-31,-33,-81,-79,-30,-32,-34,-53,-52,-44,-14,-13,]),'LBRACE':([34,37,38,40,55,75,76,115,116,117,118,119,120,121,122,123,124,125,126,143,144,145,146,147,153,154,],[45,53,54,57,86,-80,-82,-42,-88,-35,-36,-37,-38,-39,-40,-41,-43,-88,-88,161,-86,-87,161,161,-81,-79,]),'SPECIALIZES':([34,87,88,107,138,],[46,-73,109,135,-74,]),'HYPHEN':([35,45,48,59,60,62,63,64,70,72,75,76,93,97,98,112,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,130,143,144,145,146,147,151,153,154,160,162,163,164,166,179,180,183,186,188,],[48,70,73,48,70,-25,-27,-28,99,48,-80,-82,-26,127,48,48,48,-42,-88,-35,-36,-37,-38,-39,-40,-41,-43,-88,-88,148,48,151,-29,-86,-87,-31,-33,167,-81,-79,-30,-32,-34,179,-53,185,-52,-44,-14,-13,]),'CONTEM':([35,59,72,75,76,98,112,114,128,153,154,],[49,49,49,-80,-82,49,49,49,49,-81,-79,]),'CONTIDO':([35,59,72,75,76,98,112,114,128,153,154,],[50,50,50,-80,-82,50,50,50,50,-81,-79,]),'NUMBER':([36,101,],[51,132,]),'ASTERISCO':([36,101,],[52,133,]),'WHERE':([40,55,],[56,85,]),'RBRACE':([45,53,54,60,62,63,64,75,76,77,79,80,81,83,84,87,93,103,106,115,116,117,118,119,120,121,122,123,124,125,126,134,138,143,144,145,146,147,153,154,157,160,162,163,166,168,172,173,174,175,176,177,178,180,183,184,186,188,],[61,78,82,92,-25,-27,-28,-80,-82,102,-56,-64,104,-60,-63,-73,-26,-57,-62,-42,-88,-35,-36,-37,-38,-39,-40,-41,-43,-88,-88,-61,-74,-29,-86,-87,-31,-33,-81,-79,169,-30,-32,-34,-53,182,183,-45,-47,-48,-49,-50,-51,-52,-44,-46,-14,-13,]),'ID':([45,53,60,62,63,64,75,76,77,79,93,94,95,96,103,115,116,117,118,119,120,121,122,123,124,125,126,143,144,145,146,147,153,154,160,162,163,166,180,183,186,188,],[66,66,66,-25,-27,-28,-80,-82,66,-56,-26,124,124,124,-57,-42,-88,-35,-36,-37,-38,-39,-40,-41,-43,-88,-88,-29,-86,-87,-31,-33,-81,-79,-30,-32,-34,-53,-52,-44,-14,-13,]),'NATIVE_NUMBER':([45,53,60,62,63,64,75,76,77,79,93,94,95,96,103,115,116,117,118,119,120,121,122,123,124,125,126,143,144,145,146,147,153,154,160,162,163,166,180,183,186,188,],[67,67,67,-25,-27,-28,-80,-82,67,-56,-26,118,118,118,-57,-42,-88,-35,-36,-37,-38,-39,-40,-41,-43,-88,-88,-29,-86,-87,-31,-33,-81,-79,-30,-32,-34,-53,-52,-44,-14,-13,]),'DOT':([51,74,],[74,101,]),'RBRACKET':([51,52,132,133,],[75,76,153,154,]),'INSTANCE':([54,80,81,83,84,105,106,134,],[84,-64,84,-60,-63,84,-62,-61,]),'GENERAL':([57,86,],[89,108,]),'COLON':([65,66,67,],[94,95,96,]),'COMMA':([80,81,83,84,87,88,106,107,134,138,157,168,],[-64,105,-60,-63,-73,110,-62,110,-61,-74,110,110,]),'NATIVE_STRING':([94,95,96,],[117,117,117,]),'NATIVE_BOOLEAN':([94,95,96,],[119,119,119,]),'NATIVE_DATE':([94,95,96,],[120,120,120,]),'NATIVE_TIME':([94,95,96,],[121,121,121,]),'NATIVE_DATETIME':([94,95,96,],[122,122,122,]),'SPECIFICS':([111,136,],[139,156,]),'META_CONST':([161,172,173,174,175,176,177,178,184,],[174,174,-45,-47,-48,-49,-50,-51,-46,]),'META_ORDERED':([161,172,173,174,175,176,177,178,184,],[175,175,-45,-47,-48,-49,-50,-51,-46,]),'META_DERIVED':([161,172,173,174,175,176,177,178,184,],[176,176,-45,-47,-48,-49,-50,-51,-46,]),'META_SUBSETS':([161,172,173,174,175,176,177,178,184,],[177,177,-45,-47,-48,-49,-50,-51,-46,]),'META_REDEFINES':([161,172,173,174,175,176,177,178,184,],[178,178,-45,-47,-48,-49,-50,-51,-46,]),}
 
@@ -95,24 +95,24 @@ _lr_productions = [
   ('genset_declaration -> GENSET CLASS_NAME WHERE class_list SPECIALIZES CLASS_NAME','genset_declaration',6,'p_genset_declaration','analisador_sintatico.py',301),
   ('genset_declaration -> GENSET CLASS_NAME LBRACE GENERAL CLASS_NAME SPECIFICS class_list RBRACE','genset_declaration',8,'p_genset_declaration','analisador_sintatico.py',302),
   ('genset_declaration -> modifiers GENSET CLASS_NAME LBRACE GENERAL CLASS_NAME SPECIFICS class_list RBRACE','genset_declaration',9,'p_genset_declaration','analisador_sintatico.py',303),
-  ('modifiers -> DISJOINT COMPLETE','modifiers',2,'p_modifiers','analisador_sintatico.py',343),
-  ('modifiers -> COMPLETE DISJOINT','modifiers',2,'p_modifiers','analisador_sintatico.py',344),
-  ('modifiers -> DISJOINT','modifiers',1,'p_modifiers','analisador_sintatico.py',345),
-  ('modifiers -> COMPLETE','modifiers',1,'p_modifiers','analisador_sintatico.py',346),
-  ('class_list -> CLASS_NAME','class_list',1,'p_class_list','analisador_sintatico.py',353),
-  ('class_list -> class_list COMMA CLASS_NAME','class_list',3,'p_class_list','analisador_sintatico.py',354),
-  ('relation_declaration -> ARROBA EST_REL RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME','relation_declaration',8,'p_relation_declaration','analisador_sintatico.py',361),
-  ('relation_declaration -> RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME','relation_declaration',6,'p_relation_declaration','analisador_sintatico.py',362),
-  ('relation_declaration -> RELATION CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAME','relation_declaration',8,'p_relation_declaration','analisador_sintatico.py',363),
-  ('relation_declaration -> CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAME','relation_declaration',7,'p_relation_declaration','analisador_sintatico.py',364),
-  ('cardinality -> LBRACKET NUMBER DOT DOT ASTERISCO RBRACKET','cardinality',6,'p_cardinality','analisador_sintatico.py',413),
-  ('cardinality -> LBRACKET NUMBER RBRACKET','cardinality',3,'p_cardinality','analisador_sintatico.py',414),
-  ('cardinality -> LBRACKET NUMBER DOT DOT NUMBER RBRACKET','cardinality',6,'p_cardinality','analisador_sintatico.py',415),
-  ('cardinality -> LBRACKET ASTERISCO RBRACKET','cardinality',3,'p_cardinality','analisador_sintatico.py',416),
-  ('relation_symbol -> HYPHEN HYPHEN','relation_symbol',2,'p_relation_symbol','analisador_sintatico.py',427),
-  ('relation_symbol -> CONTEM','relation_symbol',1,'p_relation_symbol','analisador_sintatico.py',428),
-  ('relation_symbol -> CONTIDO','relation_symbol',1,'p_relation_symbol','analisador_sintatico.py',429),
-  ('cardinality_opt -> cardinality','cardinality_opt',1,'p_cardinality_opt','analisador_sintatico.py',436),
-  ('cardinality_opt -> empty','cardinality_opt',1,'p_cardinality_opt','analisador_sintatico.py',437),
-  ('empty -> <empty>','empty',0,'p_empty','analisador_sintatico.py',441),
+  ('modifiers -> DISJOINT COMPLETE','modifiers',2,'p_modifiers','analisador_sintatico.py',339),
+  ('modifiers -> COMPLETE DISJOINT','modifiers',2,'p_modifiers','analisador_sintatico.py',340),
+  ('modifiers -> DISJOINT','modifiers',1,'p_modifiers','analisador_sintatico.py',341),
+  ('modifiers -> COMPLETE','modifiers',1,'p_modifiers','analisador_sintatico.py',342),
+  ('class_list -> CLASS_NAME','class_list',1,'p_class_list','analisador_sintatico.py',349),
+  ('class_list -> class_list COMMA CLASS_NAME','class_list',3,'p_class_list','analisador_sintatico.py',350),
+  ('relation_declaration -> ARROBA EST_REL RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME','relation_declaration',8,'p_relation_declaration','analisador_sintatico.py',357),
+  ('relation_declaration -> RELATION CLASS_NAME cardinality relation_symbol cardinality CLASS_NAME','relation_declaration',6,'p_relation_declaration','analisador_sintatico.py',358),
+  ('relation_declaration -> RELATION CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAME','relation_declaration',8,'p_relation_declaration','analisador_sintatico.py',359),
+  ('relation_declaration -> CLASS_NAME cardinality relation_symbol RELATION_NAME relation_symbol cardinality CLASS_NAME','relation_declaration',7,'p_relation_declaration','analisador_sintatico.py',360),
+  ('cardinality -> LBRACKET NUMBER DOT DOT ASTERISCO RBRACKET','cardinality',6,'p_cardinality','analisador_sintatico.py',409),
+  ('cardinality -> LBRACKET NUMBER RBRACKET','cardinality',3,'p_cardinality','analisador_sintatico.py',410),
+  ('cardinality -> LBRACKET NUMBER DOT DOT NUMBER RBRACKET','cardinality',6,'p_cardinality','analisador_sintatico.py',411),
+  ('cardinality -> LBRACKET ASTERISCO RBRACKET','cardinality',3,'p_cardinality','analisador_sintatico.py',412),
+  ('relation_symbol -> HYPHEN HYPHEN','relation_symbol',2,'p_relation_symbol','analisador_sintatico.py',423),
+  ('relation_symbol -> CONTEM','relation_symbol',1,'p_relation_symbol','analisador_sintatico.py',424),
+  ('relation_symbol -> CONTIDO','relation_symbol',1,'p_relation_symbol','analisador_sintatico.py',425),
+  ('cardinality_opt -> cardinality','cardinality_opt',1,'p_cardinality_opt','analisador_sintatico.py',432),
+  ('cardinality_opt -> empty','cardinality_opt',1,'p_cardinality_opt','analisador_sintatico.py',433),
+  ('empty -> <empty>','empty',0,'p_empty','analisador_sintatico.py',437),
 ]
@@ -0,0 +1,240 @@
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import analisador_semantico
+import ast_binario
+import cache_ast
+import metricas
+import modelo_mesclado
+import simbolos
+
+MANIFESTO = 'tonto.json'
+
+def carregar_manifesto(raiz):
+    caminho = os.path.join(raiz, MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def localizar_raiz(caminho):
+    # Sobe a partir de um arquivo/pasta até encontrar o tonto.json do projeto
+    atual = os.path.abspath(caminho)
+    if os.path.isfile(atual):
+        atual = os.path.dirname(atual)
+    while True:
+        if os.path.exists(os.path.join(atual, MANIFESTO)):
+            return atual
+        pai = os.path.dirname(atual)
+        if pai == atual:
+            return None
+        atual = pai
+
+def _pastas_de_codigo(raiz, manifesto):
+    pastas = [raiz]
+
+    # Dependências locais: projetos irmãos com o mesmo nome e o próprio tonto.json
+    for nome in sorted(manifesto.get('dependencies', {}) or {}):
+        pasta = os.path.join(os.path.dirname(raiz), nome)
+        if os.path.abspath(pasta) == os.path.abspath(raiz):
+            continue
+        if os.path.exists(os.path.join(pasta, MANIFESTO)):
+            pastas.append(pasta)
+    return pastas
+
+def descobrir_arquivos(raiz, manifesto=None):
+    if manifesto is None:
+        manifesto = carregar_manifesto(raiz)
+
+    arquivos = []
+    for pasta in _pastas_de_codigo(raiz, manifesto):
+        manifesto_pasta = manifesto if pasta == raiz else carregar_manifesto(pasta)
+        saida = manifesto_pasta.get('outFolder')
+        ignorar = os.path.abspath(os.path.join(pasta, saida)) if saida else None
+
+        base = os.path.join(pasta, 'src')
+        if not os.path.isdir(base):
+            base = pasta
+
+        for root, dirs, files in os.walk(base):
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != ignorar]
+            for file in files:
+                if file.endswith('.tonto'):
+                    arquivos.append(os.path.abspath(os.path.join(root, file)))
+
+    return sorted(set(arquivos))
+
+def cache_do_projeto(caminho):
+    # Um cache por projeto (pasta do tonto.json) ou, na falta dele, por pasta
+    raiz = localizar_raiz(caminho)
+    if raiz is None:
+        raiz = caminho if os.path.isdir(caminho) else os.path.dirname(os.path.abspath(caminho))
+    return cache_ast.CacheAST(os.path.join(raiz, cache_ast.PASTA_CACHE))
+
+def compilar_arquivo(caminho, medir=False):
+    # Executado nos processos do pool: lê, analisa e devolve a AST no formato
+    # binário (ast_binario) com o que o parser imprimiu anexado, para o
+    # processo principal exibir em ordem e gravar no cache sem reconvertê-la.
+    # A chave é calculada sobre os bytes efetivamente analisados. Com medir,
+    # devolve também as métricas do processo, somadas depois no principal.
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    return compilar_conteudo(caminho, dados, medir)
+
+def compilar_conteudo(caminho, dados, medir=False):
+    # Como compilar_arquivo, com os bytes já lidos (pela esteira)
+    if not medir:
+        ast, saida = cache_ast.parse_codigo(dados.decode('utf-8', 'replace'))
+        return caminho, cache_ast.hash_conteudo(dados), ast_binario.serializar_ast(ast, saida), None
+    with metricas.coletar() as coletor:
+        ast, saida = cache_ast.parse_codigo(dados.decode('utf-8', 'replace'))
+    return caminho, cache_ast.hash_conteudo(dados), ast_binario.serializar_ast(ast, saida), coletor.exportar()
+
+# Esteira de compilação: leitura, análise léxica/sintática e o consumidor
+# (mesclagem, análise semântica, relatório) rodam ao mesmo tempo, ligados
+# por uma fila limitada. Uma thread lê os arquivos e consulta o cache (E/S)
+# e entrega os que faltam aos processos do pool (CPU); o consumidor recebe
+# as ASTs na ordem dos arquivos. Quando a fila enche a leitura para, então
+# no máximo `capacidade` arquivos ficam em trânsito, e o tempo total tende
+# ao da etapa mais lenta em vez da soma de todas. Sem workers o parse é
+# feito pelo próprio consumidor, e só a leitura corre à frente.
+
+_FIM = object()
+
+def _colocar(fila, item, parar):
+    # put que desiste quando o consumidor abandona a esteira
+    while not parar.is_set():
+        try:
+            fila.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _alimentar(tarefas, executor, medir, fila, parar):
+    # Thread de leitura: (caminho, AST do cache, None, ...) ou (caminho,
+    # None, futuro do parse ou os bytes a analisar, ...)
+    try:
+        for caminho, cache, tabela in tarefas:
+            with open(caminho, 'rb') as f:
+                dados = f.read()
+            encontrado = cache.obter(cache_ast.hash_conteudo(dados), tabela) if cache is not None else None
+            if encontrado is not None:
+                item = (caminho, encontrado, None, cache, tabela)
+            elif executor is not None:
+                item = (caminho, None, executor().submit(compilar_conteudo, caminho, dados, medir), cache, tabela)
+            else:
+                item = (caminho, None, dados, cache, tabela)
+            if not _colocar(fila, item, parar):
+                return
+    except BaseException as erro:
+        _colocar(fila, erro, parar)
+    _colocar(fila, _FIM, parar)
+
+def compilar_em_esteira(tarefas, workers=None, capacidade=None):
+    # tarefas: [(caminho, cache ou None, tabela ou None)]. Gera (caminho,
+    # ast, saida, do_cache) na ordem das tarefas; a AST é a ASTMapeada do
+    # cache ou a do parse, já gravada no cache. workers: processos do pool
+    # (padrão: núcleos da CPU); 0 analisa no próprio processo
+    tarefas = list(tarefas)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(0, min(workers, len(tarefas)))
+    if capacidade is None:
+        capacidade = max(1, workers) * 4
+    coletor = metricas.atual()
+    fila = queue.Queue(maxsize=capacidade)
+    parar = threading.Event()
+    pool = []
+    analisados = 0
+
+    def executor():
+        # O pool só é criado se algum arquivo não estiver no cache
+        if not pool:
+            pool.append(ProcessPoolExecutor(max_workers=workers))
+        return pool[0]
+
+    leitor = threading.Thread(target=_alimentar, name='esteira-leitura', daemon=True,
+                              args=(tarefas, executor if workers else None, coletor.ativo, fila, parar))
+    leitor.start()
+    try:
+        while True:
+            # Tempo em que o consumidor fica parado esperando as etapas anteriores
+            inicio = time.perf_counter()
+            item = fila.get()
+            if isinstance(item, tuple) and isinstance(item[2], Future):
+                item = item[:2] + (item[2].result(),) + item[3:]
+            coletor.somar_fase('espera_esteira', time.perf_counter() - inicio, 0.0)
+            if item is _FIM:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            caminho, encontrado, compilado, cache, tabela = item
+            if encontrado is not None:
+                ast, saida = encontrado
+                yield caminho, ast, saida, True
+                continue
+            if isinstance(compilado, bytes):
+                # No próprio processo o parse já registra no coletor ativo
+                compilado = compilar_conteudo(caminho, compilado)
+            _, chave, dados, medidas = compilado
+            analisados += 1
+            if medidas:
+                coletor.incorporar(medidas)
+            ast = ast_binario.ASTMapeada(dados, tabela)
+            if cache is not None:
+                cache.guardar_serializada(chave, dados)
+            yield caminho, ast, ast.saida, False
+    finally:
+        parar.set()
+        leitor.join()
+        if pool:
+            pool[0].shutdown(cancel_futures=True)
+        coletor.contar('workers', max(workers, 1) if analisados else 0)
+
+def mesclar_asts(arquivos, nome_pacote=None):
+    # arquivos: [(caminho, ast)]; devolve uma vista somente leitura
+    return modelo_mesclado.ModeloMesclado(arquivos, nome_pacote)
+
+def compilar_projeto(raiz, workers=None, usar_cache=True):
+    manifesto = carregar_manifesto(raiz)
+    arquivos = descobrir_arquivos(raiz, manifesto)
+    cache = cache_do_projeto(raiz) if usar_cache else None
+    # Uma tabela para o projeto: nomes citados em vários arquivos ficam uma vez em memória
+    tabela = simbolos.TabelaSimbolos()
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # Um worker só: o parse fica no próprio processo, sem a ida e volta pelo pool
+    if workers <= 1:
+        workers = 0
+
+    # Cada AST entra no modelo e nos índices da análise semântica assim que
+    # sai da esteira, enquanto os arquivos seguintes são analisados; as
+    # regras são avaliadas uma vez, com o projeto inteiro (elas consultam
+    # classes de qualquer arquivo). Ordem dos arquivos descobertos: o
+    # relatório sai sempre igual
+    nome = manifesto.get('projectName') or os.path.basename(os.path.abspath(raiz))
+    ast_mesclada = mesclar_asts([], nome)
+    analisador = analisador_semantico.AnalisadorSemantico(ast_mesclada)
+    resultados = []
+    with metricas.atual().fase('compilacao'):
+        for resultado in compilar_em_esteira([(caminho, cache, tabela) for caminho in arquivos], workers):
+            resultados.append(resultado)
+            caminho, ast, _, _ = resultado
+            analisador.receber(ast_mesclada.adicionar(caminho, ast))
+    analisador.analisar()
+    return resultados, analisador
+
+def resultados_por_arquivo(analisador):
+    # Distribui os resultados da análise do projeto inteiro pelos arquivos:
+    # cada unidade avaliada vai para o arquivo do seu primeiro nó
+    modelo = analisador.ast
+    por_arquivo = {}
+    for nos, resultados in analisador.resultados_por_unidade():
+        por_arquivo.setdefault(modelo.arquivo_de(nos[0]), []).extend(resultados)
+    return por_arquivo
@@ -0,0 +1,276 @@
+# Regras de validação dos padrões ODP. O motor em analisador_semantico.py
+# percorre o modelo uma única vez e entrega a cada regra apenas os nós
+# declarados em `interesses`; novas regras só precisam ser registradas.
+
+import bisect
+from abc import ABC, abstractmethod
+
+from simbolos import CODIGOS
+
+# Tipos de nó entregues pelo motor
+CLASSE = 'classe'
+GENSET = 'genset'
+RELACAO = 'relacao'
+DATATYPE = 'datatype'
+ENUM = 'enum'
+
+# Códigos (simbolos.py) dos estereótipos usados pelas regras: interesses e
+# comparações são feitos sobre o código do nó, não sobre o texto
+KIND, SUBKIND, ROLE, PHASE, RELATOR, MODE, ROLE_MIXIN = (
+    CODIGOS[nome] for nome in ('kind', 'subkind', 'role', 'phase', 'relator', 'mode', 'roleMixin'))
+MATERIAL, MEDIATION, CHARACTERIZATION, EXTERNAL_DEPENDENCE = (
+    CODIGOS[nome] for nome in ('material', 'mediation', 'characterization', 'externalDependence'))
+
+REGRAS = []
+
+def registrar_regra(classe_regra):
+    # Uma regra com métodos abstratos falha aqui, e não no meio da análise
+    if classe_regra.__abstractmethods__:
+        faltam = ', '.join(sorted(classe_regra.__abstractmethods__))
+        raise TypeError(f"Regra {classe_regra.__name__} não implementa: {faltam}")
+    REGRAS.append(classe_regra)
+    return classe_regra
+
+class Regra(ABC):
+    padrao = None
+    # Pares (tipo de nó, código do estereótipo); None recebe todos do tipo
+    interesses = ()
+    # Resultado INFO quando nenhum nó de interesse aparece no modelo
+    mensagem_ausente = None
+
+    def __init__(self):
+        self.encontrados = 0
+        # Unidade de avaliação -> nós que a sustentam, em ordem de aparição
+        self.unidades = {}
+        # A ordem das unidades mudou desde que o motor olhou pela última vez
+        self.reordenada = False
+
+    def unidade(self, no):
+        # Chave da unidade avaliada para o nó; None ignora o nó
+        return no
+
+    # `posicao` (a chave de ordenação do nó no modelo) só é passada depois da
+    # análise completa: o nó e a sua unidade vão para o lugar em que uma
+    # análise do zero os poria, e não para o fim
+
+    def visitar(self, no, posicao=None):
+        # Devolve (chave, True se a unidade acabou de surgir)
+        self.encontrados += 1
+        chave = self.unidade(no)
+        if chave is None:
+            return None, False
+        nos = self.unidades.get(chave)
+        if nos is None:
+            ultima = next(reversed(self.unidades.values()), None)
+            self.unidades[chave] = [no]
+            if posicao is not None and ultima is not None and posicao(no) < posicao(ultima[0]):
+                self._reordenar(posicao)
+            return chave, True
+        if posicao is None:
+            nos.append(no)
+            return chave, False
+        bisect.insort(nos, no, key=posicao)
+        if nos[0] is no and posicao(no) != posicao(nos[1]):
+            self._reordenar(posicao)
+        return chave, False
+
+    def desvisitar(self, no, posicao=None):
+        # Devolve (chave, True se a unidade deixou de existir)
+        self.encontrados -= 1
+        chave = self.unidade(no)
+        if chave is None:
+            return None, False
+        nos = self.unidades[chave]
+        primeiro = nos[0] is no
+        nos.remove(no)
+        if nos:
+            if posicao is not None and primeiro and posicao(nos[0]) != posicao(no):
+                self._reordenar(posicao)
+            return chave, False
+        del self.unidades[chave]
+        return chave, True
+
+    def _reordenar(self, posicao):
+        # Unidades na ordem do seu primeiro nó
+        ordenadas = sorted(self.unidades.items(), key=lambda item: posicao(item[1][0]))
+        if [chave for chave, _ in ordenadas] != list(self.unidades):
+            self.unidades = dict(ordenadas)
+            self.reordenada = True
+
+    @abstractmethod
+    def avaliar(self, chave, analisador):
+        # Devolve [(tipo, mensagem)] da unidade. Tudo o que não vem do próprio
+        # nó deve ser lido pelas consultas do analisador (obter_classe, ...),
+        # que registram as dependências usadas na análise incremental.
+        ...
+
+class RegraPorClasse(Regra):
+    # Uma unidade por nome de classe: a edição de uma classe (versão nova
+    # entrando e antiga saindo) mantém a unidade e a sua posição no relatório
+    def unidade(self, no):
+        return no.name
+
+    def avaliar(self, nome, analisador):
+        resultados = []
+        for classe in self.unidades[nome]:
+            resultados.extend(self.avaliar_classe(classe, analisador))
+        return resultados
+
+    @abstractmethod
+    def avaliar_classe(self, classe, analisador):
+        ...
+
+class RegraAgrupadaPorPai(Regra):
+    # Classes de um estereótipo (código) avaliadas em conjunto por superclasse
+    estereotipo = None
+
+    def unidade(self, no):
+        return no.specializes or None
+
+    def filhos(self, pai, analisador):
+        return analisador.obter_classes_especializando(pai, self.estereotipo)
+
+@registrar_regra
+class RegraSubkind(RegraAgrupadaPorPai):
+    padrao = 'Subkind'
+    estereotipo = SUBKIND
+    interesses = ((CLASSE, SUBKIND),)
+    mensagem_ausente = 'Nenhum Subkind Pattern encontrado.'
+
+    def avaliar(self, pai, analisador):
+        lista_subkinds = self.filhos(pai, analisador)
+        classe_pai = analisador.obter_classe(pai)
+        if not classe_pai or classe_pai.codigo != KIND:
+            return [('ALERTA', f"Subkind incompleto: '{lista_subkinds[0].name}' especializa '{pai}' que não é um kind.")]
+
+        if analisador.tem_genset_disjoint(pai, {s.name for s in lista_subkinds}):
+            subkind_names = ', '.join([s.name for s in lista_subkinds])
+            return [('OK', f"Subkind completo: {subkind_names} -> {pai}")]
+        return [('ALERTA', f"Subkind incompleto: Subkinds de '{pai}' não possuem genset disjoint.")]
+
+@registrar_regra
+class RegraRole(RegraPorClasse):
+    padrao = 'Role'
+    interesses = ((CLASSE, ROLE),)
+    mensagem_ausente = 'Nenhum Role Pattern encontrado.'
+
+    def avaliar_classe(self, role, analisador):
+        pai = role.specializes
+        nome = role.name
+
+        if not pai:
+            return [('ALERTA', f"Role incompleto: '{nome}' não especializa nenhuma classe.")]
+
+        classe_pai = analisador.obter_classe(pai)
+        if not classe_pai or classe_pai.codigo not in (KIND, ROLE_MIXIN):
+            return [('ALERTA', f"Role incompleto: '{nome}' especializa '{pai}' que não é um kind ou roleMixin.")]
+
+        participa_material = analisador.classe_participa_relacao_externa(nome, MATERIAL)
+        participa_mediation = analisador.classe_participa_relacao_externa(nome, MEDIATION)
+        participa_em_relator = analisador.participa_em_relator(nome)
+
+        if participa_material or participa_mediation or participa_em_relator:
+            return [('OK', f"Role completo: {nome} -> {pai}")]
+        return [('ALERTA', f"Role incompleto: '{nome}' não participa de nenhuma relação material/mediada.")]
+
+@registrar_regra
+class RegraPhase(RegraAgrupadaPorPai):
+    padrao = 'Phase'
+    estereotipo = PHASE
+    interesses = ((CLASSE, PHASE),)
+    mensagem_ausente = 'Nenhum Phase Pattern encontrado.'
+
+    def avaliar(self, pai, analisador):
+        lista_phases = self.filhos(pai, analisador)
+        classe_pai = analisador.obter_classe(pai)
+        if not classe_pai or classe_pai.codigo != KIND:
+            return [('ALERTA', f"Phase incompleto: Phases de '{pai}' - '{pai}' não é um kind.")]
+
+        if len(lista_phases) < 2:
+            return [('ALERTA', f"Phase incompleto: O kind '{pai}' tem apenas uma fase: {lista_phases[0].name}.")]
+
+        if analisador.tem_genset_disjoint(pai, {p.name for p in lista_phases}):
+            phase_names = ', '.join([p.name for p in lista_phases])
+            return [('OK', f"Phase completo: {phase_names} -> {pai}")]
+        return [('ALERTA', f"Phase incompleto: Phases de '{pai}' não possuem genset disjoint (obrigatório).")]
+
+@registrar_regra
+class RegraRelator(RegraPorClasse):
+    padrao = 'Relator'
+    interesses = ((CLASSE, RELATOR),)
+    mensagem_ausente = 'Nenhum Relator Pattern encontrado.'
+
+    def avaliar_classe(self, relator, analisador):
+        nome = relator.name
+        mediacoes_validas = 0
+        mediacoes_invalidas = []
+
+        for rel in relator.internal_relations:
+            if rel.codigo == MEDIATION:
+                nome_alvo = rel.target
+                if nome_alvo:
+                    classe_alvo = analisador.obter_classe(nome_alvo)
+                    if classe_alvo:
+                        if classe_alvo.codigo == ROLE:
+                            mediacoes_validas += 1
+                        else:
+                            mediacoes_invalidas.append(f"'{nome_alvo}' é {classe_alvo.stereotype}, não role")
+                    else:
+                        mediacoes_invalidas.append(f"'{nome_alvo}' não encontrada")
+
+        if mediacoes_validas >= 2:
+            return [('OK', f"Relator completo: {nome} possui {mediacoes_validas} mediações válidas (para roles).")]
+        if mediacoes_validas == 1:
+            return [('ALERTA', f"Relator incompleto: '{nome}' possui apenas {mediacoes_validas} mediação válida (mínimo 2).")]
+        if mediacoes_invalidas:
+            erros = "; ".join(mediacoes_invalidas)
+            return [('ALERTA', f"Relator incompleto: '{nome}' não possui mediações para roles. Problemas: {erros}.")]
+        return [('ALERTA', f"Relator incompleto: '{nome}' não possui mediações.")]
+
+@registrar_regra
+class RegraMode(RegraPorClasse):
+    padrao = 'Mode'
+    interesses = ((CLASSE, MODE),)
+    mensagem_ausente = 'Nenhum Mode Pattern encontrado.'
+
+    def avaliar_classe(self, mode, analisador):
+        nome = mode.name
+        tem_characterization = analisador.classe_tem_relacao_interna(mode, CHARACTERIZATION)
+        tem_external_dependence = analisador.classe_tem_relacao_interna(mode, EXTERNAL_DEPENDENCE)
+
+        if tem_characterization and tem_external_dependence:
+            return [('OK', f"Mode completo: {nome} possui characterization e externalDependence.")]
+        if tem_characterization:
+            return [('ALERTA', f"Mode incompleto: '{nome}' não possui relação de dependência externa.")]
+        if tem_external_dependence:
+            return [('ALERTA', f"Mode incompleto: '{nome}' não possui relação de characterization.")]
+        return [('ALERTA', f"Mode incompleto: '{nome}' não possui characterization nem externalDependence.")]
+
+@registrar_regra
+class RegraRoleMixin(RegraPorClasse):
+    padrao = 'RoleMixin'
+    interesses = ((CLASSE, ROLE_MIXIN),)
+    mensagem_ausente = 'Nenhum RoleMixin Pattern encontrado.'
+
+    def avaliar_classe(self, rolemixin, analisador):
+        nome = rolemixin.name
+        roles_especializando = analisador.obter_classes_especializando(nome, ROLE)
+
+        gensets = analisador.obter_genset_para_classe(nome)
+        roles_via_genset = []
+        vistos = {id(classe) for classe in roles_especializando}
+        for genset in gensets:
+            for specific in genset.specifics:
+                classe = analisador.obter_classe(specific)
+                if classe and classe.codigo == ROLE and id(classe) not in vistos:
+                    vistos.add(id(classe))
+                    roles_via_genset.append(classe)
+
+        todos_roles = roles_especializando + roles_via_genset
+
+        if len(todos_roles) < 2:
+            return [('ALERTA', f"RoleMixin incompleto: '{nome}' não tem pelo menos 2 roles associados.")]
+        if gensets:
+            role_names = ', '.join([r.name for r in todos_roles])
+            return [('OK', f"RoleMixin completo: {nome} com roles: {role_names}")]
+        return [('ALERTA', f"RoleMixin incompleto: '{nome}' não possui genset definido.")]
@@ -0,0 +1,231 @@
+import contextlib
+import contextvars
+import json
+import os
+import sys
+
+# Saída dos relatórios e diagnósticos. Cada relatório escreve duas coisas no
+# Relatorio ativo: as linhas de texto formatadas para leitura (texto) e
+# registros estruturados (registrar/diagnostico). O escritor escolhido decide
+# o que aproveitar: EscritorTexto só as linhas, EscritorJSONL e EscritorSARIF
+# só os registros. As linhas são acumuladas e escritas em blocos.
+#
+#     with relatorios.usar(relatorios.Relatorio(relatorios.criar_escritor('jsonl'))):
+#         main.executar_projeto(raiz)
+
+FORMATOS = ('texto', 'jsonl', 'sarif')
+
+# Linhas acumuladas antes de escrever no destino
+LIMITE_BUFFER = 4096
+
+# Níveis dos diagnósticos: erro e alerta são problemas, ok e info não
+NIVEIS_SARIF = {'erro': 'error', 'alerta': 'warning'}
+
+class Escritor:
+    textual = False
+    estruturado = False
+
+    def __init__(self, destino=None):
+        # destino None é o sys.stdout do momento da escrita, para que
+        # redirect_stdout (usado pelo cache de ASTs) continue funcionando
+        self.destino = destino
+        self._pendentes = []
+
+    def _arquivo(self):
+        return self.destino if self.destino is not None else sys.stdout
+
+    def texto(self, linha):
+        pass
+
+    def registro(self, registro):
+        pass
+
+    def _acumular(self, linha):
+        self._pendentes.append(linha)
+        if len(self._pendentes) >= LIMITE_BUFFER:
+            self.descarregar()
+
+    def descarregar(self):
+        if self._pendentes:
+            self._arquivo().write("\n".join(self._pendentes) + "\n")
+            self._pendentes.clear()
+
+    def fechar(self):
+        self.descarregar()
+
+class EscritorTexto(Escritor):
+    textual = True
+
+    def texto(self, linha):
+        self._acumular(linha)
+
+class EscritorJSONL(Escritor):
+    # Um objeto JSON por linha, na ordem em que os registros são produzidos
+    estruturado = True
+
+    def registro(self, registro):
+        self._acumular(json.dumps(registro, ensure_ascii=False))
+
+class EscritorSARIF(Escritor):
+    # Só os diagnósticos de nível erro/alerta, num único documento SARIF
+    # 2.1.0 escrito ao fechar
+    estruturado = True
+
+    def __init__(self, destino=None):
+        super().__init__(destino)
+        self.resultados = []
+        self.regras = {}
+
+    def registro(self, registro):
+        if registro['tipo'] != 'diagnostico' or registro['nivel'] not in NIVEIS_SARIF:
+            return
+        regra = registro.get('regra') or registro['fase']
+        self.regras.setdefault(regra, {'id': regra, 'name': regra})
+        resultado = {
+            'ruleId': regra,
+            'level': NIVEIS_SARIF[registro['nivel']],
+            'message': {'text': registro['mensagem']},
+        }
+        if registro.get('arquivo'):
+            local = {'artifactLocation': {'uri': _uri(registro['arquivo'])}}
+            if registro.get('linha') and registro['linha'] > 0:
+                local['region'] = {'startLine': registro['linha']}
+            resultado['locations'] = [{'physicalLocation': local}]
+        if registro.get('sugestao'):
+            resultado['properties'] = {'sugestao': registro['sugestao']}
+        self.resultados.append(resultado)
+
+    def documento(self):
+        return {
+            '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+            'version': '2.1.0',
+            'runs': [{
+                'tool': {'driver': {'name': 'compilador-tonto', 'rules': list(self.regras.values())}},
+                'results': self.resultados,
+            }],
+        }
+
+    def fechar(self):
+        json.dump(self.documento(), self._arquivo(), indent=2, ensure_ascii=False)
+        self._arquivo().write("\n")
+
+def _uri(caminho):
+    # Relativo à pasta atual quando possível, com separadores '/'
+    relativo = os.path.relpath(caminho)
+    if relativo.startswith('..'):
+        relativo = os.path.abspath(caminho)
+    return relativo.replace(os.sep, '/')
+
+ESCRITORES = {'texto': EscritorTexto, 'jsonl': EscritorJSONL, 'sarif': EscritorSARIF}
+
+def criar_escritor(formato='texto', destino=None):
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato de relatório desconhecido: {formato} (use {', '.join(FORMATOS)})")
+    return ESCRITORES[formato](destino)
+
+class Relatorio:
+    def __init__(self, escritor=None, tabela_tokens=True):
+        self.escritor = escritor if escritor is not None else EscritorTexto()
+        # False omite a tabela de tokens (linhas e registros); o resumo fica
+        self.tabela_tokens = tabela_tokens
+        self.textual = self.escritor.textual
+        self.estruturado = self.escritor.estruturado
+        # Arquivo em análise, anotado nos registros que não trazem um
+        self.arquivo = None
+        self._blocos = 0
+
+    def texto(self, linha=""):
+        if self.textual:
+            self.escritor.texto(linha)
+            if not self._blocos:
+                self.escritor.descarregar()
+
+    def registrar(self, tipo, **campos):
+        if not self.estruturado:
+            return
+        registro = {'tipo': tipo}
+        if self.arquivo is not None and 'arquivo' not in campos:
+            registro['arquivo'] = self.arquivo
+        registro.update(campos)
+        self.escritor.registro(registro)
+        if not self._blocos:
+            self.escritor.descarregar()
+
+    def diagnostico(self, fase, nivel, mensagem, linha=None, sugestao=None, regra=None, arquivo=None):
+        campos = {'fase': fase, 'nivel': nivel, 'mensagem': mensagem}
+        if linha is not None:
+            campos['linha'] = linha
+        if sugestao:
+            campos['sugestao'] = sugestao
+        if regra:
+            campos['regra'] = regra
+        if arquivo is not None:
+            campos['arquivo'] = arquivo
+        self.registrar('diagnostico', **campos)
+
+    def diagnosticos_da_ast(self, ast, arquivo=None):
+        # Erros léxicos e sintáticos guardados na AST (também nas vindas do cache)
+        for erro in ast.lex_errors:
+            self.diagnostico('lexico', 'erro', erro['message'], linha=erro['line'], arquivo=arquivo)
+        for erro in ast.errors:
+            self.diagnostico('sintatico', 'erro', erro['message'], linha=erro['line'],
+                             sugestao=erro['suggestion'], arquivo=arquivo)
+
+    @contextlib.contextmanager
+    def bloco(self):
+        # Dentro de um bloco as linhas só são escritas ao encher o buffer ou
+        # ao sair do bloco mais externo
+        self._blocos += 1
+        try:
+            yield self
+        finally:
+            self._blocos -= 1
+            if not self._blocos:
+                self.escritor.descarregar()
+
+    @contextlib.contextmanager
+    def em_arquivo(self, caminho):
+        anterior = self.arquivo
+        self.arquivo = caminho
+        try:
+            yield self
+        finally:
+            self.arquivo = anterior
+
+    def fechar(self):
+        self.escritor.fechar()
+
+# Relatório ativo por contexto: threads e tarefas que trocam o relatório
+# (como o parse do cache, que captura a saída) não interferem entre si
+_atual = contextvars.ContextVar('relatorio', default=Relatorio())
+
+def atual():
+    return _atual.get()
+
+def adicionar_argumentos(parser, tabela_tokens=True):
+    parser.add_argument('--formato', choices=FORMATOS, default='texto',
+                        help="formato dos relatórios: texto, JSON Lines ou SARIF 2.1.0 (padrão: texto)")
+    parser.add_argument('--saida', metavar='ARQUIVO', default=None,
+                        help="escreve os relatórios no ARQUIVO em vez de stdout")
+    if tabela_tokens:
+        parser.add_argument('--sem-tokens', action='store_true',
+                            help="omite a tabela de tokens da análise léxica (o resumo é mantido)")
+
+@contextlib.contextmanager
+def usar_dos_argumentos(args):
+    with contextlib.ExitStack() as pilha:
+        destino = None
+        if args.saida:
+            destino = pilha.enter_context(open(args.saida, 'w', encoding='utf-8'))
+        relatorio = Relatorio(criar_escritor(args.formato, destino), not getattr(args, 'sem_tokens', False))
+        yield pilha.enter_context(usar(relatorio))
+
+@contextlib.contextmanager
+def usar(relatorio):
+    # Torna relatorio o ativo e o fecha ao final (o SARIF é escrito aqui)
+    marca = _atual.set(relatorio)
+    try:
+        yield relatorio
+    finally:
+        _atual.reset(marca)
+        relatorio.fechar()
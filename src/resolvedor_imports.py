@@ -0,0 +1,220 @@
+import os
+
+import cache_ast
+import metricas
+import modelo_mesclado
+import simbolos
+
+def nome_do_import(item_import):
+    if isinstance(item_import, tuple) and len(item_import) >= 2:
+        return item_import[1]
+    return str(item_import)
+
+class ResolvedorImports:
+    # Monta o grafo de imports de um conjunto de arquivos de entrada e
+    # analisa cada arquivo uma única vez, mesmo que seja alcançado por
+    # vários caminhos ou por várias entradas.
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.asts = {}
+        self.saidas = {}
+        self.do_cache = {}
+        # caminho -> [(nome do import, caminho absoluto, existe)]
+        self.imports = {}
+        self.ciclos = []
+        self._fechos = {}
+        # Identificadores internados de todos os arquivos carregados
+        self.tabela = simbolos.TabelaSimbolos()
+
+    def caminho_import(self, caminho, nome):
+        return os.path.abspath(os.path.join(os.path.dirname(caminho), f"{nome}.tonto"))
+
+    def carregar(self, entradas):
+        with metricas.atual().fase('imports'):
+            return self._carregar(entradas)
+
+    def _carregar(self, entradas):
+        pendentes = [os.path.abspath(caminho) for caminho in entradas]
+        while pendentes:
+            caminho = pendentes.pop()
+            if caminho in self.asts:
+                continue
+
+            self._analisar_arquivo(caminho)
+            for _, destino, existe in self.imports[caminho]:
+                if existe and destino not in self.asts:
+                    pendentes.append(destino)
+
+        self._fechos.clear()
+        self.ciclos = self._encontrar_ciclos()
+        return self
+
+    def _analisar_arquivo(self, caminho):
+        ast, saida, do_cache = cache_ast.parse_arquivo(caminho, self.cache, self.tabela)
+        self.asts[caminho] = ast
+        self.saidas[caminho] = saida
+        self.do_cache[caminho] = do_cache
+        self._montar_arestas(caminho)
+
+    def registrar(self, caminho, ast, saida='', do_cache=False):
+        # AST analisada fora do resolvedor (compilação do projeto): passa a
+        # ser a do arquivo, com as arestas montadas, sem nova análise
+        caminho = os.path.abspath(caminho)
+        self.asts[caminho] = ast
+        self.saidas[caminho] = saida
+        self.do_cache[caminho] = do_cache
+        self._montar_arestas(caminho)
+        self._fechos.clear()
+
+    def arquivo(self, caminho):
+        # AST de um único arquivo, sem seguir os imports (as arestas são
+        # montadas, mas os destinos só são localizados, não analisados)
+        caminho = os.path.abspath(caminho)
+        if caminho not in self.asts:
+            coletor = metricas.atual()
+            with coletor.fase('imports'):
+                self._analisar_arquivo(caminho)
+            coletor.contar('arquivos_sob_demanda')
+            self._fechos.clear()
+        return self.asts[caminho]
+
+    def _montar_arestas(self, caminho):
+        arestas = []
+        for item_import in self.asts[caminho].imports or []:
+            nome = nome_do_import(item_import)
+            destino = self.caminho_import(caminho, nome)
+            arestas.append((nome, destino, os.path.exists(destino)))
+        self.imports[caminho] = arestas
+
+    def atualizar(self, alterados, removidos=()):
+        # Reanalisa só os arquivos alterados (ou novos) e descarta os removidos.
+        # Quem importa um arquivo criado ou apagado tem as arestas refeitas
+        # sem ser analisado de novo.
+        alterados = [os.path.abspath(caminho) for caminho in alterados]
+        removidos = {os.path.abspath(caminho) for caminho in removidos}
+        afetados = set(alterados) | removidos
+
+        for caminho in afetados:
+            self.asts.pop(caminho, None)
+            self.saidas.pop(caminho, None)
+            self.do_cache.pop(caminho, None)
+            self.imports.pop(caminho, None)
+
+        for caminho, arestas in self.imports.items():
+            if any(destino in afetados for _, destino, _ in arestas):
+                self._montar_arestas(caminho)
+
+        self.carregar(alterados)
+        # Imports que passaram a existir também precisam ser carregados
+        novos = [destino for arestas in self.imports.values()
+                 for _, destino, existe in arestas if existe and destino not in self.asts]
+        if novos:
+            self.carregar(novos)
+        return self
+
+    def dependencias(self, caminho):
+        return [destino for _, destino, existe in self.imports.get(caminho, []) if existe]
+
+    def dependentes(self, caminhos):
+        # Arquivos cujo fecho de imports contém algum dos caminhos (inclusive eles).
+        # Usa também arestas para arquivos inexistentes: criar o arquivo afeta quem o importa.
+        reverso = {}
+        for origem, arestas in self.imports.items():
+            for _, destino, _ in arestas:
+                reverso.setdefault(destino, []).append(origem)
+
+        encontrados = set()
+        pilha = [os.path.abspath(caminho) for caminho in caminhos]
+        while pilha:
+            atual = pilha.pop()
+            if atual in encontrados:
+                continue
+            encontrados.add(atual)
+            pilha.extend(reverso.get(atual, []))
+        return encontrados
+
+    def _encontrar_ciclos(self):
+        # DFS iterativa com cores: uma aresta para um nó ainda na pilha fecha um ciclo
+        BRANCO, CINZA, PRETO = 0, 1, 2
+        cor = dict.fromkeys(self.asts, BRANCO)
+        ciclos = []
+        for inicio in sorted(self.asts):
+            if cor[inicio] != BRANCO:
+                continue
+            pilha = [(inicio, iter(self.dependencias(inicio)))]
+            caminho_atual = [inicio]
+            cor[inicio] = CINZA
+            while pilha:
+                no, filhos = pilha[-1]
+                for filho in filhos:
+                    if cor[filho] == BRANCO:
+                        cor[filho] = CINZA
+                        pilha.append((filho, iter(self.dependencias(filho))))
+                        caminho_atual.append(filho)
+                        break
+                    if cor[filho] == CINZA:
+                        ciclos.append(caminho_atual[caminho_atual.index(filho):] + [filho])
+                else:
+                    cor[no] = PRETO
+                    pilha.pop()
+                    caminho_atual.pop()
+        return ciclos
+
+    def ordem_topologica(self):
+        # Dependências antes dos dependentes; arestas de ciclo são ignoradas
+        ordem = []
+        visitados = set()
+        for inicio in sorted(self.asts):
+            if inicio in visitados:
+                continue
+            visitados.add(inicio)
+            pilha = [(inicio, iter(self.dependencias(inicio)))]
+            while pilha:
+                no, filhos = pilha[-1]
+                for filho in filhos:
+                    if filho not in visitados:
+                        visitados.add(filho)
+                        pilha.append((filho, iter(self.dependencias(filho))))
+                        break
+                else:
+                    ordem.append(no)
+                    pilha.pop()
+        return ordem
+
+    def fecho(self, caminho):
+        # Arquivos alcançáveis a partir de caminho (incluindo ele mesmo), em
+        # pré-ordem: a mesma ordem em que os imports sempre foram mesclados
+        caminho = os.path.abspath(caminho)
+        if caminho not in self._fechos:
+            ordem = []
+            visitados = set()
+            pilha = [caminho]
+            while pilha:
+                atual = pilha.pop()
+                if atual in visitados:
+                    continue
+                visitados.add(atual)
+                ordem.append(atual)
+                pilha.extend(reversed(self.dependencias(atual)))
+            self._fechos[caminho] = ordem
+        return self._fechos[caminho]
+
+    def ast_mesclada(self, caminho):
+        with metricas.atual().fase('mesclagem'):
+            return self._ast_mesclada(caminho)
+
+    def modelo_sob_demanda(self, caminho):
+        # Modelo que começa no arquivo e só lê os imports quando a análise
+        # semântica precisa de um nome que ele não declara
+        # (modelo_mesclado.ModeloSobDemanda)
+        caminho = os.path.abspath(caminho)
+        self.arquivo(caminho)
+        return modelo_mesclado.ModeloSobDemanda(self, caminho)
+
+    def _ast_mesclada(self, caminho):
+        # Vista somente leitura (modelo_mesclado.ModeloMesclado) sobre as ASTs
+        # do fecho, com as tabelas de símbolos por pacote e os conflitos
+        caminho = os.path.abspath(caminho)
+        raiz = self.asts[caminho]
+        return modelo_mesclado.ModeloMesclado([(arquivo, self.asts[arquivo]) for arquivo in self.fecho(caminho)],
+                                              raiz.package_name, raiz.imports, raiz.errors)
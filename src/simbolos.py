@@ -0,0 +1,50 @@
+import threading
+
+import analisador_lexico
+
+# Estereótipos como códigos inteiros pequenos (a posição em ESTEREOTIPOS).
+# O código 0 é a ausência de estereótipo; os de classe e os de relação do
+# lexer vêm em seguida, em ordem alfabética, e têm sempre o mesmo código.
+# Estereótipos fora desses conjuntos (de modelos OntoUML importados) ganham
+# um código novo na primeira vez em que aparecem.
+ESTEREOTIPOS = [None] + sorted(analisador_lexico.stereotypes_class) + sorted(analisador_lexico.stereotypes_rel)
+CODIGOS = {nome: codigo for codigo, nome in enumerate(ESTEREOTIPOS)}
+# Só a criação de um código novo passa pela trava: duas threads com o mesmo
+# estereótipo novo não podem ganhar códigos diferentes
+_NOVOS = threading.Lock()
+
+def codigo_estereotipo(nome):
+    codigo = CODIGOS.get(nome)
+    if codigo is None:
+        with _NOVOS:
+            codigo = CODIGOS.get(nome)
+            if codigo is None:
+                # A lista cresce antes do dicionário: quem acha o código já
+                # encontra o nome em ESTEREOTIPOS
+                codigo = len(ESTEREOTIPOS)
+                ESTEREOTIPOS.append(nome)
+                CODIGOS[nome] = codigo
+    return codigo
+
+def nome_estereotipo(codigo):
+    return ESTEREOTIPOS[codigo]
+
+class TabelaSimbolos:
+    # Identificadores internados de um build (um projeto, um resolvedor de
+    # imports): cada nome fica uma única vez em memória, por mais arquivos
+    # que o declarem ou citem, e nomes iguais são o mesmo objeto (a
+    # comparação termina na identidade). Fica só enquanto o build existir,
+    # ao contrário de sys.intern.
+    def __init__(self):
+        self._nomes = {}
+        # Classificação dos lexemas pelo lexer rapido, já com o valor internado
+        self.classificacao = {}
+
+    def internar(self, nome):
+        return self._nomes.setdefault(nome, nome)
+
+    def __len__(self):
+        return len(self._nomes)
+
+    def __contains__(self, nome):
+        return nome in self._nomes
@@ -0,0 +1,62 @@
+import glob
+import os
+
+import pytest
+
+import analisador_lexico
+
+RAIZ = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Compiladores_UFERSA-main')
+EXEMPLOS = sorted(glob.glob(os.path.join(RAIZ, '**', '*.tonto'), recursive=True))
+
+# Entradas malformadas: strings e comentários sem fim, símbolos fora da
+# linguagem, não ASCII, quebras de linha do Windows e sequências que quase
+# formam um operador
+MALFORMADAS = [
+    "",
+    "\n\n\n",
+    'kind A "sem fim\nkind B\n',
+    "kind A 'simples \\' escapada'\n",
+    "kind A /* comentário sem fim\nkind B\n",
+    "kind A /* fecha */ */ kind B\n",
+    "kind A # $ % ^ & | ~\nkind B ##\n",
+    "kind Café\nkind Ação { nome: string }\n",
+    "kind A\r\nkind B\r\n",
+    "kind A\x00\x01kind B\n",
+    "12ab 007 9_9 _x x_\n",
+    "relation A [1..*] <>-- [0..1] B --<> C <>- D --< E --> F ---- G\n",
+    "@@material @ relation\t\tA[1..*]--[*]B\n",
+    "kind A { x : string [ 1 . . * ] }\n",
+    "genset G { general A specifics B, C, }\n// fim sem quebra",
+]
+
+def _fluxo(backend, codigo):
+    # (tipo, valor, linha, posição) de cada token e os erros léxicos
+    lexer = analisador_lexico.build(backend)
+    lexer.erros_lexicos = []
+    lexer.input(codigo)
+    tokens = []
+    while True:
+        tok = lexer.token()
+        if tok is None:
+            break
+        tokens.append((tok.type, tok.value, tok.lineno, tok.lexpos))
+    return tokens, lexer.erros_lexicos
+
+def _ler(caminho):
+    with open(caminho, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+@pytest.mark.parametrize('codigo', [_ler(caminho) for caminho in EXEMPLOS] + MALFORMADAS,
+                         ids=[os.path.relpath(caminho, RAIZ) for caminho in EXEMPLOS]
+                             + [f'malformada{indice}' for indice in range(len(MALFORMADAS))])
+def test_lexer_rapido_igual_ao_ply(codigo):
+    assert _fluxo('rapido', codigo) == _fluxo('ply', codigo)
+
+@pytest.mark.parametrize('codigo', MALFORMADAS)
+def test_lexer_rapido_sobre_bytes_igual_ao_ply(codigo):
+    # Sobre bytes (arquivo mapeado) as posições são em bytes: só tipo,
+    # valor e linha são comparados
+    tokens, erros = _fluxo('rapido', codigo.encode('utf-8'))
+    tokens_ply, erros_ply = _fluxo('ply', codigo)
+    assert [token[:3] for token in tokens] == [token[:3] for token in tokens_ply]
+    assert erros == erros_ply
@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import analisador_sintatico
+import cache_ast
+
+RAIZ = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Compiladores_UFERSA-main')
+
+def _parse_exemplo(relativo):
+    with open(os.path.join(RAIZ, relativo), encoding='utf-8') as f:
+        return cache_ast.parse_codigo(f.read())[0]
+
+# Erros e relações dos exemplos antes do modo pânico: a sincronização não
+# pode esconder erros nem tirar o estereótipo de uma relação
+
+def test_sincronizacao_mantem_erros_de_relacoes_estereotipadas():
+    ast = _parse_exemplo('Pizzaria_Model/src/Pizzaria.tonto')
+    assert [erro['line'] for erro in ast.errors] == [11, 12, 13, 23, 32, 33, 34]
+    assert ast.relations == []
+
+    ast = _parse_exemplo('Hospital_Model/src/Vacinacao.tonto')
+    assert [erro['line'] for erro in ast.errors] == [25, 26, 27]
+    assert ast.relations == []
+
+def test_sincronizacao_para_no_arroba_de_uma_relacao():
+    ast, _ = cache_ast.parse_codigo(
+        "package P\n\nkind A\nkind B\n"
+        "kind C {\n    x string\n}\n"
+        "@material relation A [1..*] -- [1..*] B\n"
+        "@mediation relation B [1] -- [1..*] A\n")
+    assert [erro['line'] for erro in ast.errors] == [6]
+    assert [(relacao.stereotype, relacao.domain, relacao.range) for relacao in ast.relations] == [
+        ('material', 'A', 'B'), ('mediation', 'B', 'A')]
+
+def test_arroba_de_relacao_interna_nao_sincroniza():
+    ast, _ = cache_ast.parse_codigo(
+        "package P\n\nkind A\n"
+        "relator R {\n    x x\n    @mediation [1..*] -- [1..*] A\n}\n"
+        "kind B\n")
+    assert len(ast.errors) == 1
+    assert [classe.name for classe in ast.classes][-1] == 'B'
+
+def _fonte(indice):
+    # Classes próprias e um erro numa linha que depende do índice
+    linhas = ["package P%d" % indice, ""]
+    linhas += ["kind K%d_%d" % (indice, k) for k in range(indice % 7 + 1)]
+    linhas += ["kind E%d {" % indice, "    x string", "}", "kind Z%d" % indice]
+    return "\n".join(linhas) + "\n", len(linhas) - 2
+
+def test_parse_em_threads_devolve_uma_ast_por_fonte():
+    motor = analisador_sintatico.MotorSintatico()
+    fontes = [_fonte(indice) for indice in range(60)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        asts = list(pool.map(lambda fonte: motor.parse(fonte[0])[1], fontes))
+    for indice, ((_, linha_erro), ast) in enumerate(zip(fontes, asts)):
+        assert ast.package_name == "P%d" % indice
+        assert [cls.name for cls in ast.classes] == (
+            ["K%d_%d" % (indice, k) for k in range(indice % 7 + 1)] + ["E%d" % indice, "Z%d" % indice])
+        assert [erro['line'] for erro in ast.errors] == [linha_erro]
+
+def test_parse_aninhado_nao_altera_a_ast_de_quem_chamou(monkeypatch):
+    # O parse de um import no meio de outro parse (disparado aqui pelo
+    # lexer de quem chamou, ao chegar em `Meio`)
+    motor = analisador_sintatico.MotorSintatico()
+    clonar = motor.lexer.clone
+    aninhadas = []
+
+    def clone():
+        lexer = clonar()
+        if aninhadas:
+            return lexer
+        proximo = lexer.token
+
+        def token():
+            tok = proximo()
+            if tok is not None and tok.value == 'Meio' and not aninhadas:
+                aninhadas.append(None)
+                aninhadas[0] = motor.parse("package Importado\n\nkind Interna\nkind Quebrada {\n    y string\n}\n")[1]
+            return tok
+
+        lexer.token = token
+        return lexer
+
+    monkeypatch.setattr(motor.lexer, 'clone', clone)
+    _, ast = motor.parse("package Principal\n\nkind Antes\nkind Meio\nkind Depois {\n    x string\n}\n")
+    importada = aninhadas[0]
+    assert ast.package_name == 'Principal'
+    assert [cls.name for cls in ast.classes] == ['Antes', 'Meio']
+    assert [erro['line'] for erro in ast.errors] == [6]
+    assert importada.package_name == 'Importado'
+    assert [cls.name for cls in importada.classes] == ['Interna']
+    assert [erro['line'] for erro in importada.errors] == [5]
@@ -0,0 +1,67 @@
+import ast_binario
+import cache_ast
+from ast_nodes import Cardinality
+
+CODIGO = """import Pessoas
+
+package Loja
+
+kind Produto {
+    nome: string [1..99999999999]
+    codigos: string [0..*]
+    preco: number [1]
+}
+
+relator Venda {
+    @mediation [1..*] -- [4294967296] Cliente
+    @mediation [2147483647..2147483648] -- [1] Produto
+}
+
+role Cliente specializes Pessoa
+
+datatype Endereco {
+    rua: string [1..12345678901234567890]
+}
+
+enum Cor { Vermelho, Verde }
+
+disjoint complete genset Tipos {
+    general Produto
+    specifics Livro, Disco
+}
+
+@material relation Cliente [0..99999999999] -- [*] Produto
+
+relation Cliente [1] -- avalia -- [4294967296] Produto
+"""
+
+def _campos(ast):
+    # Representação comparável de tudo o que o formato guarda
+    return {campo: repr(list(getattr(ast, campo) or [])) for campo in ast_binario.ASTMapeada.CAMPOS}
+
+def test_ida_e_volta_preserva_a_ast():
+    ast, saida = cache_ast.parse_codigo(CODIGO)
+    assert not ast.errors
+    lida = ast_binario.ASTMapeada(ast_binario.serializar_ast(ast, saida))
+    assert _campos(lida) == _campos(ast)
+    assert lida.saida == saida
+
+def test_cardinalidades_fora_do_i32():
+    ast, _ = cache_ast.parse_codigo(CODIGO)
+    lida = ast_binario.ASTMapeada(ast_binario.serializar_ast(ast))
+    produto = lida.classes[0]
+    assert produto.attributes[0].cardinality.max == 99999999999
+    venda = lida.classes[1]
+    assert venda.internal_relations[0].target_card.min == 4294967296
+    assert venda.internal_relations[1].source_card.min == 2147483647
+    assert venda.internal_relations[1].source_card.max == 2147483648
+    assert lida.datatypes[0].attributes[0].cardinality.max == 12345678901234567890
+    assert lida.relations[0].domain_card.max == 99999999999
+    assert lida.relations[1].range_card.min == 4294967296
+
+def test_limites_que_nao_sao_inteiros():
+    ast, _ = cache_ast.parse_codigo("package P\n\nkind A {\n    x: string [1]\n}\n")
+    ast.classes[0].attributes[0].cardinality = Cardinality(-5, 'n')
+    lida = ast_binario.ASTMapeada(ast_binario.serializar_ast(ast))
+    cardinalidade = lida.classes[0].attributes[0].cardinality
+    assert (cardinalidade.min, cardinalidade.max) == (-5, 'n')
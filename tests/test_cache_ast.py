@@ -0,0 +1,13 @@
+import os
+
+import cache_ast
+
+def test_abrir_o_cache_nao_apaga_outras_versoes(tmp_path):
+    raiz = tmp_path / cache_ast.PASTA_CACHE
+    antiga = raiz / 'versao_antiga' / 'aa'
+    antiga.mkdir(parents=True)
+    cache = cache_ast.CacheAST(str(raiz))
+    assert antiga.is_dir()
+
+    assert cache.limpar() == 1
+    assert os.listdir(raiz) == [cache_ast.versao_gramatica()]
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+import analisador_semantico
+import cache_ast
+import modelo_mesclado
+
+# Modelos pequenos e aleatórios com muitos nomes repetidos (no mesmo arquivo,
+# entre arquivos do mesmo pacote e entre pacotes): trocar um arquivo no
+# modelo e atualizar o analisador tem de dar o mesmo que analisar do zero.
+
+NOMES = ['Car', 'Owner', 'Person', 'Rental', 'Agent', 'Other']
+ARQUIVOS = [('a.tonto', 'P'), ('b.tonto', 'P'), ('c.tonto', 'Q')]
+
+def _declaracao(rnd):
+    nome, alvo, outro = rnd.choice(NOMES), rnd.choice(NOMES), rnd.choice(NOMES)
+    tipo = rnd.randrange(9)
+    if tipo == 0:
+        return f"kind {nome}"
+    if tipo == 1:
+        return f"subkind {nome} specializes {alvo}"
+    if tipo == 2:
+        return f"phase {nome} specializes {alvo}"
+    if tipo == 3:
+        return f"role {nome} specializes {alvo}"
+    if tipo == 4:
+        return f"roleMixin {nome}"
+    if tipo == 5:
+        return (f"relator {nome} {{\n    @mediation [1..*] -- [1..*] {alvo}\n"
+                f"    @mediation [1..*] -- [1..*] {outro}\n}}")
+    if tipo == 6:
+        return (f"mode {nome} {{\n    @characterization [1..*] -- [1] {alvo}\n"
+                f"    @externalDependence [1..*] -- [1] {outro}\n}}")
+    if tipo == 7:
+        modificador = rnd.choice(['disjoint complete ', 'disjoint ', ''])
+        return f"{modificador}genset G_{nome} {{\n    general {alvo}\n    specifics {nome}, {outro}\n}}"
+    if rnd.random() < 0.5:
+        return f"relation {nome} [1..*] -- liga -- [1..*] {alvo}"
+    return f"@{rnd.choice(['material', 'mediation'])} relation {nome} [1..*] -- [1..*] {alvo}"
+
+def _arquivo(rnd, pacote):
+    corpo = [_declaracao(rnd) for _ in range(rnd.randrange(1, 8))]
+    return f"package {pacote}\n\n" + "\n".join(corpo) + "\n"
+
+def _editar(rnd, codigo, pacote):
+    linhas = codigo.split("\n")
+    operacao = rnd.randrange(4)
+    if operacao == 0:
+        return _arquivo(rnd, pacote)
+    if operacao == 1:
+        return codigo + _declaracao(rnd) + "\n"
+    if operacao == 2:
+        # Só comentário: nenhum resultado pode mudar de ordem
+        return "// editado\n" + codigo
+    # Remove uma declaração de uma linha (as de bloco ficam)
+    simples = [i for i, linha in enumerate(linhas) if linha and not linha.startswith(('package', ' ', '}'))
+               and not linha.endswith('{')]
+    if simples:
+        del linhas[rnd.choice(simples)]
+    return "\n".join(linhas)
+
+def _parse(codigo):
+    ast, saida = cache_ast.parse_codigo(codigo)
+    assert not ast.errors, saida
+    return ast
+
+def _do_zero(asts):
+    modelo = modelo_mesclado.ModeloMesclado([(caminho, asts[caminho]) for caminho, _ in ARQUIVOS], 'P')
+    return analisador_semantico.AnalisadorSemantico(modelo).analisar()
+
+@pytest.mark.parametrize('semente', range(60))
+def test_trocar_e_atualizar_igual_a_analise_do_zero(semente):
+    rnd = random.Random(semente)
+    codigos = {caminho: _arquivo(rnd, pacote) for caminho, pacote in ARQUIVOS}
+    asts = {caminho: _parse(codigo) for caminho, codigo in codigos.items()}
+    modelo = modelo_mesclado.ModeloMesclado([(caminho, asts[caminho]) for caminho, _ in ARQUIVOS], 'P')
+    analisador = analisador_semantico.AnalisadorSemantico(modelo)
+    analisador.analisar()
+
+    for passo in range(8):
+        caminho, pacote = rnd.choice(ARQUIVOS)
+        codigos[caminho] = _editar(rnd, codigos[caminho], pacote)
+        asts[caminho] = _parse(codigos[caminho])
+        removidos, adicionados = modelo.trocar(caminho, asts[caminho])
+        resultados = analisador.atualizar(removidos, adicionados)
+        assert resultados == _do_zero(asts), f"passo {passo}: {caminho}\n{codigos[caminho]}"
+
+def test_trocar_nao_promove_repetida_do_proprio_arquivo():
+    antiga = _parse("package P\nkind Car\nkind Owner\nrole Car specializes Owner\n")
+    nova = _parse("package P\nkind Car\nkind Owner\nrole Car specializes Owner\nkind Other\n")
+    modelo = modelo_mesclado.ModeloMesclado([('x.tonto', antiga)], 'P')
+    analisador = analisador_semantico.AnalisadorSemantico(modelo)
+    analisador.analisar()
+    resultados = analisador.atualizar(*modelo.trocar('x.tonto', nova))
+    assert resultados == analisador_semantico.AnalisadorSemantico(
+        modelo_mesclado.ModeloMesclado([('x.tonto', nova)], 'P')).analisar()
+    assert not [r for r in resultados if r['tipo'] == 'ALERTA']
+
+@pytest.mark.parametrize('semente', range(20))
+def test_receber_arquivo_a_arquivo_igual_a_analise_do_zero(semente):
+    # Como em projeto.compilar_projeto: cada AST entra no modelo e nos
+    # índices ao chegar, e as regras são avaliadas uma vez no final
+    rnd = random.Random(semente)
+    asts = {caminho: _parse(_arquivo(rnd, pacote)) for caminho, pacote in ARQUIVOS}
+    modelo = modelo_mesclado.ModeloMesclado([], 'P')
+    analisador = analisador_semantico.AnalisadorSemantico(modelo)
+    for caminho, _ in ARQUIVOS:
+        analisador.receber(modelo.adicionar(caminho, asts[caminho]))
+    assert analisador.analisar() == _do_zero(asts)
+    with pytest.raises(RuntimeError):
+        analisador.receber([])
@@ -0,0 +1,18 @@
+import pytest
+
+import regras_semanticas
+from regras_semanticas import CLASSE, KIND, RegraPorClasse, registrar_regra
+
+def test_regra_incompleta_falha_no_registro():
+    class RegraSemAvaliacao(RegraPorClasse):
+        padrao = 'Teste'
+        interesses = ((CLASSE, KIND),)
+
+    antes = list(regras_semanticas.REGRAS)
+    with pytest.raises(TypeError, match='avaliar_classe'):
+        registrar_regra(RegraSemAvaliacao)
+    assert regras_semanticas.REGRAS == antes
+
+def test_regras_registradas_sao_concretas():
+    for classe_regra in regras_semanticas.REGRAS:
+        classe_regra()
@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import cache_ast
+import metricas
+import relatorios
+
+def _codigo(linha):
+    # Erro léxico na linha pedida
+    return 'package P\n' + '\n' * (linha - 3) + 'kind A\nkind ;\n'
+
+def test_parse_codigo_em_threads_captura_so_a_propria_saida():
+    anterior = relatorios.atual()
+    linhas = list(range(3, 43))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        saidas = list(pool.map(lambda linha: cache_ast.parse_codigo(_codigo(linha))[1], linhas * 5))
+    for linha, saida in zip(linhas * 5, saidas):
+        assert saida.count('[LEX ERROR]') == 1
+        assert f'Linha {linha}:' in saida
+    assert relatorios.atual() is anterior
+
+def test_metricas_coletadas_numa_thread_nao_vazam_para_outra():
+    def medir(_):
+        with metricas.coletar() as coletor:
+            cache_ast.parse_codigo(_codigo(5))
+            return coletor is metricas.atual()
+
+    anterior = metricas.atual()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(medir, range(20)))
+    assert metricas.atual() is anterior
@@ -0,0 +1,44 @@
+import collections
+import os
+
+import cache_ast
+import resolvedor_imports
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'imports')
+
+def _carregar(monkeypatch, pasta, entradas):
+    # Resolvedor sem cache, contando quantas vezes cada arquivo é analisado
+    analises = collections.Counter()
+    parse_arquivo = cache_ast.parse_arquivo
+
+    def contar(caminho, *args, **kwargs):
+        analises[os.path.basename(caminho)] += 1
+        return parse_arquivo(caminho, *args, **kwargs)
+
+    monkeypatch.setattr(cache_ast, 'parse_arquivo', contar)
+    resolvedor = resolvedor_imports.ResolvedorImports()
+    resolvedor.carregar([os.path.join(FIXTURES, pasta, nome) for nome in entradas])
+    return resolvedor, analises
+
+def _nomes(caminhos):
+    return [os.path.basename(caminho) for caminho in caminhos]
+
+def test_diamante_analisa_cada_arquivo_uma_vez(monkeypatch):
+    # A importa B e C, que importam D
+    resolvedor, analises = _carregar(monkeypatch, 'diamante', ['A.tonto', 'B.tonto', 'C.tonto'])
+    assert analises == {'A.tonto': 1, 'B.tonto': 1, 'C.tonto': 1, 'D.tonto': 1}
+    assert resolvedor.ciclos == []
+
+def test_fecho_em_pre_ordem(monkeypatch):
+    resolvedor, _ = _carregar(monkeypatch, 'diamante', ['A.tonto'])
+    assert _nomes(resolvedor.fecho(os.path.join(FIXTURES, 'diamante', 'A.tonto'))) == [
+        'A.tonto', 'B.tonto', 'D.tonto', 'C.tonto']
+    assert _nomes(resolvedor.fecho(os.path.join(FIXTURES, 'diamante', 'C.tonto'))) == ['C.tonto', 'D.tonto']
+    assert _nomes(resolvedor.ordem_topologica()) == ['D.tonto', 'B.tonto', 'C.tonto', 'A.tonto']
+
+def test_ciclo_reportado_e_cada_arquivo_analisado_uma_vez(monkeypatch):
+    # X -> Y -> Z -> X
+    resolvedor, analises = _carregar(monkeypatch, 'ciclo', ['Y.tonto'])
+    assert analises == {'X.tonto': 1, 'Y.tonto': 1, 'Z.tonto': 1}
+    assert [_nomes(ciclo) for ciclo in resolvedor.ciclos] == [['X.tonto', 'Y.tonto', 'Z.tonto', 'X.tonto']]
+    assert _nomes(resolvedor.fecho(os.path.join(FIXTURES, 'ciclo', 'Y.tonto'))) == ['Y.tonto', 'Z.tonto', 'X.tonto']
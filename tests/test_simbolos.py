@@ -0,0 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import simbolos
+
+def test_estereotipo_novo_em_varias_threads_tem_um_codigo_so():
+    nomes = [f'estereotipoImportado{i}' for i in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        rodadas = list(pool.map(lambda _: [simbolos.codigo_estereotipo(nome) for nome in nomes], range(8)))
+    assert all(codigos == rodadas[0] for codigos in rodadas)
+    assert [simbolos.nome_estereotipo(codigo) for codigo in rodadas[0]] == nomes
+    assert len(simbolos.ESTEREOTIPOS) == len(simbolos.CODIGOS)
@@ -0,0 +1,40 @@
+import analisador_semantico
+import resolvedor_imports
+
+# Com imports sob demanda, o veredito sobre os padrões do arquivo tem de ser
+# o mesmo da análise com o fecho de imports inteiro
+
+def _analisar(pasta, arquivos, principal):
+    for nome, codigo in arquivos.items():
+        (pasta / nome).write_text(codigo)
+    caminho = str(pasta / principal)
+    resolvedor = resolvedor_imports.ResolvedorImports()
+    modelo = resolvedor.modelo_sob_demanda(caminho)
+    return modelo, analisador_semantico.AnalisadorSemantico(modelo).analisar()
+
+def test_genset_declarado_num_import(tmp_path):
+    _, resultados = _analisar(tmp_path, {
+        'A.tonto': "import B\n\npackage A\n\nkind Person\n"
+                   "phase Child specializes Person\nphase Adult specializes Person\n",
+        'B.tonto': "import A\n\npackage B\n\n"
+                   "disjoint complete genset Ages {\n    general Person\n    specifics Child, Adult\n}\n",
+    }, 'A.tonto')
+    assert [r['tipo'] for r in resultados if r['padrao'] == 'Phase'] == ['OK']
+
+def test_relacoes_declaradas_num_import(tmp_path):
+    _, resultados = _analisar(tmp_path, {
+        'A.tonto': "import B\n\npackage A\n\nkind Person\n"
+                   "role Student specializes Person\nrole Teacher specializes Person\n",
+        'B.tonto': "import A\n\npackage B\n\nkind School\n"
+                   "@material relation Student [1..*] -- [1..*] School\n"
+                   "relator Lesson {\n    @mediation [1..*] -- [1..*] Teacher\n"
+                   "    @mediation [1..*] -- [1..*] Student\n}\n",
+    }, 'A.tonto')
+    assert [r['tipo'] for r in resultados if r['padrao'] == 'Role'] == ['OK', 'OK']
+
+def test_imports_nao_consultados_nao_sao_lidos(tmp_path):
+    modelo, _ = _analisar(tmp_path, {
+        'A.tonto': "import B\n\npackage A\n\nkind Person\n",
+        'B.tonto': "package B\n\nkind School\n",
+    }, 'A.tonto')
+    assert modelo.arquivos == [str(tmp_path / 'A.tonto')]